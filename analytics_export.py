@@ -0,0 +1,134 @@
+import csv
+import datetime
+import json
+import logging
+
+import numpy as np
+
+from schedule_codec import DUTY_CODES, parse_month_key
+from schedule_store import parse_ward_args
+
+# ========================================================================
+# 1. 설정 및 상수
+# ========================================================================
+WORKER_CATEGORIES_FILE = 'worker_categories.json'
+DEFAULT_CATEGORY = '일반'
+# 긴 형식(근무자 × 일 한 행) 열 순서
+LONG_COLUMNS = ['ward', 'date', 'worker', 'category', 'duty', 'manual_flag']
+
+
+# ========================================================================
+# 2. 월 → 긴 형식 열
+# ========================================================================
+# 문자열 열은 (정수 인덱스 배열, 값 목록) 사전 인코딩 형태로 만들어 근무 코드 행렬을 그대로 재사용한다.
+DICTIONARY_COLUMNS = ['ward', 'worker', 'category', 'duty']
+
+
+def month_columns(ward, em, categories=None):
+    """EncodedMonth 하나를 긴 형식 열로 변환 (행 순서: 근무자, 일)
+
+    ward/worker/category/duty는 (인덱스 배열, 값 목록), date는 datetime64[D], manual_flag는 bool 배열.
+    """
+    categories = categories or {}
+    num_workers, num_days = em.codes.shape
+    worker_rows = np.repeat(np.arange(num_workers, dtype=np.int32), num_days)
+    category_values = sorted({categories.get(w, DEFAULT_CATEGORY) for w in em.workers})
+    category_of = np.array([category_values.index(categories.get(w, DEFAULT_CATEGORY)) for w in em.workers],
+                           dtype=np.int32)
+    first_day = np.datetime64(datetime.date(em.year, em.month, 1))
+    return {
+        'ward': (np.zeros(num_workers * num_days, dtype=np.int32), [ward]),
+        'date': np.tile(first_day + np.arange(num_days), num_workers),
+        'worker': (worker_rows, list(em.workers)),
+        'category': (category_of[worker_rows], category_values),
+        'duty': (em.codes.ravel().astype(np.int32), list(DUTY_CODES)),
+        'manual_flag': em.manual.ravel(),
+    }
+
+
+def iter_month_columns(ward_stores, categories=None, month_keys=None):
+    """병동별 저장소의 월을 하나씩 읽어 (병동, 월 키, 긴 형식 열)을 반환 (한 번에 한 달 분량만 메모리에 둠)"""
+    for ward, store in ward_stores.items():
+        for key in store.list_months():
+            if month_keys is not None and key not in month_keys:
+                continue
+            em = store.load_month(*parse_month_key(key))
+            if em is not None:
+                yield ward, key, month_columns(ward, em, categories)
+
+
+# ========================================================================
+# 3. 파일 쓰기
+# ========================================================================
+def export_csv(path, ward_stores, categories=None, month_keys=None, report=None):
+    """긴 형식 CSV로 내보내고 기록한 행 수를 반환"""
+    report = report or (lambda msg: None)
+    total = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(LONG_COLUMNS)
+        for ward, key, cols in iter_month_columns(ward_stores, categories, month_keys):
+            values = {name: np.array(cols[name][1], dtype=object)[cols[name][0]] for name in DICTIONARY_COLUMNS}
+            values['date'] = cols['date'].astype(str)
+            values['manual_flag'] = cols['manual_flag'].astype(np.uint8)
+            writer.writerows(zip(*(values[name].tolist() for name in LONG_COLUMNS)))
+            total += len(cols['manual_flag'])
+            report(f"  {ward} {key}: {len(cols['manual_flag'])}행")
+    return total
+
+
+def export_parquet(path, ward_stores, categories=None, month_keys=None, report=None):
+    """긴 형식 Parquet으로 내보내고 기록한 행 수를 반환 (월마다 row group 하나, pyarrow 필요)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    report = report or (lambda msg: None)
+    string_dict = pa.dictionary(pa.int32(), pa.string())
+    schema = pa.schema([('ward', string_dict), ('date', pa.date32()), ('worker', string_dict),
+                        ('category', string_dict), ('duty', string_dict), ('manual_flag', pa.bool_())])
+    total = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for ward, key, cols in iter_month_columns(ward_stores, categories, month_keys):
+            arrays = []
+            for field in schema:
+                if field.name in DICTIONARY_COLUMNS:
+                    indices, values = cols[field.name]
+                    arrays.append(pa.DictionaryArray.from_arrays(pa.array(indices), pa.array(values, pa.string())))
+                else:
+                    arrays.append(pa.array(cols[field.name], type=field.type))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            total += len(cols['manual_flag'])
+            report(f"  {ward} {key}: {len(cols['manual_flag'])}행")
+    return total
+
+
+def load_categories(path=WORKER_CATEGORIES_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="저장된 근무표를 긴 형식(CSV/Parquet) 분석용 데이터로 내보내기")
+    parser.add_argument('output', help="출력 파일 (.csv 또는 .parquet)")
+    parser.add_argument('--ward', action='append', help="병동=저장소폴더 (여러 번 지정 가능)")
+    parser.add_argument('--month', action='append', help="내보낼 월 YYYY-MM (생략 시 전체)")
+    parser.add_argument('--categories', default=WORKER_CATEGORIES_FILE, help="근무자 직책/구분 JSON")
+    args = parser.parse_args()
+
+    try:
+        ward_stores = parse_ward_args(args.ward)
+        months = set(args.month) if args.month else None
+        exporter = export_parquet if args.output.endswith('.parquet') else export_csv
+        rows = exporter(args.output, ward_stores, load_categories(args.categories), months, report=print)
+        print(f"{rows}행 저장: {args.output}")
+    except ImportError:
+        logging.error("Parquet 내보내기에는 pyarrow가 필요합니다. 'pip install pyarrow'를 실행하거나 .csv로 내보내세요.")
+        raise SystemExit(1)
+    except Exception as e:
+        logging.error(f"analytics_export: {e}")
+        raise SystemExit(1)
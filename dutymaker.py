@@ -6,14 +6,27 @@ import calendar
 import json
 import random
 import math
+import os
+import threading
 import logging
 
+from leave_ledger import LeaveLedger
+from schedule_codec import DUTY_CODES, DUTY_INDEX, EncodedMonth, normalize_duty, weekend_mask
+from schedule_export import export_month_workbook
+from schedule_grid import ScheduleGrid
+from schedule_history import CellDelta, EditHistory, diff_months
+from schedule_import import build_label_table, import_workbooks
+from schedule_stats import STATS_VIEW_COLUMNS, CoverageCounter, StatsCube, SummaryCounter, stats_rows
+from schedule_store import ScheduleConflictError, ScheduleStore, StoreLockTimeout
+from migrate_store import migrate_files
+
 # ========================================================================
 # 1. 설정 및 상수
 # ========================================================================
 TOSS_BLUE = '#0066FF'
 WORK_DUTIES = ['D', 'E', 'N', 'DH']
 DAILY_LIMITS = {'D': 2, 'E': 2, 'N': 1, 'DH': 1}
+WEEKEND_DAILY_LIMITS = {'E': 1}  # 토/일에 DAILY_LIMITS 대신 적용
 PRESERVED_SHIFTS = ['V', 'v.25', 'v.0.5', 'MD']
 EDITABLE_SHIFTS = ['D', 'E', 'N', 'O', 'V', 'v.25', 'v.0.5', 'MD', 'DH', '']
 
@@ -21,9 +34,29 @@ WINDOW_WIDTH, WINDOW_HEIGHT = 1600, 600
 CURRENT_YEAR = datetime.datetime.now().year
 CURRENT_MONTH = datetime.datetime.now().month
 WORKER_LIST_FILE = 'worker_names.json'
-PREV_MONTH_SCHEDULE_FILE = 'prev_month_schedule.json'
 MONTHLY_SCHEDULES_FILE = 'monthly_schedules.json'
 ANNUAL_VACATION_FILE = 'annual_vacations.json'
+# 레거시 이월 근무 {근무자: [마지막 5일 근무]} — 적용 월이 없으므로 저장소에 직전 달이 없을 때만 사용
+PREV_MONTH_SCHEDULE_FILE = 'prev_month_schedule.json'
+# 다음 달 생성 시 참고하는 직전 달 마지막 근무 일수
+CARRY_OVER_LOOKBACK_DAYS = 5
+# 근무표 마지막 줄에 표시하는 일별 인원 충족 현황 행
+COVERAGE_ROW_LABEL = '인원 현황'
+# 다른 인스턴스가 열려 있는 월을 바꿨는지 확인하는 간격 (ms)
+STORE_POLL_INTERVAL_MS = 2000
+# 연/월 이동을 모아서 마지막 월만 불러오기까지 기다리는 시간 (ms)
+NAVIGATION_DEBOUNCE_MS = 150
+# 키보드 입력 후 저장까지 기다리는 시간 (ms) — 연속 입력은 한 번에 저장
+KEYBOARD_SAVE_DELAY_MS = 800
+# 근무표 키보드 입력: 키 → 근무 (한글 입력 상태의 같은 자판 자모 포함, Delete/BackSpace는 비우기)
+KEYBOARD_DUTY_KEYS = {
+    'd': 'D', 'e': 'E', 'n': 'N', 'o': 'O', 'v': 'V', 'm': 'MD', 'h': 'DH', '5': 'v.0.5', '2': 'v.25',
+    'ㅇ': 'D', 'ㄷ': 'E', 'ㅜ': 'N', 'ㅐ': 'O', 'ㅍ': 'V', 'ㅡ': 'MD', 'ㅗ': 'DH',
+}
+# 방향키 / Tab / Enter 이동 (행, 열)
+KEYBOARD_MOVES = {'Left': (0, -1), 'Right': (0, 1), 'Up': (-1, 0), 'Down': (1, 0), 'Tab': (0, 1), 'ISO_Left_Tab': (0, -1)}
+# 칸 편집 목록(Combobox)이 열려 있을 때 목록이 직접 처리하는 이동 키 (나머지 이동 키는 그리드로 넘김)
+CELL_EDITOR_LIST_KEYS = ('Up', 'Down')
 
 DEFAULT_WORKERS = ["도은아", "구진아", "김정화", "이현주", "강효선", "천보람", "지연정", "이소라", "김수빈", "문수빈", "최민정", "문오순"]
 
@@ -42,22 +75,41 @@ class ScheduleApp:
         self.root = root
         self.worker_names = []
         self.worker_categories_map = {}
-        self.monthly_schedules = {}
+        self.store = ScheduleStore()
+        self.stats_cube = StatsCube(self.store)  # 월 × 근무자 × 항목 누적 통계
+        self.monthly_schedules = {}  # 월 키 → EncodedMonth (저장소 캐시)
+        self.prefetched_months = {}  # 월 키 → 백그라운드에서 미리 준비한 표시 데이터 (prefetch_adjacent_months)
+        self.prefetch_lock = threading.Lock()
         self.current_schedule_df = pd.DataFrame()
         self.current_summary_df = pd.DataFrame()
+        self.summary_counter = None  # 현재 통계 표의 근무자별 카운터 (셀 편집 시 증분 갱신)
+        self.coverage_counter = None  # 현재 근무표의 일별 D/E/N 인원 (셀 편집 시 증분 갱신)
+        self.prepared_display = None  # 미리 불러온 월의 (표시용 EncodedMonth, 인원 현황) — 다음 display_schedule_table에서 사용
+        self.summary_tree = None  # 표시 중인 통계 표 (숨겨져 있으면 None)
+        self.summary_view = None  # 재사용하는 통계 표 위젯 (제목, Treeview, 안내 문구)
+        self.schedule_message = None  # 근무표 영역 안내 문구 (그리드 대신 표시)
         self.manual_edited_cells = set()
+        self.edit_history = EditHistory()  # 월별 실행 취소 / 다시 실행 (바뀐 칸의 차이만 보관)
+        self.cell_editor = None  # 근무표 칸 편집용 Combobox (한 번 만들어 재사용)
+        self.editor_cell = None  # 편집 중인 (행, 열)
+        self.pending_save_key = None  # 키보드 입력으로 저장이 미뤄진 월 키
+        self.pending_save_after_id = None
+        self.pending_history = []  # 저장이 미뤄진 키보드 입력의 편집 기록 (저장에 성공하면 실행 취소 스택에 기록)
         self.trace_id = None
-        self.current_tree = None
+        self.nav_after_id = None  # 예약된 월 이동 표시 (after id)
+        self.nav_suppress = False  # 월 정규화 중 trace 재예약 방지
+        self.schedule_grid = None
+        self.current_month = None  # 근무표 그리드가 표시하는 EncodedMonth (코드 행렬 + 수동 편집 마스크)
         self.prev_month_last_day_duties = {}
 
-        # 연차 데이터 (근무자: 남은연차)
-        self.annual_vacations = {}
+        # 연차 원장 (부여/사용/환원 이벤트 + 저장된 근무표 집계)
+        self.leave_ledger = None
 
         # [데이터 로드]
         self.load_worker_names()
-        self.load_prev_month_schedule()
         self.load_worker_categories()
-        self.load_annual_vacations()  # 🔵 NEW: 연차 파일 불러오기
+        self.load_all_schedules()
+        self.load_annual_vacations()
 
         # [UI 변수]
         self.year_var = tk.IntVar(value=CURRENT_YEAR)
@@ -69,79 +121,168 @@ class ScheduleApp:
         self.setup_main_window()
 
     # ------------------------------------------------------------------
-    # [연차(휴가) 저장/불러오기] 🔵 NEW
+    # [연차 원장]
     # ------------------------------------------------------------------
     def load_annual_vacations(self):
-        """annual_vacations.json에서 연차를 불러오고, 근무자 리스트 기준으로 초기화/동기화"""
-        try:
-            with open(ANNUAL_VACATION_FILE, 'r', encoding='utf-8') as f:
-                loaded = json.load(f)
-                if isinstance(loaded, dict):
-                    self.annual_vacations = loaded
-                else:
-                    self.annual_vacations = {}
-        except Exception:
-            # 파일이 없거나 포맷 문제일 경우 기본값 설정
-            self.annual_vacations = {}
-
-        # 근무자 목록과 동기화: 새로운 근무자는 기본값(21.5) 부여, 삭제된 근무자 키는 제거
-        for name in self.worker_names:
-            if name not in self.annual_vacations:
-                self.annual_vacations[name] = 21.5
-        # 삭제된 이름 제거
-        keys_to_remove = [k for k in self.annual_vacations.keys() if k not in self.worker_names]
-        for k in keys_to_remove:
-            del self.annual_vacations[k]
-        self.save_annual_vacations()
-
-    def save_annual_vacations(self):
-        """현재 self.annual_vacations를 파일에 저장"""
-        try:
-            with open(ANNUAL_VACATION_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.annual_vacations, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            logging.error(f"save_annual_vacations: {e}")
+        """연차 원장을 열기 (레거시 annual_vacations.json 변환은 load_all_schedules에서 근무표 다음에 수행)"""
+        self.leave_ledger = LeaveLedger(self.store)
 
     # ------------------------------------------------------------------
     # [데이터 관리: 저장/불러오기 - 기존]
     # ------------------------------------------------------------------
     def load_all_schedules(self):
-        try:
-            with open(MONTHLY_SCHEDULES_FILE, 'r', encoding='utf-8') as f:
-                self.monthly_schedules = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.monthly_schedules = {}
-            logging.info(f"[{MONTHLY_SCHEDULES_FILE}] 파일이 없거나 형식 오류. 새 딕셔너리 생성.")
-        except Exception as e:
-            logging.error(f"load_all_schedules: {e}")
+        """표준 저장소를 사용. 저장소 / 연차 원장이 비어 있으면 레거시 파일을 한 번 변환
 
-    def save_all_schedules(self):
+        annual_vacations.json은 근무표 사용량을 뺀 잔여 연차라서 부여량으로 환산할 때 저장된 근무표가
+        필요하므로 monthly_schedules.json → annual_vacations.json 순서로 한 번에 변환한다.
+        """
+        self.monthly_schedules = {}
         try:
-            with open(MONTHLY_SCHEDULES_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.monthly_schedules, f, ensure_ascii=False, indent=4)
+            paths = []
+            if self.store.is_empty() and os.path.exists(MONTHLY_SCHEDULES_FILE):
+                paths.append(MONTHLY_SCHEDULES_FILE)
+            if LeaveLedger(self.store).is_empty() and os.path.exists(ANNUAL_VACATION_FILE):
+                paths.append(ANNUAL_VACATION_FILE)
+            if paths:
+                migrate_files(self.store, paths, leave_year=CURRENT_YEAR, report=logging.info)
         except Exception as e:
-            logging.error(f"save_all_schedules: {e}")
+            logging.error(f"load_all_schedules: {e}")
 
     def save_current_schedule_to_memory(self, df_schedule, year, month):
+        """저장소에 저장하고 저장된 EncodedMonth를 반환 (실패하면 None)
+
+        다른 인스턴스의 변경과 병합되면 병합 결과를, 충돌하면 최신 저장본을 다시 표시한다.
+        """
         key = f"{year}-{month:02d}"
-        data_to_save = {
-            'columns': df_schedule.columns.tolist(),
-            'index': df_schedule.index.tolist(),
-            'data': df_schedule.values.tolist(),
-            'manual_edits': list(self.manual_edited_cells)
-        }
-        self.monthly_schedules[key] = data_to_save
-        self.save_all_schedules()
+        pending_history = []
+        if self.pending_save_key == key:
+            # 미뤄 둔 키보드 입력도 이번 저장에 포함됨 (편집 기록은 저장에 성공한 뒤에 남김)
+            self.pending_save_key = None
+            pending_history, self.pending_history = self.pending_history, []
+        try:
+            em = EncodedMonth.from_dataframe(df_schedule, year, month, self.manual_edited_cells)
+            saved = self.store.save_month(em)
+        except ScheduleConflictError as e:
+            logging.warning(f"save_current_schedule_to_memory: {e}")
+            self.monthly_schedules.pop(key, None)
+            # 저장본을 다시 불러오므로 이 월의 편집 기록은 더 이상 화면과 맞지 않음
+            self.edit_history.forget(key)
+            messagebox.showwarning("저장 충돌", f"다른 곳에서 같은 칸을 먼저 수정하여 저장하지 않았습니다.\n최신 근무표를 다시 불러옵니다.\n\n{e}")
+            self.root.after_idle(self.display_initial_schedule_table)
+            return None
+        except StoreLockTimeout as e:
+            logging.error(f"save_current_schedule_to_memory: {e}")
+            messagebox.showerror("저장 실패", f"{year}년 {month}월 근무표를 저장하지 못했습니다.\n\n{e}")
+            return None
+        except Exception as e:
+            logging.error(f"save_current_schedule_to_memory: {e}")
+            return None
+        self.monthly_schedules[key] = saved
+        self.discard_prefetched(key)
+        for delta in pending_history:
+            self.edit_history.record(delta)
+        self.leave_ledger.update_month(saved)
+        try:
+            self.stats_cube.update_month(saved)
+        except Exception as e:
+            logging.error(f"stats_cube.update_month: {e}")
+        if saved is not em:
+            # 다른 인스턴스의 변경 사항이 병합되었으므로 화면을 저장본으로 갱신
+            added = [name for name in saved.workers if name not in em.workers]
+            if added:
+                messagebox.showinfo("근무자 병합", f"다른 곳에서 추가된 근무자의 {year}년 {month}월 근무를 함께 표시합니다: "
+                                    f"{', '.join(added)}\n근무자 관리에서 명단에 추가하거나 정리할 수 있습니다.")
+            self.root.after_idle(self.display_initial_schedule_table)
+        return saved
+
+    def poll_store_changes(self):
+        """열려 있는 월을 다른 인스턴스가 바꿨으면 다시 불러와 표시 (stat 한 번으로 확인)"""
+        try:
+            year, month = self.displayed_year_month()
+            key = f"{year}-{month:02d}"
+            # 저장이 미뤄진 입력이 있으면 확인을 건너뜀 (예약된 저장이 다른 인스턴스의 변경과 병합함)
+            if self.pending_save_key is None and key in self.monthly_schedules and self.store.changed_since_load(year, month):
+                logging.info(f"poll_store_changes: {key} 변경 감지, 다시 불러옴")
+                self.monthly_schedules.pop(key, None)
+                self.display_initial_schedule_table()
+        except Exception as e:
+            logging.error(f"poll_store_changes: {e}")
+        self.root.after(STORE_POLL_INTERVAL_MS, self.poll_store_changes)
 
     def load_schedule_from_memory(self, year, month):
         key = f"{year}-{month:02d}"
-        if key in self.monthly_schedules:
-            data = self.monthly_schedules[key]
-            df = pd.DataFrame(data['data'], index=data['index'], columns=data['columns'])
-            manual_edits_list = data.get('manual_edits', [])
-            manual_edits_set = set(tuple(item) for item in manual_edits_list)
-            return df, manual_edits_set
-        return None, set()
+        prepared = self.discard_prefetched(key)
+        if prepared is not None and not self.store.changed_since(year, month, prepared['revision'], prepared['stamp']):
+            # 저장 기준은 미리 읽은 월을 실제로 사용할 때 Tk 스레드에서만 등록
+            self.store.adopt_month(prepared['em'], prepared['revision'], prepared['stamp'])
+            self.monthly_schedules[key] = prepared['em']
+            self.prepared_display = (prepared['shown'], prepared['coverage'])
+            return prepared['df'], prepared['manual']
+        em = self.monthly_schedules.get(key)
+        if em is not None and self.store.changed_since_load(year, month):
+            em = None
+        if em is None:
+            try:
+                em = self.store.load_month(year, month)
+            except Exception as e:
+                logging.error(f"load_schedule_from_memory: {e}")
+                em = None
+            if em is None:
+                return None, set()
+            self.monthly_schedules[key] = em
+        return em.to_dataframe(), em.manual_edit_keys()
+
+    # ------------------------------------------------------------------
+    # [인접 월 미리 불러오기]
+    # ------------------------------------------------------------------
+    def _prepare_month(self, year, month):
+        """저장된 월을 읽어 화면 표시에 필요한 DataFrame / 수동 편집 / 인원 현황까지 준비 (백그라운드 스레드에서 호출)
+
+        저장소의 저장 기준은 건드리지 않고 읽은 revision과 stamp만 함께 넘긴다.
+        그리드가 직접 수정하는 표시용 EncodedMonth(shown)는 캐시와 행렬을 공유하지 않도록 복사해 둔다.
+        """
+        loaded = self.store.read_month(year, month)
+        if loaded is None:
+            return None
+        em, revision, stamp = loaded
+        shown = EncodedMonth(em.year, em.month, list(em.workers), em.codes.copy(), em.manual.copy())
+        return {'em': em, 'revision': revision, 'stamp': stamp, 'df': em.to_dataframe(),
+                'manual': em.manual_edit_keys(), 'shown': shown,
+                'coverage': CoverageCounter(shown, DAILY_LIMITS, WEEKEND_DAILY_LIMITS)}
+
+    def prefetch_adjacent_months(self, year, month):
+        """현재 월을 표시한 뒤 이전/다음 달을 작업 스레드에서 미리 파싱해 두어 이동 시 위젯 갱신 비용만 들게 함"""
+        targets = []
+        for offset in (-1, 1):
+            y, m = divmod(year * 12 + month - 1 + offset, 12)
+            targets.append((y, m + 1))
+        wanted = {f"{y}-{m:02d}" for y, m in targets}
+        with self.prefetch_lock:
+            # 인접 월이 아닌 준비 데이터는 버림 (메모리는 최대 두 달 분량)
+            for key in list(self.prefetched_months):
+                if key not in wanted:
+                    del self.prefetched_months[key]
+            targets = [(y, m) for y, m in targets if f"{y}-{m:02d}" not in self.prefetched_months]
+        if not targets:
+            return
+
+        def worker():
+            for y, m in targets:
+                try:
+                    prepared = self._prepare_month(y, m)
+                except Exception as e:
+                    logging.error(f"prefetch_adjacent_months {y}-{m:02d}: {e}")
+                    continue
+                if prepared is not None:
+                    with self.prefetch_lock:
+                        self.prefetched_months[f"{y}-{m:02d}"] = prepared
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def discard_prefetched(self, key):
+        """미리 준비한 월 데이터를 꺼내고 목록에서 제거 (없으면 None)"""
+        with self.prefetch_lock:
+            return self.prefetched_months.pop(key, None)
 
     def save_worker_names(self):
         try:
@@ -182,31 +323,48 @@ class ScheduleApp:
             updated_map[name] = self.worker_categories_map.get(name, DEFAULT_CATEGORY)
         self.worker_categories_map = updated_map
 
-    def save_prev_month_schedule(self):
-        if self.current_schedule_df.empty: return
+    def load_prev_month_schedule(self, year, month):
+        """저장된 직전 달 근무표에서 이월 근무(마지막 CARRY_OVER_LOOKBACK_DAYS일)를 계산
+
+        직전 달이 저장소에 없고 마이그레이션된 이월 근무도 없으면 레거시 prev_month_schedule.json을 사용한다.
+        """
         try:
-            df = self.current_schedule_df
-            last_5_days_df = df.iloc[:, -5:]
-            last_day_duties_list = {worker: row.tolist() for worker, row in last_5_days_df.iterrows()}
-            with open(PREV_MONTH_SCHEDULE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(last_day_duties_list, f, ensure_ascii=False, indent=4)
+            self.prev_month_last_day_duties = self.store.carry_over_tail(year, month, CARRY_OVER_LOOKBACK_DAYS)
         except Exception as e:
-            logging.error(f"save_prev_month_schedule: {e}")
+            logging.error(f"load_prev_month_schedule: {e}")
+            self.prev_month_last_day_duties = {}
+        if not self.prev_month_last_day_duties:
+            try:
+                with open(PREV_MONTH_SCHEDULE_FILE, 'r', encoding='utf-8') as f:
+                    legacy = json.load(f)
+                self.prev_month_last_day_duties = {
+                    name: [normalize_duty(duty) for duty in duties][-CARRY_OVER_LOOKBACK_DAYS:]
+                    for name, duties in legacy.items()}
+            except Exception as e:
+                logging.info(f"load_prev_month_schedule: 레거시 이월 근무 없음. {e}")
 
-    def load_prev_month_schedule(self):
+    def rename_worker_in_prev_month(self, year, month, old_name, new_name):
+        """직전 달 저장본의 근무자 이름도 바꿔 이름으로 찾는 이월 근무가 끊기지 않게 함"""
+        prev_year, prev_month = divmod(year * 12 + month - 2, 12)
+        em = self.store.load_month(prev_year, prev_month + 1)
+        if em is None or old_name not in em.workers or new_name in em.workers:
+            return
+        workers = [new_name if name == old_name else name for name in em.workers]
+        saved = self.store.save_month(EncodedMonth(em.year, em.month, workers, em.codes, em.manual))
+        self.monthly_schedules[saved.key] = saved
+        self.discard_prefetched(saved.key)
+        self.leave_ledger.update_month(saved)
         try:
-            with open(PREV_MONTH_SCHEDULE_FILE, 'r', encoding='utf-8') as f:
-                self.prev_month_last_day_duties = json.load(f)
+            self.stats_cube.update_month(saved)
         except Exception as e:
-            logging.info(f"load_prev_month_schedule: 이전 달 근무표 없음. {e}")
-            self.prev_month_last_day_duties = {}
+            logging.error(f"stats_cube.update_month: {e}")
 
     def save_schedule_to_excel(self):
         if self.current_schedule_df.empty:
             messagebox.showwarning("경고", "저장할 근무표 데이터가 없습니다. 근무표를 먼저 생성해 주세요.")
             return
 
-        year, month = self.year_var.get(), self.month_var.get()
+        year, month = self.selected_year_month()
         default_filename = f"{year}년_{month}월_근무표.xlsx"
 
         file_path = filedialog.asksaveasfilename(
@@ -219,47 +377,74 @@ class ScheduleApp:
         if not file_path:
             return
 
+        # 화면의 데이터를 복사해 두고 파일 쓰기는 백그라운드 스레드에서 수행
         try:
-            with pd.ExcelWriter(file_path, engine='xlsxwriter') as writer:
-                df_schedule_reset = self.current_schedule_df.reset_index(names=['근무자'])
-                df_schedule_reset.to_excel(writer, sheet_name='근무표', index=False)
-
-                workbook = writer.book
-                worksheet_schedule = writer.sheets['근무표']
-                worksheet_schedule.freeze_panes(1, 1)
-
-                if not self.current_summary_df.empty:
-                    df_summary_reset = self.current_summary_df.copy()
-                    df_summary_reset.to_excel(writer, sheet_name='근무_통계', index=False)
-                    worksheet_summary = writer.sheets['근무_통계']
-                    worksheet_summary.freeze_panes(1, 0)
-
-            messagebox.showinfo("저장 성공", f"근무표와 통계를 '{file_path}'에 성공적으로 저장했습니다.")
-            logging.info(f"Excel saved to: {file_path}")
-
-        except ImportError:
-            messagebox.showerror("저장 오류", "xlsxwriter 라이브러리가 설치되어 있지 않습니다.\n'pip install xlsxwriter'를 실행해주세요.")
-            logging.error("xlsxwriter not installed.")
+            em = EncodedMonth.from_dataframe(self.current_schedule_df, year, month, self.manual_edited_cells)
         except Exception as e:
             messagebox.showerror("저장 오류", f"엑셀 파일 저장 중 오류가 발생했습니다.\n오류: {e}")
             logging.error(f"Error saving to Excel: {e}")
+            return
+        if self.summary_counter is not None:
+            self.current_summary_df = self.summary_counter.frame()
+        summary_df = self.current_summary_df.copy()
+        result = {}
+
+        def worker():
+            try:
+                export_month_workbook(file_path, em, summary_df)
+            except Exception as e:
+                result['error'] = e
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+
+        def check_done():
+            if thread.is_alive():
+                self.root.after(50, check_done)
+                return
+            error = result.get('error')
+            if error is None:
+                messagebox.showinfo("저장 성공", f"근무표와 통계를 '{file_path}'에 성공적으로 저장했습니다.")
+                logging.info(f"Excel saved to: {file_path}")
+            elif isinstance(error, ImportError):
+                messagebox.showerror("저장 오류", "xlsxwriter 라이브러리가 설치되어 있지 않습니다.\n'pip install xlsxwriter'를 실행해주세요.")
+                logging.error("xlsxwriter not installed.")
+            else:
+                messagebox.showerror("저장 오류", f"엑셀 파일 저장 중 오류가 발생했습니다.\n오류: {error}")
+                logging.error(f"Error saving to Excel: {error}")
+
+        self.root.after(50, check_done)
+
+    def import_schedules_from_excel(self):
+        """엑셀 근무표(시트 하나 = 한 달)를 EDITABLE_SHIFTS로 검증하여 저장소에 일괄 저장"""
+        file_paths = filedialog.askopenfilenames(filetypes=[("Excel files", "*.xlsx")], title="엑셀 근무표 가져오기")
+        if not file_paths:
+            return
+
+        messages = []
+        try:
+            months = import_workbooks(self.store, file_paths, year=self.selected_year_month()[0],
+                                      allowed_duties=EDITABLE_SHIFTS, report=messages.append)
+        except Exception as e:
+            messagebox.showerror("가져오기 오류", f"엑셀 파일을 읽는 중 오류가 발생했습니다.\n오류: {e}")
+            logging.error(f"import_schedules_from_excel: {e}")
+            return
+
+        for em in months:
+            self.monthly_schedules[em.key] = em
+            self.leave_ledger.update_month(em)
+        logging.info("\n".join(messages))
+        errors = [m for m in messages if '[오류]' in m]
+        detail = "\n\n저장하지 않은 달:\n" + "\n".join(m.strip() for m in errors[:10]) if errors else ""
+        messagebox.showinfo("가져오기 완료", f"{len(months)}개월 근무표를 가져왔습니다.{detail}")
+        self.display_initial_schedule_table()
 
     # ------------------------------------------------------------------
     # [근무자 UI 관리]
     # ------------------------------------------------------------------
     def update_gui_after_worker_change(self):
-        """근무자 추가/삭제/순서 변경시 UI 및 연차 동기화"""
-        # 연차 맵 동기화: 새 근무자에 기본 연차 부여, 삭제된 근무자 제거
-        for name in self.worker_names:
-            if name not in self.annual_vacations:
-                self.annual_vacations[name] = 21.5
-        to_remove = [k for k in self.annual_vacations.keys() if k not in self.worker_names]
-        for k in to_remove:
-            del self.annual_vacations[k]
-        self.save_annual_vacations()
-
+        """근무자 추가/삭제/순서 변경시 UI 동기화 (연차는 원장에서 근무자 목록 기준으로 집계)"""
         self.monthly_schedules.clear()
-        self.save_all_schedules()
         self.manual_edited_cells.clear()
         self.display_initial_schedule_table()
         self.save_worker_names()
@@ -372,9 +557,6 @@ class ScheduleApp:
                 if fixed_name not in self.worker_names:
                     self.worker_names.append(fixed_name)
                     self.worker_categories_map[fixed_name] = DEFAULT_CATEGORY
-                    # 신규 근무자 연차 기본값 부여
-                    self.annual_vacations[fixed_name] = 21.5
-                    self.save_annual_vacations()
                     self.save_worker_categories()
                     refresh_worker_tree(worker_tree, self.worker_names)
                     messagebox.showinfo("성공", f"근무자 '{fixed_name}'이(가) 추가되었습니다.", parent=dialog)
@@ -395,19 +577,7 @@ class ScheduleApp:
                     messagebox.showwarning("중복", f"이미 존재하는 근무자 이름입니다: '{fixed_new_name}'", parent=dialog)
                     return
 
-                self.worker_names[self.worker_names.index(old_name)] = fixed_new_name
-
-                # 카테고리 맵 키 업데이트
-                if old_name in self.worker_categories_map:
-                    category = self.worker_categories_map.pop(old_name)
-                    self.worker_categories_map[fixed_new_name] = category
-                    self.save_worker_categories()
-
-                # 연차 맵 키 업데이트
-                if old_name in self.annual_vacations:
-                    vac = self.annual_vacations.pop(old_name)
-                    self.annual_vacations[fixed_new_name] = vac
-                    self.save_annual_vacations()
+                self.rename_worker(old_name, fixed_new_name)
 
                 refresh_worker_tree(worker_tree, self.worker_names)
                 for item_id in worker_tree.get_children():
@@ -429,9 +599,6 @@ class ScheduleApp:
                 if name_to_delete in self.worker_categories_map:
                     del self.worker_categories_map[name_to_delete]
                     self.save_worker_categories()
-                if name_to_delete in self.annual_vacations:
-                    del self.annual_vacations[name_to_delete]
-                    self.save_annual_vacations()
 
                 refresh_worker_tree(worker_tree, self.worker_names)
                 messagebox.showinfo("성공", f"근무자 '{name_to_delete}'이(가) 명단에서 삭제되었습니다.", parent=dialog)
@@ -453,19 +620,49 @@ class ScheduleApp:
 
         self.root.wait_window(dialog)
 
-    def start_worker_name_edit(self, event):
-        tree = self.current_tree
+    def rename_worker(self, old_name, new_name):
+        """근무자 이름 변경을 명단, 구분, 현재 근무표(수동 편집 표시 포함), 직전 달 저장본, 이월 근무, 연차 원장에 반영
+
+        근무자 관리 창과 근무표 이름 칸 편집이 모두 이 경로를 사용한다.
+        """
+        self.flush_pending_save()
+        if old_name in self.worker_names:
+            self.worker_names[self.worker_names.index(old_name)] = new_name
+            self.save_worker_names()
+
+        if old_name in self.worker_categories_map:
+            self.worker_categories_map[new_name] = self.worker_categories_map.pop(old_name)
+            self.save_worker_categories()
+
+        # 현재 근무표: 행 이름과 (근무자, 열) 수동 편집 키를 함께 바꿔야 다음 저장에서 수동 표시가 유지됨
+        em = self.current_month
+        year, month = self.displayed_year_month()
+        if not self.current_schedule_df.empty and old_name in self.current_schedule_df.index:
+            self.current_schedule_df = self.current_schedule_df.rename(index={old_name: new_name})
+            self.manual_edited_cells = {(new_name if worker == old_name else worker, col)
+                                        for worker, col in self.manual_edited_cells}
+            self.save_current_schedule_to_memory(self.current_schedule_df, year, month)
+
+        # 이월 근무는 직전 달 저장본에서 이름으로 찾으므로 저장본의 이름도 바꿈
         try:
-            region = tree.identify_region(event.x, event.y)
-            if region != "heading":
-                column_id = tree.identify_column(event.x)
-                item_id = tree.identify_row(event.y)
-            else:
-                return
+            self.rename_worker_in_prev_month(year, month, old_name, new_name)
+        except Exception as e:
+            logging.error(f"rename_worker_in_prev_month: {e}")
+        if old_name in self.prev_month_last_day_duties:
+            self.prev_month_last_day_duties[new_name] = self.prev_month_last_day_duties.pop(old_name)
+
+        self.leave_ledger.rename_worker(old_name, new_name)
+        self.display_initial_schedule_table()
 
-            if column_id != '#1': return
+    def start_worker_name_edit(self, event):
+        grid = self.schedule_grid
+        try:
+            cell = grid.cell_at(event.x, event.y)
+            if cell is None: return
+            row, col = cell
+            if col != -1 or not 0 <= row < len(grid.row_labels): return
 
-            old_name = tree.item(item_id, 'values')[0]
+            old_name = grid.row_labels[row]
 
             new_name = simpledialog.askstring(
                 "근무자 이름 수정",
@@ -479,35 +676,7 @@ class ScheduleApp:
                     messagebox.showwarning("중복", f"이미 존재하는 근무자 이름입니다: '{fixed_new_name}'")
                     return
 
-                old_index = self.worker_names.index(old_name)
-                self.worker_names[old_index] = fixed_new_name
-                self.save_worker_names()
-
-                # worker_categories_map 업데이트
-                if old_name in self.worker_categories_map:
-                    category = self.worker_categories_map.pop(old_name)
-                    self.worker_categories_map[fixed_new_name] = category
-                    self.save_worker_categories()
-
-                # DataFrame Index 업데이트
-                if not self.current_schedule_df.empty:
-                    self.current_schedule_df = self.current_schedule_df.rename(index={old_name: fixed_new_name})
-                    year, month = self.year_var.get(), self.month_var.get()
-                    self.save_current_schedule_to_memory(self.current_schedule_df, year, month)
-
-                # 이전 달 근무 기록 업데이트
-                if old_name in self.prev_month_last_day_duties:
-                    duty = self.prev_month_last_day_duties.pop(old_name)
-                    self.prev_month_last_day_duties[fixed_new_name] = duty
-
-                # 연차 맵 키 업데이트
-                if old_name in self.annual_vacations:
-                    vac = self.annual_vacations.pop(old_name)
-                    self.annual_vacations[fixed_new_name] = vac
-                    self.save_annual_vacations()
-
-                # UI 새로고침
-                self.display_initial_schedule_table()
+                self.rename_worker(old_name, fixed_new_name)
                 messagebox.showinfo("성공", f"'{old_name}'이(가) '{fixed_new_name}'(으)로 수정되었습니다.")
 
         except IndexError:
@@ -545,89 +714,129 @@ class ScheduleApp:
                 day_columns.append(f"{month}/{day} (?)")
         return year, month, last_day, day_columns
 
+    def show_schedule_message(self, text, pady=20):
+        """근무표 영역에 안내 문구만 표시 (그리드는 숨겨 두었다가 다음 월에 재사용)"""
+        self.remove_schedule_editor()
+        self.current_month = self.coverage_counter = None
+        if self.schedule_grid is not None:
+            self.schedule_grid.pack_forget()
+        if self.schedule_message is None:
+            self.schedule_message = tk.Label(self.schedule_frame, font=('Malgun Gothic', 14))
+        self.schedule_message.config(text=text)
+        self.schedule_message.pack(pady=pady)
+
+    def _schedule_grid_view(self):
+        """근무표 그리드를 한 번만 만들고 이후에는 같은 위젯을 다시 채워 사용"""
+        if self.schedule_grid is None:
+            grid = ScheduleGrid(self.schedule_frame, on_scroll=self.remove_schedule_editor)
+            grid.canvas.bind("<Button-1>", self.start_schedule_edit)
+            grid.canvas.bind("<Double-1>", self.start_worker_name_edit)
+            grid.canvas.bind("<B1-Motion>", self.on_schedule_drag)
+            grid.canvas.bind("<Shift-Button-1>", self.on_schedule_shift_click)
+            grid.canvas.bind("<Button-3>", self.show_schedule_context_menu)
+            grid.canvas.bind("<Control-c>", self.copy_selection)
+            grid.canvas.bind("<Control-v>", self.paste_clipboard)
+            grid.canvas.bind("<Key>", self.on_schedule_key)
+            self.schedule_grid = grid
+        if self.schedule_message is not None:
+            self.schedule_message.pack_forget()
+        if not self.schedule_grid.winfo_manager():
+            self.schedule_grid.pack(fill='both', expand=True)
+        return self.schedule_grid
+
     def display_schedule_table(self, df, year, month):
-        for widget in self.schedule_frame.winfo_children(): widget.destroy()
         if df.empty:
-            tk.Label(self.schedule_frame, text="근무표 데이터가 없습니다.", font=('Malgun Gothic', 14)).pack(pady=20); return
-
-        style = ttk.Style()
-        style.configure("Custom.Treeview.Heading", background="white", foreground="#A9A9A9", font=('Malgun Gothic', 10, 'bold'))
-        style.configure("Treeview", rowheight=25)
-        style.configure("N.cell", foreground="#FF0000", font=('Malgun Gothic', 10, 'bold'))
-        style.configure("Weekend.bg", background="#FFFBE0")
-
-        tree_frame = ttk.Frame(self.schedule_frame); tree_frame.pack(fill='both', expand=True)
-        tree_scroll_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL); tree_scroll_y.pack(side='right', fill='y')
-        tree_scroll_x = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL); tree_scroll_x.pack(side='bottom', fill='x')
-
-        columns = ["근무자"] + list(df.columns)
-        tree = ttk.Treeview(tree_frame, columns=columns, show='headings',
-                            yscrollcommand=tree_scroll_y.set,
-                            xscrollcommand=tree_scroll_x.set)
-
-        def remove_editor_widget(*args):
-            if hasattr(tree, 'editor_widget') and tree.editor_widget.winfo_exists():
-                tree.editor_widget.destroy()
-
-        tree_scroll_y.config(command=lambda *args: (remove_editor_widget(), tree.yview(*args)))
-        tree_scroll_x.config(command=lambda *args: (remove_editor_widget(), tree.xview(*args)))
-        tree.bind("<MouseWheel>", lambda e: (remove_editor_widget(), tree.yview_scroll(int(-1*(e.delta/120)), "units")))
-
-        for col in df.columns:
-            day_and_weekday = col.split('/', 1)[-1].strip()
-            tree.heading(col, text=day_and_weekday, anchor='center'); tree.column(col, width=60, anchor='center', stretch=tk.NO)
-        tree.heading("근무자", text="근무자", anchor='center'); tree.column("근무자", width=100, anchor='center', stretch=tk.NO)
-
-        for worker_index, (worker, row) in enumerate(df.iterrows()):
-            item_id = tree.insert('', 'end', values=[worker] + row.tolist(), tags=(worker,))
-            for col_index, duty in enumerate(row):
-                col_name = df.columns[col_index]
-                weekday = col_name.split('(')[-1].replace(')', '')
-                tags_to_apply = []
-                if weekday in ['토', '일']:
-                    tags_to_apply.append('Weekend.bg')
-                if duty == 'N':
-                    tags_to_apply.append('N.cell')
-                for tag in tags_to_apply:
-                    current_tags = tree.item(item_id, 'tags')
-                    if tag not in current_tags:
-                        tree.item(item_id, tags=current_tags + (tag,))
+            self.show_schedule_message("근무표 데이터가 없습니다."); return
 
-        tree.pack(fill='both', expand=True)
+        self.remove_schedule_editor()
+        grid = self._schedule_grid_view()
 
-        tree.bind("<Button-1>", self.start_schedule_edit)
-        tree.bind("<Double-1>", self.start_worker_name_edit)
-
-        self.month_label_text.set(f"🗓️ {year}년 {month}월 근무표")
-        self.current_tree = tree
-
-    def display_summary_table(self, summary_df):
-        for widget in self.summary_frame.winfo_children(): widget.destroy()
-        if summary_df.empty:
-            tk.Label(self.summary_frame, text="근무표 생성 후\n통계가 표시됩니다.", font=('Malgun Gothic', 12), bg='white').pack(pady=100, padx=50); return
-        ttk.Style().configure("Summary.Treeview.Heading", background="#E8F0FE", foreground="#333333", font=('Malgun Gothic', 9, 'bold'))
-        tk.Label(self.summary_frame, text="근무 합산 통계", font=('Malgun Gothic', 12, 'bold'), bg='white').pack(pady=(0, 5))
-        tree_frame = ttk.Frame(self.summary_frame); tree_frame.pack(fill='both', expand=True)
-        columns = list(summary_df.columns)
+        # 그리드는 코드 행렬과 수동 편집 마스크를 직접 참조하여 보이는 칸만 칸 단위 색으로 그림
+        # 일별 인원 충족 현황 (DAILY_LIMITS 미달인 날은 ⚠ 표시) — 미리 준비된 월이면 DataFrame에서 다시 만들지 않음
+        prepared, self.prepared_display = self.prepared_display, None
+        if prepared is not None:
+            em, self.coverage_counter = prepared
+        else:
+            em = EncodedMonth.from_dataframe(df, year, month, self.manual_edited_cells)
+            self.coverage_counter = CoverageCounter(em, DAILY_LIMITS, WEEKEND_DAILY_LIMITS)
+        shortfall = self.coverage_counter.shortfall().any(axis=0)
+        grid.set_data(em.workers, list(df.columns), em.codes, em.manual, weekend_mask(year, month),
+                      COVERAGE_ROW_LABEL, self.coverage_counter.labels(), shortfall)
+
+        self.current_month = em
+        self.refresh_coverage_status(year, month)
+
+    def remove_schedule_editor(self):
+        """칸 편집 Combobox를 숨김 (위젯은 다음 편집에 재사용)"""
+        if self.cell_editor is not None:
+            self.cell_editor.place_forget()
+        self.editor_cell = None
+
+    def refresh_coverage_status(self, year, month, days=()):
+        """인원 현황 행의 days 칸과 월 제목의 부족 일수를 갱신"""
+        grid, counter = self.schedule_grid, self.coverage_counter
+        if grid is None or counter is None:
+            return
+        short = counter.shortfall().any(axis=0)
+        for day in days:
+            grid.set_footer_cell(day, counter.label(day), bool(short[day]))
+        short_days = counter.short_days()
+        status = f"  ·  ⚠ 인원 부족 {len(short_days)}일" if len(short_days) else ""
+        self.month_label_text.set(f"🗓️ {year}년 {month}월 근무표{status}")
+
+    def _summary_table_view(self, columns):
+        """통계 표 위젯을 한 번만 만들어 두고 재사용 (열 구성이 바뀐 경우에만 다시 만듦)"""
+        view = self.summary_view
+        if view is not None and view['columns'] == columns:
+            return view
+        if view is not None:
+            for widget in (view['message'], view['title'], view['frame']): widget.destroy()
+            self.summary_tree = None
+        message = tk.Label(self.summary_frame, text="근무표 생성 후\n통계가 표시됩니다.", font=('Malgun Gothic', 12), bg='white')
+        title = tk.Label(self.summary_frame, text="근무 합산 통계", font=('Malgun Gothic', 12, 'bold'), bg='white')
+        tree_frame = ttk.Frame(self.summary_frame)
         tree = ttk.Treeview(tree_frame, columns=columns, show='headings', style="Summary.Treeview")
         column_widths = {'근무자': 80, '직책/구분': 70, '전월 연차': 60, '총 연차': 60, '총 근무': 60, 'D': 40, 'E': 40, 'MD': 40, 'N': 40, 'DH': 40, 'Off': 40, 'V': 40, 'v.25': 40, 'v.0.5': 40, '주말_근무': 60}
         for col in columns:
             tree.heading(col, text=col.replace('_', ' '), anchor='center')
             tree.column(col, width=column_widths.get(col, 50), anchor='center', stretch=tk.NO)
-        for index, row in summary_df.iterrows(): tree.insert('', 'end', values=row.tolist())
         tree.pack(fill='both', expand=True)
+        self.summary_view = {'columns': columns, 'message': message, 'title': title, 'frame': tree_frame, 'tree': tree}
+        return self.summary_view
+
+    def display_summary_table(self, summary_df):
+        view = self._summary_table_view(list(summary_df.columns) if not summary_df.empty else (self.summary_view or {}).get('columns', []))
+        tree = view['tree']
+        if summary_df.empty:
+            self.summary_counter = self.summary_tree = None
+            view['title'].pack_forget(); view['frame'].pack_forget()
+            view['message'].pack(pady=100, padx=50); return
+
+        # 근무자 구성이 같으면 기존 행의 값만 바꾸고, 다르면 행을 다시 넣음
+        rows = list(summary_df.itertuples(index=False, name=None))
+        if list(tree.get_children()) == [str(row[0]) for row in rows]:
+            for row in rows: tree.item(str(row[0]), values=list(row))
+        else:
+            tree.delete(*tree.get_children())
+            for row in rows: tree.insert('', 'end', iid=row[0], values=list(row))
+        if self.summary_tree is None:
+            view['message'].pack_forget()
+            view['title'].pack(pady=(0, 5))
+            view['frame'].pack(fill='both', expand=True)
+        self.summary_tree = tree
 
     def display_initial_schedule_table(self):
+        self.flush_pending_save()
         try:
-            selected_year, selected_month = self.year_var.get(), self.month_var.get()
+            selected_year, selected_month = self.normalize_month_vars()
         except:
             return
         if not self.worker_names:
-            for widget in self.schedule_frame.winfo_children(): widget.destroy()
-            tk.Label(self.schedule_frame, text="근무자 관리 메뉴에서 근무자를 먼저 추가해 주세요.", font=('Malgun Gothic', 14)).pack(pady=100)
+            self.show_schedule_message("근무자 관리 메뉴에서 근무자를 먼저 추가해 주세요.", pady=100)
             self.month_label_text.set(f"🗓️ {selected_year}년 {selected_month}월 근무표")
             return
 
+        self.prepared_display = None
         loaded_df, loaded_manual_edits = self.load_schedule_from_memory(selected_year, selected_month)
         year, month, last_day, day_columns = self.get_month_days(selected_year, selected_month)
 
@@ -635,11 +844,14 @@ class ScheduleApp:
             self.current_schedule_df = loaded_df
             self.manual_edited_cells = loaded_manual_edits
             if list(self.current_schedule_df.index) != self.worker_names:
-                loaded_df = None
-                self.current_schedule_df = pd.DataFrame()
-                self.manual_edited_cells.clear()
+                # 저장본의 명단이 다르면(다른 곳에서 추가/이름 변경된 근무자, 명단 변경 이전의 달) 비우지 않고
+                # 현재 명단 순서로 맞추고 명단에 없는 근무자 행은 뒤에 유지 — 다음 저장이 저장본을 지우지 않도록 함
+                extras = [name for name in loaded_df.index if name not in self.worker_names]
+                self.prepared_display = None
+                self.current_schedule_df = loaded_df.reindex(self.worker_names + extras, fill_value='')
 
         if loaded_df is None:
+            self.prepared_display = None
             self.manual_edited_cells.clear()
             initial_data = {name: [''] * len(day_columns) for name in self.worker_names}
             df_initial = pd.DataFrame(initial_data).transpose(); df_initial.columns = day_columns
@@ -653,6 +865,63 @@ class ScheduleApp:
             self.current_summary_df = pd.DataFrame()
 
         self.display_summary_table(self.current_summary_df)
+        self.prefetch_adjacent_months(year, month)
+
+    def request_month_display(self):
+        """연/월 변경을 NAVIGATION_DEBOUNCE_MS 동안 모아서 마지막 월만 표시하도록 예약 (중간 월은 불러오지 않음)"""
+        if self.nav_after_id is not None:
+            self.root.after_cancel(self.nav_after_id)
+        try:
+            year, month = divmod(self.year_var.get() * 12 + self.month_var.get() - 1, 12)
+            self.month_label_text.set(f"🗓️ {year}년 {month + 1}월 근무표")
+        except Exception:
+            pass
+        self.nav_after_id = self.root.after(NAVIGATION_DEBOUNCE_MS, self.apply_month_navigation)
+
+    def normalize_month_vars(self):
+        """예약된 월 이동을 취소하고 연/월 변수를 정규화해 (연, 월)로 반환 (표시는 하지 않음)"""
+        if self.nav_after_id is not None:
+            self.root.after_cancel(self.nav_after_id)
+            self.nav_after_id = None
+        current_year, current_month = self.year_var.get(), self.month_var.get()
+
+        # 1~12를 벗어난 월은 연도와 함께 한 번에 정규화 (여러 번 눌러 0, -1, 13, 14가 되어도 그만큼 이동)
+        year, month = divmod(current_year * 12 + current_month - 1, 12)
+        month += 1
+        if (year, month) != (current_year, current_month):
+            self.nav_suppress = True
+            try:
+                self.year_var.set(year)
+                self.month_var.set(month)
+            finally:
+                self.nav_suppress = False
+        return year, month
+
+    def apply_month_navigation(self):
+        self.nav_after_id = None
+        try: self.normalize_month_vars()
+        except Exception: return
+
+        try: self.display_initial_schedule_table()
+        except Exception as e: logging.error(f"[apply_month_navigation] {e}")
+
+    def selected_year_month(self):
+        """연/월을 읽는 동작의 입구 — 예약된 월 이동이 있으면 바로 적용해 표시한 뒤 정규화된 (연, 월)을 반환
+
+        이동 대기 중(NAVIGATION_DEBOUNCE_MS)에 생성/초기화 등을 누르면 월 변수가 13, 0처럼 정규화되기 전이거나
+        화면의 월과 다를 수 있으므로 먼저 이동을 끝낸다.
+        """
+        if self.nav_after_id is not None:
+            self.root.after_cancel(self.nav_after_id)
+            self.apply_month_navigation()
+        return self.year_var.get(), self.month_var.get()
+
+    def displayed_year_month(self):
+        """근무표 그리드가 표시 중인 (연, 월) — 편집 후 통계 갱신 등 화면의 월 기준 작업에 사용"""
+        em = self.current_month
+        if em is not None:
+            return em.year, em.month
+        return self.selected_year_month()
 
     def go_to_current_month(self):
         now = datetime.datetime.now()
@@ -661,143 +930,362 @@ class ScheduleApp:
         messagebox.showinfo("이동 완료", f"현재 날짜인 {now.year}년 {now.month}월로 이동했습니다.")
 
     def load_and_display_data_after_startup(self):
-        self.load_all_schedules()
         self.display_initial_schedule_table()
 
     def generate_schedule_summary(self, df_schedule, year, month):
-        if df_schedule.empty: return pd.DataFrame()
-
-        DUTY_TYPES = ['D', 'E', 'N', 'MD', 'DH', 'Off', 'V', 'v.25', 'v.0.5']
-        summary_df = df_schedule.stack().groupby(level=0).value_counts().unstack(fill_value=0)
-        summary_df['Off'] = summary_df.get('O', 0) + summary_df.get('Off', 0)
-        summary_df = summary_df.drop(columns=['O'], errors='ignore')
-
-        for col in DUTY_TYPES:
-            if col not in summary_df.columns: summary_df[col] = 0
+        """근무 코드 행렬에서 근무자별 통계를 계산 (근무자 행마다 bincount, 주말 마스크, 원장 잔여 연차)
 
-        summary_df = summary_df.reset_index(names=['근무자'])
-        summary_df['직책/구분'] = summary_df['근무자'].apply(lambda name: self.worker_categories_map.get(name, DEFAULT_CATEGORY))
+        계산한 카운터는 self.summary_counter로 유지되어 셀 편집 시 해당 행만 갱신된다.
+        """
+        if df_schedule.empty: return pd.DataFrame()
 
-        weekend_cols = [col for col in df_schedule.columns if '(토)' in col or '(일)' in col]
-        if weekend_cols:
-            summary_df['주말_근무'] = df_schedule[weekend_cols].apply(lambda row: row.astype(str).str.contains('|'.join(WORK_DUTIES)).sum(), axis=1).values
+        em = EncodedMonth.from_dataframe(df_schedule, year, month)
+        # '총 연차': 연차 원장 기준 해당 연도 잔여 연차 (저장된 월 근무표 사용량 반영)
+        balances = self.leave_ledger.balances(year, em.workers)
+        # '전월 연차': 전월 말까지의 잔여 연차 (1월은 해당 연도 부여량)
+        prev_balances = self.leave_ledger.balances(year, em.workers, upto_month=month - 1)
+        self.summary_counter = SummaryCounter(em, self.worker_categories_map, total_leave=balances, prev_leave=prev_balances)
+        return self.summary_counter.frame()
+
+    def refresh_summary_rows(self, workers):
+        """통계 카운터에 반영된 변경을 통계 표의 workers 행에만 다시 표시 (표가 없으면 전체 계산)"""
+        counter, tree = self.summary_counter, self.summary_tree
+        if counter is None or tree is None or not all(w in counter for w in workers):
+            year, month = self.displayed_year_month()
+            self.current_summary_df = self.generate_schedule_summary(self.current_schedule_df, year, month)
+            self.display_summary_table(self.current_summary_df)
+            return
+        for worker in workers:
+            tree.item(worker, values=counter.row(counter.row_of[worker]))
+
+    def apply_cell_changes(self, changes, label='편집', record=True, defer_save=False):
+        """(행, 열, 새 근무[, 수동 편집]) 목록을 한 번의 편집으로 적용하고 실제로 바뀐 (행, 열, 이전, 새) 목록을 반환
+
+        칸마다 DataFrame / 코드 행렬 / 수동 편집 / 통계 카운터를 갱신한 뒤, 저장(연차 원장 갱신 포함)은 한 번,
+        통계 표와 인원 현황은 바뀐 근무자 행과 날짜만 한 번씩 다시 표시한다.
+        수동 편집 여부를 주지 않으면 빈 칸이 아닌 근무를 수동 편집으로 본다. record=True면 실행 취소 기록에 남긴다.
+        defer_save=True면 저장을 KEYBOARD_SAVE_DELAY_MS 뒤로 미뤄 연속 입력을 한 번에 저장한다.
+        """
+        em, df = self.current_month, self.current_schedule_df
+        if em is None or df.empty:
+            return []
+        counter = self.summary_counter
+        applied, old_manual_flags, new_manual_flags = [], [], []
+        for change in changes:
+            row, col, new_value = change[:3]
+            new_value = normalize_duty(new_value)
+            old_value = normalize_duty(df.iat[row, col])
+            manual = bool(change[3]) if len(change) > 3 else new_value != ''
+            old_manual = bool(em.manual[row, col])
+            if old_value == new_value and old_manual == manual:
+                continue
+            edit_key = (em.workers[row], df.columns[col])
+            if manual:
+                self.manual_edited_cells.add(edit_key)
+            else:
+                self.manual_edited_cells.discard(edit_key)
+
+            # 데이터프레임과 그리드가 참조하는 코드 행렬에 반영 (연차 사용량은 저장 시 원장 집계에 반영됨)
+            old_code, new_code = DUTY_INDEX[old_value], DUTY_INDEX[new_value]
+            df.iat[row, col] = new_value
+            em.codes[row, col], em.manual[row, col] = new_code, manual
+            if self.coverage_counter is not None:
+                self.coverage_counter.apply(col, old_code, new_code)
+            if counter is not None and edit_key[0] in counter:
+                counter.apply(edit_key[0], col, old_code, new_code)
+            self.schedule_grid.refresh_cell(row, col)
+            applied.append((row, col, old_value, new_value))
+            old_manual_flags.append(old_manual)
+            new_manual_flags.append(manual)
+        if not applied:
+            return applied
+
+        year, month = em.year, em.month
+        delta = None
+        if record:
+            rows, cols, old_values, new_values = zip(*applied)
+            delta = CellDelta(em.key, em.workers, label, rows, cols,
+                              [DUTY_INDEX[v] for v in old_values], [DUTY_INDEX[v] for v in new_values],
+                              old_manual_flags, new_manual_flags)
+        if defer_save:
+            # 편집 기록은 예약된 저장이 성공한 뒤 save_current_schedule_to_memory에서 남김
+            if delta is not None:
+                self.pending_history.append(delta)
+            self.schedule_pending_save(em.key)
         else:
-            summary_df['주말_근무'] = 0
-
-        summary_df['총 근무'] = summary_df[['D', 'E', 'MD', 'N', 'DH']].sum(axis=1)
-        summary_df['전월 연차'] = 2.0
-
-        # 🔵 NEW: '총 연차' 계산 (파일에 저장된 연차 - 사용 연차)
-        def remaining_vac(name):
-            base = self.annual_vacations.get(name, 21.5)
-            # 안전하게 컬럼 존재 및 단일값 추출
-            v_cnt = int(summary_df.loc[summary_df['근무자'] == name, 'V'].values[0]) if 'V' in summary_df.columns else 0
-            v25_cnt = int(summary_df.loc[summary_df['근무자'] == name, 'v.25'].values[0]) if 'v.25' in summary_df.columns else 0
-            v05_cnt = int(summary_df.loc[summary_df['근무자'] == name, 'v.0.5'].values[0]) if 'v.0.5' in summary_df.columns else 0
-            used = v_cnt + v25_cnt * 0.25 + v05_cnt * 0.5
-            return round(base - used, 2)
-
-        summary_df['총 연차'] = summary_df['근무자'].apply(remaining_vac)
-
-        final_cols = ['근무자', '직책/구분', '전월 연차', '총 연차', '총 근무', 'D', 'E', 'DH', 'MD', 'N', 'Off', 'V', 'v.25', 'v.0.5', '주말_근무']
-        return summary_df.reindex(columns=final_cols)
-
-    def update_schedule_cell(self, event, tree, combobox, item_id, column_id, col_name, worker_name):
-        """Combobox 선택 후 Treeview와 DataFrame을 업데이트, 수동 편집 추적 및 연차 차감 처리"""
-        new_value = combobox.get()
-        col_name_df = tree.heading(column_id)['text']
-        if col_name_df == '근무자': return
+            saved = self.save_current_schedule_to_memory(df, year, month)
+            if delta is not None and saved is not None:
+                self.edit_history.record(delta)
+        self.refresh_coverage_status(year, month, sorted({col for _, col, _, _ in applied}))
+        self.refresh_summary_rows([em.workers[r] for r in sorted({row for row, _, _, _ in applied})])
+        return applied
+
+    def undo_last_edit(self, event=None):
+        """현재 월의 마지막 편집을 되돌림 (Ctrl+Z)"""
+        self._replay_history(undo=True)
+        return 'break'
+
+    def redo_last_edit(self, event=None):
+        """되돌린 편집을 다시 적용 (Ctrl+Y)"""
+        self._replay_history(undo=False)
+        return 'break'
+
+    def _replay_history(self, undo):
+        # 저장이 미뤄진 키보드 입력을 먼저 저장해 기록에 포함시킴
+        self.flush_pending_save()
+        em = self.current_month
+        if em is None:
+            return
+        delta = self.edit_history.undo(em.key) if undo else self.edit_history.redo(em.key)
+        if delta is None:
+            return
+        if delta.workers != tuple(em.workers):
+            # 근무자 명단이 바뀌어 행 위치가 달라졌으므로 이 월의 기록은 더 이상 적용할 수 없음
+            self.edit_history.forget(em.key)
+            messagebox.showinfo("실행 취소", "근무자 명단이 바뀌어 이전 편집 기록을 적용할 수 없습니다.")
+            return
+        self.remove_schedule_editor()
+        self.apply_cell_changes(delta.changes(undo=undo), record=False)
 
-        edit_key = (worker_name, col_name)
+    def update_schedule_cell(self, event=None):
+        """칸 편집 Combobox의 선택 값을 칸 하나짜리 편집으로 적용"""
+        cell = self.editor_cell
+        if cell is None:
+            return
+        new_value = self.cell_editor.get()
+        self.remove_schedule_editor()
+        self.apply_cell_changes([(cell[0], cell[1], new_value)])
+        self.schedule_grid.canvas.focus_set()
 
-        if new_value != '':
-            self.manual_edited_cells.add(edit_key)
+    # ------------------------------------------------------------------
+    # [키보드 입력]
+    # ------------------------------------------------------------------
+    def schedule_pending_save(self, key):
+        """키보드 입력 저장을 예약 (입력이 이어지면 예약을 미뤄 한 번만 저장)"""
+        self.pending_save_key = key
+        if self.pending_save_after_id is not None:
+            self.root.after_cancel(self.pending_save_after_id)
+        self.pending_save_after_id = self.root.after(KEYBOARD_SAVE_DELAY_MS, self.flush_pending_save)
+
+    def flush_pending_save(self):
+        """미뤄 둔 키보드 입력을 지금 저장 (월 이동, 다른 인스턴스 확인, 종료 전에 호출)"""
+        if self.pending_save_after_id is not None:
+            self.root.after_cancel(self.pending_save_after_id)
+            self.pending_save_after_id = None
+        key, em = self.pending_save_key, self.current_month
+        if key is None:
+            return
+        if em is not None and em.key == key:
+            self.save_current_schedule_to_memory(self.current_schedule_df, em.year, em.month)
         else:
-            if edit_key in self.manual_edited_cells:
-                self.manual_edited_cells.remove(edit_key)
-
-        # 이전 값(변경 전 셀 값)을 안전하게 얻기
-        old_value = ''
-        if not self.current_schedule_df.empty and worker_name in self.current_schedule_df.index and col_name in self.current_schedule_df.columns:
-            old_value = str(self.current_schedule_df.loc[worker_name, col_name])
-
-        # 트리뷰와 데이터프레임 업데이트
-        tree.set(item_id, column_id, new_value)
-
-        if not self.current_schedule_df.empty and worker_name in self.current_schedule_df.index and col_name in self.current_schedule_df.columns:
-            # 연차 사용량 변화 계산 (새로운 값 - 이전 값)
-            def used_amount(val):
-                if val == 'V': return 1.0
-                if val == 'v.25': return 0.25
-                if val == 'v.0.5': return 0.5
-                return 0.0
-
-            old_used = used_amount(old_value)
-            new_used = used_amount(new_value)
-            delta = new_used - old_used  # 양수면 더 사용한 것(차감), 음수면 환원
-
-            # 데이터프레임에 값 적용
-            self.current_schedule_df.loc[worker_name, col_name] = new_value
-
-            # 연차 차감/환원 적용
-            if delta != 0:
-                # 해당 근무자의 남은 연차가 없으면 0 이하로 내려가지 않도록 처리(단, 환원은 허용)
-                prev_remaining = self.annual_vacations.get(worker_name, 21.5)
-                new_remaining = prev_remaining - delta
-                # 음수 방지: 만약 차감으로 인해 음수가 되면 0으로 제한
-                if new_remaining < 0:
-                    new_remaining = 0.0
-                # 반올림(소수 둘째자리)
-                self.annual_vacations[worker_name] = round(new_remaining, 2)
-                self.save_annual_vacations()
-
-            year, month = self.year_var.get(), self.month_var.get()
-            self.save_current_schedule_to_memory(self.current_schedule_df, year, month)
+            self.pending_save_key = None
+            self.pending_history = []
+
+    def keyboard_duty(self, event):
+        """근무 입력 키면 근무 문자열('' = 비우기), 아니면 None"""
+        if event.keysym in ('Delete', 'BackSpace'):
+            return ''
+        return KEYBOARD_DUTY_KEYS.get(event.char.lower()) or KEYBOARD_DUTY_KEYS.get(event.keysym.lower())
+
+    def on_cell_editor_key(self, event):
+        """목록 편집 중에도 근무 키 / 좌우·Tab 이동은 바로 키보드 입력으로 처리
+
+        위/아래, Enter, Esc와 그 밖의 키는 목록이 처리하도록 편집기를 닫지 않는다.
+        """
+        if event.state & 0x4:
+            return None
+        is_move = event.keysym in KEYBOARD_MOVES and event.keysym not in CELL_EDITOR_LIST_KEYS
+        if not is_move and self.keyboard_duty(event) is None:
+            return None
+        self.remove_schedule_editor()
+        self.schedule_grid.canvas.focus_set()
+        return self.on_schedule_key(event)
+
+    def on_schedule_key(self, event):
+        """근무표 키보드 입력: 방향키로 이동(Shift는 범위 확장), 근무 키는 바로 입력 후 다음 칸, Enter/F2는 목록 편집"""
+        grid = self.schedule_grid
+        if grid is None or self.current_month is None or event.state & 0x4:
+            return None  # Ctrl 조합은 복사/붙여넣기/실행 취소 바인딩으로 넘김
+        num_rows, num_cols = self.current_month.codes.shape
+        if grid.cursor is None:
+            grid.select(0, 0)
+        row, col = grid.cursor
+        keysym = event.keysym
+
+        if keysym in KEYBOARD_MOVES:
+            shift = bool(event.state & 0x1)
+            d_row, d_col = KEYBOARD_MOVES[keysym]
+            if keysym == 'Tab' and shift:
+                d_col = -1
+            grid.select(row + d_row, col + d_col, extend=shift and keysym not in ('Tab', 'ISO_Left_Tab'))
+            grid.see(*grid.cursor)
+            return 'break'
+        if keysym in ('Return', 'F2'):
+            self.open_cell_editor(row, col)
+            return 'break'
+        value = self.keyboard_duty(event)
+        if value is None:
+            return None
+
+        selected = self.selected_range()
+        if selected is not None and (len(selected[0]) > 1 or len(selected[1]) > 1):
+            # 범위가 선택되어 있으면 범위 전체 채우기
+            self.apply_cell_changes([(r, c, value) for r in selected[0] for c in selected[1]], label='채우기', defer_save=True)
+            return 'break'
+        self.apply_cell_changes([(row, col, value)], label='키보드 입력', defer_save=True)
+        # 다음 날짜로 이동 (월말이면 다음 근무자의 1일)
+        if col + 1 < num_cols:
+            grid.select(row, col + 1)
+        elif row + 1 < num_rows:
+            grid.select(row + 1, 0)
+        grid.see(*grid.cursor)
+        return 'break'
 
-            if col_name in self.current_schedule_df.columns[-5:]:
-                self.save_prev_month_schedule()
-
-            if self.summary_frame:
-                self.current_summary_df = self.generate_schedule_summary(self.current_schedule_df, year, month)
-                self.display_summary_table(self.current_summary_df)
-
-        combobox.destroy()
-        # 태그 갱신을 위해 재표시
-        self.display_schedule_table(self.current_schedule_df, self.year_var.get(), self.month_var.get())
+    # ------------------------------------------------------------------
+    # [범위 선택 / 채우기 / 붙여넣기]
+    # ------------------------------------------------------------------
+    def on_schedule_drag(self, event):
+        """마우스를 끌어 선택 범위를 넓힘"""
+        grid = self.schedule_grid
+        if grid is None or grid.anchor is None or self.current_month is None:
+            return
+        cell = grid.body_cell_at(event.x, event.y)
+        if cell != grid.cursor:
+            self.remove_schedule_editor()
+            grid.select(*cell, extend=True)
+            grid.canvas.focus_set()
+
+    def on_schedule_shift_click(self, event):
+        """Shift+클릭으로 선택 시작 칸부터 클릭한 칸까지 선택"""
+        grid = self.schedule_grid
+        cell = grid.cell_at(event.x, event.y) if grid is not None and self.current_month is not None else None
+        if cell is None or cell[0] < 0 or cell[1] < 0 or cell[0] == grid.footer_row:
+            return
+        self.remove_schedule_editor()
+        grid.select(*cell, extend=True)
+        grid.canvas.focus_set()
+
+    def selected_range(self):
+        """선택 범위의 (행 range, 열 range) — 선택이 없으면 None"""
+        grid = self.schedule_grid
+        selected = grid.selection() if grid is not None and self.current_month is not None else None
+        if selected is None:
+            return None
+        r0, c0, r1, c1 = selected
+        return range(r0, r1 + 1), range(c0, c1 + 1)
+
+    def fill_selection(self, value):
+        """선택 범위의 모든 칸을 value로 채움 (한 번의 저장)"""
+        selected = self.selected_range()
+        if selected is None:
+            return
+        rows, cols = selected
+        self.apply_cell_changes([(r, c, value) for r in rows for c in cols], label='채우기')
+
+    def copy_selection(self, event=None):
+        """선택 범위를 탭/줄바꿈으로 구분한 문자열로 클립보드에 복사"""
+        selected = self.selected_range()
+        if selected is not None:
+            rows, cols = selected
+            block = self.current_schedule_df.iloc[rows.start:rows.stop, cols.start:cols.stop]
+            self.root.clipboard_clear()
+            self.root.clipboard_append('\n'.join('\t'.join(normalize_duty(v) for v in line) for line in block.values.tolist()))
+        return 'break'
+
+    def paste_clipboard(self, event=None):
+        """클립보드의 탭 구분 근무 블록을 선택 범위 왼쪽 위부터 붙여넣음 (값 하나면 선택 범위 전체 채우기)"""
+        selected = self.selected_range()
+        if selected is None:
+            return 'break'
+        try:
+            text = self.root.clipboard_get()
+        except tk.TclError:
+            return 'break'
+        label_table = build_label_table(EDITABLE_SHIFTS)
+        block, invalid = [], []
+        for line in text.replace('\r\n', '\n').rstrip('\n').split('\n'):
+            codes = []
+            for label in line.split('\t'):
+                code = label_table.get(label.strip())
+                if code is None:
+                    invalid.append(label)
+                codes.append(code)
+            block.append(codes)
+        if invalid:
+            messagebox.showwarning("붙여넣기", f"허용되지 않은 근무가 있어 붙여넣지 않았습니다: {', '.join(repr(v) for v in invalid[:5])}")
+            return 'break'
+
+        rows, cols = selected
+        if len(block) == 1 and len(block[0]) == 1:
+            changes = [(r, c, DUTY_CODES[block[0][0]]) for r in rows for c in cols]
+        else:
+            num_rows, num_cols = self.current_month.codes.shape
+            changes = [(rows.start + i, cols.start + j, DUTY_CODES[code])
+                       for i, line in enumerate(block) for j, code in enumerate(line)
+                       if rows.start + i < num_rows and cols.start + j < num_cols]
+        self.apply_cell_changes(changes, label='붙여넣기')
+        return 'break'
+
+    def show_schedule_context_menu(self, event):
+        """선택 범위 채우기 / 복사 / 붙여넣기 메뉴 (선택 밖을 누르면 그 칸을 선택)"""
+        grid = self.schedule_grid
+        cell = grid.cell_at(event.x, event.y) if grid is not None and self.current_month is not None else None
+        if cell is None or cell[0] < 0 or cell[1] < 0 or cell[0] == grid.footer_row:
+            return
+        self.remove_schedule_editor()
+        rows_cols = self.selected_range()
+        if rows_cols is None or cell[0] not in rows_cols[0] or cell[1] not in rows_cols[1]:
+            grid.select(*cell)
+        menu = tk.Menu(self.root, tearoff=0, bg='white', fg='#333333', activebackground='#F0F0F0', activeforeground=TOSS_BLUE,
+                       relief='flat', borderwidth=0, font=('Malgun Gothic', 10))
+        fill_menu = tk.Menu(menu, tearoff=0, bg='white', fg='#333333', activebackground='#F0F0F0', activeforeground=TOSS_BLUE,
+                            font=('Malgun Gothic', 10))
+        for duty in EDITABLE_SHIFTS:
+            fill_menu.add_command(label=duty or '(비우기)', command=lambda d=duty: self.fill_selection(d))
+        menu.add_cascade(label="선택 영역 채우기", menu=fill_menu)
+        menu.add_command(label="복사 (Ctrl+C)", command=self.copy_selection)
+        menu.add_command(label="붙여넣기 (Ctrl+V)", command=self.paste_clipboard)
+        menu.add_command(label="지우기 (Delete)", command=lambda: self.fill_selection(''))
+        try:
+            menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            menu.grab_release()
 
     def start_schedule_edit(self, event):
-        tree = self.current_tree
+        grid = self.schedule_grid
         try:
-            if hasattr(tree, 'editor_widget') and tree.editor_widget.winfo_exists():
-                tree.editor_widget.destroy()
-
-            region = tree.identify_region(event.x, event.y)
-            if region != "cell": return
-
-            column_id = tree.identify_column(event.x)
-            item_id = tree.identify_row(event.y)
-
-            if column_id == '#1': return
-
-            col_index = int(column_id.replace('#', '')) - 2
-            worker_name = tree.item(item_id, 'values')[0]
-
-            col_name_full = self.current_schedule_df.columns[col_index]
-            current_value = tree.set(item_id, column_id)
-            bbox = tree.bbox(item_id, column_id)
-            if not bbox: return
-            x, y, width, height = bbox
-
-            combobox = ttk.Combobox(tree, values=EDITABLE_SHIFTS, width=width, font=('Malgun Gothic', 10), state='readonly')
-            combobox.set(current_value)
-            combobox.place(x=x, y=y, width=width, height=height)
-            combobox.bind("<<ComboboxSelected>>", lambda e: self.update_schedule_cell(e, tree, combobox, item_id, column_id, col_name_full, worker_name))
-            combobox.bind("<FocusOut>", lambda e: combobox.destroy() if e.widget == combobox and not combobox.winfo_ismapped() else None)
-            combobox.bind("<Return>", lambda e: self.update_schedule_cell(e, tree, combobox, item_id, column_id, col_name_full, worker_name))
-            combobox.focus_set();
-            tree.editor_widget = combobox
+            self.remove_schedule_editor()
+            grid.canvas.focus_set()
+
+            cell = grid.cell_at(event.x, event.y)
+            if cell is None: return
+            row, col = cell
+            # 헤더, 근무자 이름 열, 인원 현황 행은 편집하지 않음
+            if row < 0 or col < 0 or row == grid.footer_row: return
+            grid.select(row, col)
+            self.open_cell_editor(row, col)
         except Exception as e: logging.error(f"[start_schedule_edit] {e}")
 
+    def open_cell_editor(self, row, col):
+        """(행, 열) 칸 위에 근무 선택 Combobox를 표시 (위젯은 한 번 만들어 재사용)"""
+        grid = self.schedule_grid
+        grid.see(row, col)
+        bbox = grid.cell_bbox(row, col)
+        if not bbox: return
+        x, y, width, height = bbox
+
+        if self.cell_editor is None:
+            combobox = ttk.Combobox(grid.canvas, values=EDITABLE_SHIFTS, font=('Malgun Gothic', 10), state='readonly')
+            combobox.bind("<<ComboboxSelected>>", self.update_schedule_cell)
+            combobox.bind("<Return>", self.update_schedule_cell)
+            combobox.bind("<Escape>", lambda e: (self.remove_schedule_editor(), grid.canvas.focus_set()))
+            combobox.bind("<Key>", self.on_cell_editor_key)
+            self.cell_editor = combobox
+        self.cell_editor.set(self.current_schedule_df.iat[row, col])
+        self.cell_editor.place(x=x, y=y, width=width, height=height)
+        self.cell_editor.focus_set()
+        self.editor_cell = (row, col)
+
     def generate_monthly_schedule(self, year, month):
         year, month, last_day, day_columns = self.get_month_days(year, month);
         if not self.worker_names: return pd.DataFrame(), year, month
@@ -926,7 +1414,7 @@ class ScheduleApp:
             date_obj = start_date + datetime.timedelta(days=day_index)
             weekday = date_obj.weekday()
             current_daily_limits = DAILY_LIMITS.copy()
-            if weekday >= 5: current_daily_limits['E'] = 1
+            if weekday >= 5: current_daily_limits.update(WEEKEND_DAILY_LIMITS)
 
             daily_duty_counts = {'D': 0, 'E': 0, 'N': 0, 'DH': 0}
 
@@ -1004,35 +1492,46 @@ class ScheduleApp:
         if not self.worker_names:
             messagebox.showwarning("경고", "근무자가 최소 1명 이상 등록되어야 합니다."); return
         try:
-            selected_year, selected_month = self.year_var.get(), self.month_var.get()
+            selected_year, selected_month = self.selected_year_month()
         except tk.TclError:
             messagebox.showerror("오류", "올바른 년도와 월을 선택해 주세요."); return
 
-        self.load_prev_month_schedule()
+        self.flush_pending_save()
+        self.load_prev_month_schedule(selected_year, selected_month)
+        before = self.current_month
 
         df_schedule, year, month = self.generate_monthly_schedule(selected_year, selected_month)
 
-        self.save_current_schedule_to_memory(df_schedule, year, month)
+        saved = self.save_current_schedule_to_memory(df_schedule, year, month)
 
         self.display_schedule_table(df_schedule, year, month)
+        self.record_month_diff(before, self.current_month, '근무표 생성' if saved is not None else None)
         summary_df = self.generate_schedule_summary(df_schedule, year, month)
         self.display_summary_table(summary_df)
 
         self.current_schedule_df = df_schedule
         self.current_summary_df = summary_df
 
-        self.save_prev_month_schedule()
+    def record_month_diff(self, before, after, label):
+        """근무표 생성 / 초기화 전후의 차이를 실행 취소 기록에 남김 (근무자 구성이 다르면 해당 월 기록을 비움)"""
+        if before is None or after is None or before.key != after.key:
+            return
+        if label is None or before.workers != after.workers:
+            self.edit_history.forget(after.key)
+            return
+        self.edit_history.record(diff_months(after.key, after.workers, before.codes, before.manual, after.codes, after.manual, label))
 
     def clear_schedule(self):
         if not self.worker_names: messagebox.showwarning("경고", "초기화할 근무자 명단이 없습니다."); return
         try:
-            year, month = self.year_var.get(), self.month_var.get()
+            year, month = self.selected_year_month()
             if not messagebox.askyesno("확인", f"{year}년 {month}월 근무표를 초기화하시겠습니까? (수동 편집 내용 포함)"): return
+            self.flush_pending_save()
+            before = self.current_month
 
-            key = f"{year}-{month:02d}"
-            if key in self.monthly_schedules:
-                del self.monthly_schedules[key]
-                self.save_all_schedules()
+            self.monthly_schedules.pop(f"{year}-{month:02d}", None)
+            self.store.delete_month(year, month)
+            self.leave_ledger.forget_month(year, month)
 
             self.manual_edited_cells.clear()
             year, month, last_day, day_columns = self.get_month_days(year, month)
@@ -1040,9 +1539,9 @@ class ScheduleApp:
             df_initial = pd.DataFrame(initial_data).transpose(); df_initial.columns = day_columns
             self.current_schedule_df = df_initial
             self.display_schedule_table(self.current_schedule_df, year, month)
+            self.record_month_diff(before, self.current_month, '근무표 초기화')
             self.current_summary_df = pd.DataFrame()
             self.display_summary_table(self.current_summary_df)
-            self.save_prev_month_schedule()
         except Exception as e:
             messagebox.showerror("초기화 오류", f"근무표 초기화 중 오류가 발생했습니다: {e}")
 
@@ -1063,6 +1562,9 @@ class ScheduleApp:
         )
 
         if menu_name == '파일':
+            menu.add_command(label="실행 취소 (Ctrl+Z)", command=self.undo_last_edit)
+            menu.add_command(label="다시 실행 (Ctrl+Y)", command=self.redo_last_edit)
+            menu.add_separator()
             menu.add_command(label="종료", command=self.on_closing)
 
         elif menu_name == '근무자 관리':
@@ -1091,6 +1593,9 @@ class ScheduleApp:
 
         elif menu_name == '데이터':
             menu.add_command(label="Excel 데이터 저장 (.xlsx)", command=self.save_schedule_to_excel)
+            menu.add_command(label="Excel 근무표 가져오기 (.xlsx)", command=self.import_schedules_from_excel)
+            menu.add_command(label="버전 기록 / 복원", command=self.version_history_dialog)
+            menu.add_command(label="누적 통계 (올해 / 최근 12개월)", command=self.cumulative_stats_dialog)
 
         parent_button.update_idletasks()
         x = parent_button.winfo_rootx()
@@ -1143,6 +1648,10 @@ class ScheduleApp:
         style.configure('Menu.TButton', font=('Malgun Gothic', 10, 'bold'), foreground='#333333', background='white', padding=[10, 5], relief='flat')
         style.map('Menu.TButton', background=[('active', '#F0F0F0')], foreground=[('active', TOSS_BLUE)])
 
+        # 통계 표 스타일 (표를 다시 그릴 때마다 설정하지 않도록 시작 시 한 번만)
+        style.configure("Treeview", rowheight=25)
+        style.configure("Summary.Treeview.Heading", background="#E8F0FE", foreground="#333333", font=('Malgun Gothic', 9, 'bold'))
+
         top_bar_frame = ttk.Frame(self.root, style='Toss.TFrame'); top_bar_frame.pack(fill='x', padx=20, pady=(10, 0))
 
         file_button = ttk.Button(top_bar_frame, text="파일", style='Menu.TButton')
@@ -1165,18 +1674,9 @@ class ScheduleApp:
         ttk.Button(control_frame, text="다음 년도 ▶▶", command=lambda: self.year_var.set(self.year_var.get() + 1), style='Small.TButton').pack(side='left', padx=(5, 0))
 
         def on_date_change_cb(*args):
-            try: current_year, current_month = self.year_var.get(), self.month_var.get()
-            except Exception: return
-
-            if current_month > 12:
-                self.year_var.set(current_year + 1)
-                self.month_var.set(1)
-            elif current_month < 1:
-                self.year_var.set(current_year - 1)
-                self.month_var.set(12)
-
-            try: self.display_initial_schedule_table()
-            except Exception as e: logging.error(f"[on_date_change_cb] {e}")
+            # 연/월 변경은 바로 불러오지 않고 모아서 마지막 월만 표시
+            if not self.nav_suppress:
+                self.request_month_display()
 
         ttk.Label(self.root, textvariable=self.month_label_text, style='Toss.TLabel').pack(pady=5)
 
@@ -1194,27 +1694,33 @@ class ScheduleApp:
         self.year_var.trace_add("write", on_date_change_cb)
         self.month_var.trace_add("write", on_date_change_cb)
 
+        self.root.bind("<Control-z>", self.undo_last_edit)
+        self.root.bind("<Control-y>", self.redo_last_edit)
+        self.root.bind("<Control-Shift-Z>", self.redo_last_edit)
+
         self.root.after(100, self.load_and_display_data_after_startup)
+        self.root.after(STORE_POLL_INTERVAL_MS, self.poll_store_changes)
 
         footer_frame = ttk.Frame(self.root, style='Toss.TFrame'); footer_frame.pack(side='bottom', fill='x', padx=10, pady=(0, 5))
         tk.Label(footer_frame, text="made by TKㅣver.24112643", font=('Malgun Gothic', 9), fg='#AAAAAA', bg='white').pack(side='right', padx=10)
 
     def on_closing(self):
+        self.flush_pending_save()
         self.save_worker_names()
         self.save_worker_categories()
-        self.save_annual_vacations()
         self.root.destroy()
 
     # ------------------------------------------------------------------
-    # [연차 입력 다이얼로그] 🔵 NEW
+    # [연차 입력 다이얼로그]
     # ------------------------------------------------------------------
     def annual_vacation_dialog(self):
+        year = self.selected_year_month()[0]
         dialog = tk.Toplevel(self.root)
         dialog.title("연차 입력 / 수정")
         dialog.geometry("420x600")
         dialog.transient(self.root); dialog.grab_set()
 
-        tk.Label(dialog, text="근무자별 연차 입력 (년 단위)", font=('Malgun Gothic', 14, 'bold')).pack(pady=10)
+        tk.Label(dialog, text=f"근무자별 {year}년 연차 부여량 입력", font=('Malgun Gothic', 14, 'bold')).pack(pady=10)
 
         frame_canvas = tk.Frame(dialog)
         frame_canvas.pack(fill='both', expand=True, padx=10, pady=5)
@@ -1236,12 +1742,13 @@ class ScheduleApp:
         scroll_y.pack(side="right", fill="y")
 
         entries = {}
-        # 현재 연차 맵에 따라 입력 필드 구성
+        # 원장의 해당 연도 부여량으로 입력 필드 구성
+        entitlements = self.leave_ledger.entitlements(year, self.worker_names)
         for name in self.worker_names:
             row = ttk.Frame(inner_frame)
             row.pack(fill='x', pady=4)
             ttk.Label(row, text=name, width=12).pack(side='left', padx=(2, 6))
-            val = tk.DoubleVar(value=self.annual_vacations.get(name, 21.5))
+            val = tk.DoubleVar(value=entitlements[name])
             ent = ttk.Entry(row, textvariable=val, width=10)
             ent.pack(side='left')
             entries[name] = val
@@ -1254,17 +1761,21 @@ class ScheduleApp:
                         v = float(var.get())
                     except Exception:
                         v = 0.0
-                    self.annual_vacations[nm] = round(v, 2)
-                self.save_annual_vacations()
+                    # 바뀐 근무자만 차이만큼 grant 이벤트로 기록
+                    if round(v, 2) != entitlements[nm]:
+                        self.leave_ledger.set_entitlement(nm, year, round(v, 2))
                 messagebox.showinfo("저장", "연차가 저장되었습니다.")
                 dialog.destroy()
                 # 통계 갱신
                 try:
                     if not self.current_schedule_df.empty:
-                        self.current_summary_df = self.generate_schedule_summary(self.current_schedule_df, self.year_var.get(), self.month_var.get())
+                        self.current_summary_df = self.generate_schedule_summary(self.current_schedule_df, *self.displayed_year_month())
                         self.display_summary_table(self.current_summary_df)
                 except:
                     pass
+            except StoreLockTimeout as e:
+                logging.error(f"[save_data annual_vacation_dialog] {e}")
+                messagebox.showerror("저장 실패", f"연차를 저장하지 못했습니다.\n\n{e}", parent=dialog)
             except Exception as e:
                 logging.error(f"[save_data annual_vacation_dialog] {e}")
                 messagebox.showerror("오류", f"저장 중 오류가 발생했습니다: {e}", parent=dialog)
@@ -1275,6 +1786,117 @@ class ScheduleApp:
 
         self.root.wait_window(dialog)
 
+    # ------------------------------------------------------------------
+    # [근무표 버전 기록 다이얼로그]
+    # ------------------------------------------------------------------
+    def version_history_dialog(self):
+        self.flush_pending_save()
+        year, month = self.selected_year_month()
+        versions = self.store.list_versions(year, month)
+        if not versions:
+            messagebox.showinfo("버전 기록", f"{year}년 {month}월에 저장된 버전이 없습니다.")
+            return
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("근무표 버전 기록")
+        dialog.geometry("460x420")
+        dialog.transient(self.root); dialog.grab_set()
+
+        tk.Label(dialog, text=f"{year}년 {month}월 저장 기록", font=('Malgun Gothic', 14, 'bold')).pack(pady=10)
+
+        tree_frame = ttk.Frame(dialog); tree_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        tree = ttk.Treeview(tree_frame, columns=['Version', 'SavedAt', 'Changed'], show='headings', selectmode='browse')
+        tree.heading('Version', text='버전'); tree.column('Version', anchor='center', width=60, stretch=tk.NO)
+        tree.heading('SavedAt', text='저장 시각'); tree.column('SavedAt', anchor='center', width=200, stretch=tk.NO)
+        tree.heading('Changed', text='변경된 근무자 행'); tree.column('Changed', anchor='center', width=120, stretch=tk.NO)
+        scroll_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scroll_y.set)
+        scroll_y.pack(side='right', fill='y'); tree.pack(side='left', fill='both', expand=True)
+
+        for v in reversed(versions):
+            tree.insert('', 'end', iid=str(v['version']), values=(v['version'], v['saved_at'].replace('T', ' '), v['changed_rows']))
+
+        def restore_selected():
+            try:
+                version = int(tree.selection()[0])
+            except IndexError:
+                messagebox.showwarning("경고", "먼저 복원할 버전을 선택해 주세요.", parent=dialog); return
+            if not messagebox.askyesno("복원 확인", f"버전 {version}(으)로 {year}년 {month}월 근무표를 되돌리시겠습니까?", parent=dialog):
+                return
+            try:
+                em = self.store.restore_version(year, month, version)
+                self.monthly_schedules[em.key] = em
+                self.leave_ledger.update_month(em)
+                dialog.destroy()
+                self.display_initial_schedule_table()
+            except Exception as e:
+                logging.error(f"[restore_selected] {e}")
+                messagebox.showerror("오류", f"복원 중 오류가 발생했습니다: {e}", parent=dialog)
+
+        btn_frame = ttk.Frame(dialog); btn_frame.pack(pady=8)
+        ttk.Button(btn_frame, text="선택 버전 복원", command=restore_selected, style='Dialog.Primary.TButton').pack(side='left', padx=6)
+        ttk.Button(btn_frame, text="닫기", command=dialog.destroy, style='Dialog.Secondary.TButton').pack(side='left', padx=6)
+
+        self.root.wait_window(dialog)
+
+    # ------------------------------------------------------------------
+    # [누적 통계 다이얼로그]
+    # ------------------------------------------------------------------
+    def cumulative_stats_dialog(self):
+        self.flush_pending_save()
+        year, month = self.selected_year_month()
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("누적 근무 통계")
+        dialog.geometry("820x520")
+        dialog.transient(self.root); dialog.grab_set()
+
+        view_var = tk.StringVar(value='올해 누계')
+        top_frame = ttk.Frame(dialog); top_frame.pack(fill='x', padx=10, pady=10)
+        title_var = tk.StringVar()
+        tk.Label(top_frame, textvariable=title_var, font=('Malgun Gothic', 14, 'bold')).pack(side='left')
+        view_box = ttk.Combobox(top_frame, textvariable=view_var, values=['올해 누계', '최근 12개월'], state='readonly', width=12)
+        view_box.pack(side='right')
+
+        tree_frame = ttk.Frame(dialog); tree_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        tree = ttk.Treeview(tree_frame, columns=STATS_VIEW_COLUMNS, show='headings', style="Summary.Treeview")
+        scroll_y = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scroll_y.set)
+        scroll_y.pack(side='right', fill='y'); tree.pack(side='left', fill='both', expand=True)
+        rows = []
+
+        def fill(sort_col=None):
+            if sort_col is not None:
+                i = STATS_VIEW_COLUMNS.index(sort_col)
+                rows.sort(key=lambda row: row[i], reverse=(i > 0))
+            tree.delete(*tree.get_children())
+            for row in rows:
+                tree.insert('', 'end', values=row)
+
+        for col in STATS_VIEW_COLUMNS:
+            tree.heading(col, text=col.replace('_', ' '), anchor='center', command=lambda c=col: fill(c))
+            tree.column(col, width=80 if col == '근무자' else 56, anchor='center', stretch=tk.NO)
+
+        def load(*args):
+            try:
+                if view_var.get() == '최근 12개월':
+                    workers, totals = self.stats_cube.rolling(year, month)
+                    title_var.set(f"최근 12개월 ({year}년 {month}월까지)")
+                else:
+                    workers, totals = self.stats_cube.year_to_date(year, month)
+                    title_var.set(f"{year}년 1월 ~ {month}월 누계")
+            except Exception as e:
+                logging.error(f"[cumulative_stats_dialog] {e}")
+                messagebox.showerror("오류", f"누적 통계를 불러오는 중 오류가 발생했습니다: {e}", parent=dialog); return
+            rows[:] = stats_rows(workers, totals)
+            fill('총 근무')
+
+        view_var.trace_add('write', load)
+        load()
+        ttk.Button(dialog, text="닫기", command=dialog.destroy, style='Dialog.Secondary.TButton').pack(pady=8)
+
+        self.root.wait_window(dialog)
+
 # ========================================================================
 # 4. 실행 진입점
 # ========================================================================
@@ -0,0 +1,194 @@
+import datetime
+import json
+import os
+
+import numpy as np
+
+from schedule_codec import DUTY_CODES, DUTY_INDEX, load_encoded_month, parse_month_key
+from schedule_store import file_stamp
+
+# ========================================================================
+# 1. 설정 및 상수
+# ========================================================================
+LEAVE_LEDGER_FILE = 'leave_ledger.jsonl'
+DEFAULT_ANNUAL_LEAVE = 21.5
+# 이벤트 종류별 잔여 연차에 대한 부호 (그 밖에 근무자 이름 변경을 기록하는 rename 이벤트가 있음)
+LEAVE_EVENT_SIGNS = {'grant': 1.0, 'use': -1.0, 'refund': 1.0}
+
+# 근무 코드별 연차 사용량 (V: 1일, v.0.5: 반차, v.25: 반반차)
+LEAVE_WEIGHTS = np.zeros(len(DUTY_CODES), dtype=np.float64)
+LEAVE_WEIGHTS[DUTY_INDEX['V']] = 1.0
+LEAVE_WEIGHTS[DUTY_INDEX['v.0.5']] = 0.5
+LEAVE_WEIGHTS[DUTY_INDEX['v.25']] = 0.25
+
+
+def leave_usage(codes):
+    """(근무자 × 일) 코드 행렬에서 근무자별 연차 사용량을 계산"""
+    return LEAVE_WEIGHTS[np.asarray(codes)].sum(axis=1)
+
+
+# ========================================================================
+# 2. 연차 원장
+# ========================================================================
+class LeaveLedger:
+    """부여(grant)/사용(use)/환원(refund) 이벤트만 추가 기록하는 연차 원장
+
+    근무표에 입력된 V/v.25/v.0.5는 이벤트로 중복 기록하지 않고 저장된 월별 근무표에서
+    직접 집계한다. 잔여 연차 = 부여 - 사용 + 환원 - 근무표 사용량.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.path = os.path.join(store.root, LEAVE_LEDGER_FILE)
+        self._events = None
+        self._events_size = 0
+        self._month_usage = {}  # 월 키 → (월 파일 stamp, 근무자 목록, 근무자별 사용량 배열)
+
+    # ------------------------------------------------------------------
+    # [이벤트 기록]
+    # ------------------------------------------------------------------
+    def events(self):
+        """원장 이벤트 목록 (다른 인스턴스가 원장 파일에 추가했으면 다시 읽음)"""
+        stamp = file_stamp(self.path)
+        size = stamp[1] if stamp else 0
+        if self._events is None or size != self._events_size:
+            self._events = []
+            try:
+                with open(self.path, 'rb') as f:
+                    data = f.read(size)
+                for line in data.decode('utf-8').splitlines():
+                    if line.strip():
+                        self._events.append(json.loads(line))
+            except FileNotFoundError:
+                pass
+            self._events_size = size
+        return self._events
+
+    def is_empty(self):
+        return not self.events()
+
+    def _append_event(self, event):
+        event['at'] = datetime.datetime.now().isoformat(timespec='seconds')
+        line = (json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        with self.store.lock():
+            events = self.events()
+            with open(self.path, 'ab') as f:
+                f.write(line)
+            events.append(event)
+            self._events_size += len(line)
+
+    def append(self, kind, worker, year, days, note=''):
+        if kind not in LEAVE_EVENT_SIGNS:
+            raise ValueError(f"알 수 없는 연차 이벤트 종류: {kind}")
+        event = {'kind': kind, 'worker': worker, 'year': int(year), 'days': round(float(days), 2)}
+        if note:
+            event['note'] = note
+        self._append_event(event)
+
+    def rename_worker(self, old_name, new_name):
+        """이후 집계에서 old_name의 이벤트와 근무표 기록을 new_name으로 합산"""
+        self._append_event({'kind': 'rename', 'worker': old_name, 'to': new_name})
+
+    def set_entitlement(self, worker, year, days):
+        """해당 연도 부여량이 days가 되도록 차이만큼 grant 이벤트를 추가"""
+        with self.store.lock():
+            current = self.entitlements(year).get(worker, 0.0)
+            delta = round(float(days) - current, 2)
+            if delta:
+                self.append('grant', worker, year, delta, note='연차 입력')
+
+    # ------------------------------------------------------------------
+    # [집계]
+    # ------------------------------------------------------------------
+    def _resolver(self):
+        renames = {}
+        for event in self.events():
+            if event['kind'] == 'rename':
+                renames[event['worker']] = event['to']
+
+        def resolve(name):
+            seen = set()
+            while name in renames and name not in seen:
+                seen.add(name)
+                name = renames[name]
+            return name
+        return resolve
+
+    def _event_totals(self, year, names):
+        """names 순서의 (부여 합계, 이벤트 순변화량, 부여 여부) 배열을 bincount로 집계"""
+        resolve = self._resolver()
+        index = {name: i for i, name in enumerate(names)}
+        rows, amounts, is_grant = [], [], []
+        for event in self.events():
+            if event['kind'] == 'rename' or event['year'] != int(year):
+                continue
+            i = index.get(resolve(event['worker']))
+            if i is None:
+                continue
+            rows.append(i)
+            amounts.append(LEAVE_EVENT_SIGNS[event['kind']] * event['days'])
+            is_grant.append(event['kind'] == 'grant')
+        rows = np.asarray(rows, dtype=np.int64)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        is_grant = np.asarray(is_grant, dtype=bool)
+        net = np.bincount(rows, weights=amounts, minlength=len(names))
+        granted = np.bincount(rows, weights=np.where(is_grant, amounts, 0.0), minlength=len(names))
+        has_grant = np.bincount(rows[is_grant], minlength=len(names)) > 0
+        return granted, net, has_grant
+
+    def entitlements(self, year, workers=None):
+        """연도별 부여량 {근무자: 일수} (workers를 주면 부여 기록이 없는 근무자는 기본값)"""
+        resolve = self._resolver()
+        if workers is None:
+            workers = sorted({resolve(e['worker']) for e in self.events()
+                              if e['kind'] == 'grant' and e['year'] == int(year)})
+            granted, _, _ = self._event_totals(year, workers)
+            return {name: round(float(v), 2) for name, v in zip(workers, granted)}
+        granted, _, has_grant = self._event_totals(year, workers)
+        granted = np.where(has_grant, granted, DEFAULT_ANNUAL_LEAVE)
+        return {name: round(float(v), 2) for name, v in zip(workers, granted)}
+
+    def update_month(self, em):
+        """저장된 월의 근무표 사용량 캐시를 갱신"""
+        stamp = file_stamp(self.store.month_path(em.year, em.month))
+        self._month_usage[em.key] = (stamp, list(em.workers), leave_usage(em.codes))
+
+    def forget_month(self, year, month):
+        self._month_usage.pop(f"{int(year)}-{int(month):02d}", None)
+
+    def _usage_for(self, key):
+        """월별 (근무자 목록, 사용량) — 월 파일이 캐시 이후 바뀌었으면 다시 집계"""
+        year, month = parse_month_key(key)
+        stamp = file_stamp(self.store.month_path(year, month))
+        cached = self._month_usage.get(key)
+        if cached is None or cached[0] != stamp:
+            if stamp is None:
+                return [], np.zeros(0)
+            em = load_encoded_month(self.store.month_path(year, month))
+            self.update_month(em)
+            cached = self._month_usage[key]
+        return cached[1], cached[2]
+
+    def schedule_usage(self, year, workers, upto_month=12):
+        """저장된 근무표에서 year년 1월~upto_month월의 근무자별 연차 사용량"""
+        resolve = self._resolver()
+        index = {name: i for i, name in enumerate(workers)}
+        total = np.zeros(len(workers), dtype=np.float64)
+        keys = {k for k in self.store.list_months() if parse_month_key(k)[0] == int(year)}
+        for key in keys:
+            if parse_month_key(key)[1] > upto_month:
+                continue
+            month_workers, usage = self._usage_for(key)
+            rows = np.array([index.get(resolve(w), -1) for w in month_workers], dtype=np.int64)
+            valid = rows >= 0
+            np.add.at(total, rows[valid], usage[valid])
+        return total
+
+    def balances(self, year, workers, upto_month=12):
+        """잔여 연차 {근무자: 일수} — 부여 기록이 없는 근무자는 기본 부여량으로 계산"""
+        workers = list(workers)
+        _, net, has_grant = self._event_totals(year, workers)
+        net = net + np.where(has_grant, 0.0, DEFAULT_ANNUAL_LEAVE)
+        remaining = net - self.schedule_usage(year, workers, upto_month)
+        return {name: round(float(v), 2) for name, v in zip(workers, remaining)}
+
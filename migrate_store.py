@@ -0,0 +1,256 @@
+import datetime
+import json
+import logging
+import re
+
+from leave_ledger import LeaveLedger
+from schedule_codec import from_dutymaker_entry, from_split_json, normalize_duty
+from schedule_store import SCHEDULE_STORE_DIR, ScheduleStore
+
+# ========================================================================
+# 1. 설정 및 상수
+# ========================================================================
+STREAM_CHUNK_SIZE = 1 << 16
+MONTH_KEY_RE = re.compile(r'^\d{4}-\d{2}$')
+YEAR_KEY_RE = re.compile(r'^\d{4}$')
+
+# 판별 가능한 레거시 파일 레이아웃
+LAYOUT_DUTYMAKER_SCHEDULES = 'dutymaker_schedules'        # {"YYYY-MM": {columns, index, data, manual_edits}}
+LAYOUT_SCHEDULE_APP_SCHEDULES = 'schedule_app_schedules'  # {"schedules": {"YYYY-MM": "<split json>"}}
+LAYOUT_DUTYMAKER_PREV_MONTH = 'dutymaker_prev_month'      # {근무자: [마지막 5일 근무]}
+LAYOUT_SCHEDULE_APP_PREV_MONTH = 'schedule_app_prev_month'  # {"YYYY-MM"(적용 월): {근무자: 마지막 날 근무}}
+LAYOUT_ANNUAL_VACATIONS = 'annual_vacations'              # {근무자: 잔여 연차}
+LAYOUT_ANNUAL_LEAVE = 'annual_leave'                      # {"year": YYYY, "workers": {근무자: 연차}}
+LAYOUT_WORKER_V_DATA = 'worker_v_data'                    # {"YYYY": {근무자: 연차}}
+
+
+# ========================================================================
+# 2. 스트리밍 JSON 리더
+# ========================================================================
+class _JsonStream:
+    """파일을 청크 단위로 읽으며 JSON 객체 멤버를 하나씩 해석하는 리더"""
+
+    def __init__(self, fp, chunk_size=STREAM_CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f"JSON 형식 오류: '{ch}'가 필요합니다. (위치 {self.pos})")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                # 숫자는 청크 경계에서 잘렸을 수 있으므로 구분자가 보일 때까지 더 채움
+                complete = end < len(self.buf) and (
+                    not isinstance(obj, (int, float)) or self.buf[end] in ' \t\r\n,]}')
+                if complete or self.eof or not self._fill():
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+
+    def members(self, path=()):
+        """객체 멤버를 (키, 값)으로 순서대로 반환, path가 있으면 해당 하위 객체로 내려가 읽음"""
+        self.expect('{')
+        while True:
+            ch = self.peek()
+            if ch == '}':
+                self.pos += 1
+                return
+            if ch == ',':
+                self.pos += 1
+                continue
+            key = self.value()
+            self.expect(':')
+            if path and key == path[0]:
+                yield from self.members(path[1:])
+            elif path:
+                self.value()  # 경로 밖의 멤버는 읽고 버림
+            else:
+                yield key, self.value()
+
+
+def iter_json_members(path, member_path=()):
+    """JSON 파일의 최상위(또는 member_path 하위) 객체 멤버를 하나씩 스트리밍"""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from _JsonStream(f).members(tuple(member_path))
+
+
+# ========================================================================
+# 3. 레이아웃 판별
+# ========================================================================
+def detect_layout(path):
+    """파일의 첫 멤버만 읽어 레거시 레이아웃을 판별 (판별 불가 시 None)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JsonStream(f, chunk_size=4096)
+        if stream.peek() != '{':
+            return None
+        stream.expect('{')
+        if stream.peek() == '}':
+            return None
+        key = stream.value()
+        if key == 'schedules':
+            return LAYOUT_SCHEDULE_APP_SCHEDULES
+        if key in ('year', 'workers'):
+            return LAYOUT_ANNUAL_LEAVE
+        stream.expect(':')
+        first = stream.value()
+
+    if MONTH_KEY_RE.match(key) and isinstance(first, dict):
+        return LAYOUT_DUTYMAKER_SCHEDULES if 'data' in first else LAYOUT_SCHEDULE_APP_PREV_MONTH
+    if YEAR_KEY_RE.match(key) and isinstance(first, dict):
+        return LAYOUT_WORKER_V_DATA
+    if isinstance(first, list):
+        return LAYOUT_DUTYMAKER_PREV_MONTH
+    if isinstance(first, (int, float)) and not isinstance(first, bool):
+        return LAYOUT_ANNUAL_VACATIONS
+    return None
+
+
+# ========================================================================
+# 4. 마이그레이션
+# ========================================================================
+def _iter_schedule_months(path, layout):
+    if layout == LAYOUT_SCHEDULE_APP_SCHEDULES:
+        for key, json_text in iter_json_members(path, ('schedules',)):
+            yield from_split_json(key, json_text)
+    else:
+        for key, entry in iter_json_members(path):
+            yield from_dutymaker_entry(key, entry)
+
+
+def _leave_items(path, layout, leave_year):
+    """연차 파일을 (연도, 근무자, 연차 일수) 항목으로 변환"""
+    if layout == LAYOUT_WORKER_V_DATA:
+        for year, workers in iter_json_members(path):
+            for name, days in workers.items():
+                yield str(year), name, float(days)
+    elif layout == LAYOUT_ANNUAL_LEAVE:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)  # 연도 1개 분량의 작은 파일
+        for name, days in data.get('workers', {}).items():
+            yield str(data.get('year', leave_year)), name, float(days)
+    else:
+        for name, days in iter_json_members(path):
+            yield str(leave_year), name, float(days)
+
+
+def migrate_file(store, path, leave_year=None, prev_month_key=None, report=None):
+    """레거시 파일 하나를 판별하여 표준 저장소로 변환하고 처리 건수를 반환"""
+    report = report or (lambda msg: None)
+    layout = detect_layout(path)
+    if layout is None:
+        report(f"[건너뜀] {path}: 알 수 없는 레이아웃")
+        return 0
+
+    if layout in (LAYOUT_DUTYMAKER_SCHEDULES, LAYOUT_SCHEDULE_APP_SCHEDULES):
+        count = 0
+        for em in _iter_schedule_months(path, layout):
+            store.save_month(em, overwrite=True)
+            count += 1
+            report(f"  {em.key}: 근무자 {len(em.workers)}명 저장")
+        report(f"[근무표] {path} ({layout}): {count}개월")
+        return count
+
+    if layout in (LAYOUT_DUTYMAKER_PREV_MONTH, LAYOUT_SCHEDULE_APP_PREV_MONTH):
+        carry_over = store.load_carry_over()
+        if layout == LAYOUT_SCHEDULE_APP_PREV_MONTH:
+            for key, duties in iter_json_members(path):
+                carry_over[key] = {name: [normalize_duty(duty)] for name, duty in duties.items()}
+            count = len(carry_over)
+        else:
+            if not prev_month_key:
+                report(f"[건너뜀] {path}: 적용 월이 기록되지 않은 이월 근무입니다. --prev-month로 지정하세요.")
+                return 0
+            carry_over[prev_month_key] = {name: [normalize_duty(d) for d in duties]
+                                          for name, duties in iter_json_members(path)}
+            count = 1
+        store.save_carry_over(carry_over)
+        report(f"[이월 근무] {path} ({layout}): {count}개월")
+        return count
+
+    leave_year = leave_year or datetime.datetime.now().year
+    ledger = LeaveLedger(store)
+    items = list(_leave_items(path, layout, leave_year))
+    if layout == LAYOUT_ANNUAL_VACATIONS:
+        # annual_vacations.json은 근무표 사용량을 이미 뺀 잔여 연차이므로,
+        # 원장이 근무표 사용량을 다시 빼도 같은 잔여가 되도록 저장된 사용량을 더해 부여량으로 기록
+        names = [name for _, name, _ in items]
+        usage = ledger.schedule_usage(leave_year, names)
+        items = [(year, name, round(days + float(used), 2)) for (year, name, days), used in zip(items, usage)]
+    count = 0
+    for year, name, days in items:
+        current = ledger.entitlements(year).get(name)
+        if current is not None and current != days:
+            report(f"  {year} {name}: 연차 {current} → {days} (나중 파일 우선)")
+        ledger.set_entitlement(name, year, days)
+        count += 1
+    report(f"[연차] {path} ({layout}): {count}건")
+    return count
+
+
+def _migration_order(path):
+    """근무표 파일을 연차 파일보다 먼저 변환하기 위한 정렬 키 (잔여 연차 환산에 저장된 근무표가 필요)"""
+    try:
+        layout = detect_layout(path)
+    except (OSError, ValueError):
+        return 1
+    return 0 if layout in (LAYOUT_DUTYMAKER_SCHEDULES, LAYOUT_SCHEDULE_APP_SCHEDULES) else 1
+
+
+def migrate_files(store, paths, leave_year=None, prev_month_key=None, report=None):
+    """여러 레거시 파일을 변환 — 근무표 파일을 먼저, 나머지는 주어진 순서대로 (연차는 나중 파일이 우선)"""
+    total = 0
+    for path in sorted(paths, key=_migration_order):
+        try:
+            total += migrate_file(store, path, leave_year, prev_month_key, report)
+        except FileNotFoundError:
+            if report:
+                report(f"[건너뜀] {path}: 파일 없음")
+    return total
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="dutymaker / schedule_app 레거시 파일을 표준 저장소로 변환")
+    parser.add_argument('files', nargs='+', help="변환할 JSON 파일 (레이아웃 자동 판별)")
+    parser.add_argument('--store', default=SCHEDULE_STORE_DIR, help="표준 저장소 폴더")
+    parser.add_argument('--leave-year', type=int, help="연도 정보가 없는 연차 파일에 적용할 연도 (기본: 올해)")
+    parser.add_argument('--prev-month', help="dutymaker 이월 근무 파일이 적용될 월 (YYYY-MM)")
+    args = parser.parse_args()
+
+    try:
+        migrate_files(ScheduleStore(args.store), args.files, args.leave_year, args.prev_month, report=print)
+    except Exception as e:
+        logging.error(f"migrate_files: {e}")
+        raise SystemExit(1)
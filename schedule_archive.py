@@ -0,0 +1,196 @@
+import json
+import os
+import struct
+import logging
+
+import numpy as np
+
+from schedule_codec import DUTY_CODES, load_encoded_month, load_month_header, parse_month_key
+from schedule_store import parse_ward_args
+
+# ========================================================================
+# 1. 설정 및 상수
+# ========================================================================
+ARCHIVE_MAGIC = b'DMKA'
+ARCHIVE_FORMAT_VERSION = 1
+ARCHIVE_EXTENSION = '.dmka'
+ARCHIVE_MAX_DAYS = 31
+ARCHIVE_ALIGN = 64
+# magic(4) + format version(1) + 예약(3) + 헤더 길이(4)
+_ARCHIVE_PREFIX = struct.Struct('<4sB3xI')
+
+
+def _align(offset):
+    return (offset + ARCHIVE_ALIGN - 1) // ARCHIVE_ALIGN * ARCHIVE_ALIGN
+
+
+# ========================================================================
+# 2. 아카이브 읽기 (memory-map)
+# ========================================================================
+class HistoryArchive:
+    """병동별 (월, 근무자, 일) uint8 큐브를 memory-map으로 여는 읽기 전용 아카이브
+
+    병동마다 근무자 ID 테이블이 하나 있고, 각 월은 근무자 × 31일 크기의 고정 블록이므로
+    월 조회는 dict 조회 한 번과 슬라이싱으로 끝나며 반환되는 배열은 모두 파일의 view이다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            prefix = f.read(_ARCHIVE_PREFIX.size)
+            magic, version, header_len = _ARCHIVE_PREFIX.unpack(prefix)
+            if magic != ARCHIVE_MAGIC:
+                raise ValueError("dmka 아카이브 파일이 아닙니다.")
+            if version > ARCHIVE_FORMAT_VERSION:
+                raise ValueError(f"지원하지 않는 dmka 버전입니다: {version}")
+            self.header = json.loads(f.read(header_len).decode('utf-8'))
+        if self.header.get('duty_codes', DUTY_CODES) != DUTY_CODES:
+            raise ValueError("아카이브의 근무 코드 표가 현재 코드 표와 다릅니다.")
+        self._mmap = np.memmap(path, dtype=np.uint8, mode='r')
+        self._wards = {}
+        for ward in self.header['wards']:
+            num_months, num_workers = len(ward['months']), len(ward['workers'])
+            cube = self._mmap[ward['offset']:ward['offset'] + num_months * num_workers * ARCHIVE_MAX_DAYS]
+            present = self._mmap[ward['present_offset']:ward['present_offset'] + num_months * num_workers]
+            self._wards[ward['name']] = {
+                'months': ward['months'],
+                'month_index': {key: i for i, key in enumerate(ward['months'])},
+                'days': ward['days'],
+                'workers': ward['workers'],
+                'cube': cube.reshape(num_months, num_workers, ARCHIVE_MAX_DAYS),
+                'present': present.reshape(num_months, num_workers).view(bool),
+            }
+
+    def close(self):
+        self._wards.clear()
+        mm = getattr(self._mmap, '_mmap', None)
+        self._mmap = None
+        if mm is not None:
+            mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def wards(self):
+        return list(self._wards)
+
+    def months(self, ward):
+        return list(self._wards[ward]['months'])
+
+    def workers(self, ward):
+        return list(self._wards[ward]['workers'])
+
+    def ward_cube(self, ward):
+        """(월, 근무자, 31일) 전체 큐브 view — 월 길이 밖의 날짜는 0(빈 칸)"""
+        return self._wards[ward]['cube']
+
+    def ward_presence(self, ward):
+        """(월, 근무자) bool view — 해당 월 근무표에 포함된 근무자 여부"""
+        return self._wards[ward]['present']
+
+    def month_position(self, ward, year, month):
+        return self._wards[ward]['month_index'][f"{int(year)}-{int(month):02d}"]
+
+    def month(self, ward, year, month):
+        """한 달의 (근무자, 일) 코드 view와 해당 월 근무자 bool 마스크를 반환"""
+        info = self._wards[ward]
+        i = self.month_position(ward, year, month)
+        return info['cube'][i, :, :info['days'][i]], info['present'][i]
+
+
+# ========================================================================
+# 3. 아카이브 쓰기
+# ========================================================================
+def _scan_store(store, month_keys=None):
+    """월별 .dmk 헤더만 읽어 대상 월과 근무자 ID 테이블을 구성"""
+    keys = [k for k in store.list_months() if month_keys is None or k in month_keys]
+    workers, worker_index, days = [], {}, []
+    for key in keys:
+        header = load_month_header(store.month_path(*parse_month_key(key)))
+        for name in header['workers']:
+            if name not in worker_index:
+                worker_index[name] = len(workers)
+                workers.append(name)
+        days.append(header['shape'][1])
+    return keys, workers, worker_index, days
+
+
+def export_archive(path, ward_stores, month_keys=None, report=None):
+    """{병동 이름: ScheduleStore}의 저장된 월들을 하나의 .dmka 아카이브로 내보냄
+
+    월 단위로 읽어 파일 위치에 바로 쓰므로 메모리 사용량은 한 달 분량을 넘지 않는다.
+    """
+    report = report or (lambda msg: None)
+    scans = {name: _scan_store(store, month_keys) for name, store in ward_stores.items()}
+
+    # 1) 헤더에 들어갈 블록 위치를 먼저 계산 (헤더 길이가 오프셋에 영향을 주므로 고정점까지 반복)
+    header_len = 0
+    while True:
+        offset = _align(_ARCHIVE_PREFIX.size + header_len)
+        wards_meta = []
+        for name, (keys, workers, _, days) in scans.items():
+            cube_size = len(keys) * len(workers) * ARCHIVE_MAX_DAYS
+            present_offset = _align(offset + cube_size)
+            wards_meta.append({'name': name, 'months': keys, 'days': days, 'workers': workers,
+                               'offset': offset, 'present_offset': present_offset})
+            offset = _align(present_offset + len(keys) * len(workers))
+        header = {'duty_codes': DUTY_CODES, 'max_days': ARCHIVE_MAX_DAYS, 'wards': wards_meta}
+        header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if len(header_bytes) == header_len:
+            break
+        header_len = len(header_bytes)
+
+    # 2) 월 블록 스트리밍 기록
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_ARCHIVE_PREFIX.pack(ARCHIVE_MAGIC, ARCHIVE_FORMAT_VERSION, header_len))
+        f.write(header_bytes)
+        f.truncate(offset)
+        for meta, (name, store) in zip(wards_meta, ward_stores.items()):
+            _, workers, worker_index, _ = scans[name]
+            present = np.zeros((len(meta['months']), len(workers)), dtype=np.uint8)
+            for i, key in enumerate(meta['months']):
+                em = load_encoded_month(store.month_path(*parse_month_key(key)))
+                rows = np.array([worker_index[w] for w in em.workers], dtype=np.int64)
+                block = np.zeros((len(workers), ARCHIVE_MAX_DAYS), dtype=np.uint8)
+                block[rows, :em.num_days] = em.codes
+                present[i, rows] = 1
+                f.seek(meta['offset'] + i * block.size)
+                f.write(block.tobytes())
+                report(f"  {name} {key}: 근무자 {len(em.workers)}명")
+            f.seek(meta['present_offset'])
+            f.write(present.tobytes())
+            report(f"[{name}] {len(meta['months'])}개월, 근무자 {len(workers)}명")
+    os.replace(tmp_path, path)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="근무표 이력 아카이브(.dmka) 내보내기/조회")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_export = sub.add_parser('export', help="저장소의 월별 근무표를 아카이브로 내보내기")
+    p_export.add_argument('archive', help="만들 .dmka 파일 경로")
+    p_export.add_argument('--ward', action='append', help="병동=저장소폴더 (여러 번 지정 가능)")
+    p_export.add_argument('--month', action='append', help="내보낼 월 YYYY-MM (생략 시 전체)")
+    p_info = sub.add_parser('info', help="아카이브 내용 요약")
+    p_info.add_argument('archive')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'export':
+            months = set(args.month) if args.month else None
+            export_archive(args.archive, parse_ward_args(args.ward), months, report=print)
+        else:
+            with HistoryArchive(args.archive) as archive:
+                for ward in archive.wards():
+                    months = archive.months(ward)
+                    span = f"{months[0]} ~ {months[-1]}" if months else "-"
+                    print(f"{ward}: {len(months)}개월 ({span}), 근무자 {len(archive.workers(ward))}명")
+    except Exception as e:
+        logging.error(f"schedule_archive: {e}")
+        raise SystemExit(1)
@@ -0,0 +1,322 @@
+import calendar
+import datetime
+import json
+import os
+import struct
+import logging
+
+import numpy as np
+
+# ========================================================================
+# 1. 근무 코드 및 파일 포맷 상수
+# ========================================================================
+# 셀 하나를 1바이트로 저장하기 위한 근무 코드 표 (0번은 빈 칸)
+DUTY_CODES = ['', 'D', 'E', 'N', 'O', 'V', 'v.25', 'v.0.5', 'MD', 'DH']
+DUTY_INDEX = {duty: code for code, duty in enumerate(DUTY_CODES)}
+# 레거시 파일에 섞여 있는 표기 → 표준 근무 문자열
+DUTY_ALIASES = {'Off': 'O', 'OFF': 'O', 'off': 'O', 'nan': '', 'None': ''}
+
+WEEKDAY_NAMES_KR = ["월", "화", "수", "목", "금", "토", "일"]
+
+DMK_MAGIC = b'DMKS'
+DMK_FORMAT_VERSION = 1
+DMK_EXTENSION = '.dmk'
+# magic(4) + format version(1) + 예약(3) + 헤더 길이(4)
+_DMK_PREFIX = struct.Struct('<4sB3xI')
+
+
+# ========================================================================
+# 2. 근무 코드 변환
+# ========================================================================
+def normalize_duty(value):
+    """레거시 셀 값(None, 'Off' 등)을 EDITABLE_SHIFTS 표기로 정규화"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value != value:  # NaN
+        return ''
+    value = str(value).strip()
+    return DUTY_ALIASES.get(value, value)
+
+
+def _duty_code(value):
+    try:
+        return DUTY_INDEX[normalize_duty(value)]
+    except KeyError:
+        raise ValueError(f"알 수 없는 근무 코드: {value!r}") from None
+
+
+def encode_duties(rows):
+    """근무 문자열 2차원 리스트를 (근무자 × 일) uint8 코드 행렬로 변환 (서로 다른 셀 값마다 한 번만 정규화)"""
+    rows = [list(row) for row in rows]
+    num_days = max((len(row) for row in rows), default=0)
+    codes = np.zeros((len(rows), num_days), dtype=np.uint8)
+    lookup = {}
+    for r, row in enumerate(rows):
+        for value in row:
+            if value not in lookup:
+                lookup[value] = _duty_code(value)
+        codes[r, :len(row)] = [lookup[value] for value in row]
+    return codes
+
+
+def decode_duties(codes):
+    """uint8 코드 행렬을 근무 문자열 2차원 리스트로 변환"""
+    table = np.array(DUTY_CODES, dtype=object)
+    return table[np.asarray(codes)].tolist()
+
+
+def day_labels(year, month):
+    """dutymaker.py의 열 이름 형식('10/3 (금)')으로 해당 월의 날짜 라벨 생성"""
+    _, last_day = calendar.monthrange(year, month)
+    return [f"{month}/{day} ({WEEKDAY_NAMES_KR[datetime.date(year, month, day).weekday()]})"
+            for day in range(1, last_day + 1)]
+
+
+def weekend_mask(year, month):
+    """해당 월의 토/일 여부를 bool 배열로 반환"""
+    _, last_day = calendar.monthrange(year, month)
+    first_weekday = calendar.weekday(year, month, 1)
+    return (np.arange(first_weekday, first_weekday + last_day) % 7) >= 5
+
+
+def parse_month_key(key):
+    """'YYYY-MM' 키를 (year, month) 정수 튜플로 변환"""
+    year_str, month_str = key.split('-')
+    return int(year_str), int(month_str)
+
+
+def day_from_label(label):
+    """'10/3 (금)' 또는 '3 (금)' 형식의 열 이름에서 일(day)을 추출"""
+    head = str(label).split('(')[0].strip()
+    return int(head.split('/')[-1])
+
+
+# ========================================================================
+# 3. 월 단위 근무표 표현
+# ========================================================================
+class EncodedMonth:
+    """한 달 근무표: 근무자 ID 테이블 + 1바이트 근무 코드 행렬 + 수동 편집 마스크"""
+
+    __slots__ = ('year', 'month', 'workers', 'codes', 'manual')
+
+    def __init__(self, year, month, workers, codes, manual=None):
+        self.year, self.month = int(year), int(month)
+        self.workers = list(workers)
+        self.codes = np.ascontiguousarray(codes, dtype=np.uint8)
+        if manual is None:
+            manual = np.zeros(self.codes.shape, dtype=bool)
+        self.manual = np.asarray(manual, dtype=bool)
+        if self.codes.shape != (len(self.workers), self.num_days):
+            raise ValueError(f"{self.key}: 근무표 크기 {self.codes.shape}가 근무자 {len(self.workers)}명 × {self.num_days}일과 맞지 않습니다.")
+
+    @property
+    def key(self):
+        return f"{self.year}-{self.month:02d}"
+
+    @property
+    def num_days(self):
+        return calendar.monthrange(self.year, self.month)[1]
+
+    def day_labels(self):
+        return day_labels(self.year, self.month)
+
+    @classmethod
+    def from_dataframe(cls, df, year, month, manual_edited_cells=()):
+        """dutymaker.py의 근무표 DataFrame과 수동 편집 셀 집합으로부터 생성"""
+        workers = [str(w) for w in df.index]
+        codes = encode_duties(df.values.tolist())
+        manual = np.zeros(codes.shape, dtype=bool)
+        row_of = {w: i for i, w in enumerate(workers)}
+        col_of = {str(c): j for j, c in enumerate(df.columns)}
+        for worker, col_name in manual_edited_cells:
+            if worker in row_of and col_name in col_of:
+                manual[row_of[worker], col_of[col_name]] = True
+        return cls(year, month, workers, codes, manual)
+
+    def to_dataframe(self):
+        """dutymaker.py 형식(근무자 index × '월/일 (요일)' 열)의 DataFrame으로 변환"""
+        import pandas as pd
+        return pd.DataFrame(decode_duties(self.codes), index=self.workers, columns=self.day_labels())
+
+    def manual_edit_keys(self):
+        """수동 편집 마스크를 dutymaker.py의 (근무자, 열 이름) 집합으로 변환"""
+        labels = self.day_labels()
+        rows, cols = np.nonzero(self.manual)
+        return {(self.workers[r], labels[c]) for r, c in zip(rows.tolist(), cols.tolist())}
+
+
+# ========================================================================
+# 4. 바이너리 인코딩 (.dmk)
+# ========================================================================
+def encode_month(em, extra_header=None):
+    """EncodedMonth를 .dmk 바이트열로 직렬화"""
+    header = {
+        'year': em.year,
+        'month': em.month,
+        'workers': em.workers,
+        'duty_codes': DUTY_CODES,
+        'shape': list(em.codes.shape),
+    }
+    if extra_header:
+        header.update(extra_header)
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return b''.join([
+        _DMK_PREFIX.pack(DMK_MAGIC, DMK_FORMAT_VERSION, len(header_bytes)),
+        header_bytes,
+        em.codes.tobytes(),
+        np.packbits(em.manual, axis=None).tobytes(),
+    ])
+
+
+def read_header(buffer):
+    """.dmk 바이트열에서 헤더 dict와 데이터 시작 위치를 읽음"""
+    magic, version, header_len = _DMK_PREFIX.unpack_from(buffer, 0)
+    if magic != DMK_MAGIC:
+        raise ValueError("dmk 파일 형식이 아닙니다.")
+    if version > DMK_FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 dmk 버전입니다: {version}")
+    start = _DMK_PREFIX.size
+    header = json.loads(bytes(buffer[start:start + header_len]).decode('utf-8'))
+    return header, start + header_len
+
+
+def load_month_header(path):
+    """.dmk 파일에서 코드 행렬을 읽지 않고 헤더만 읽음"""
+    with open(path, 'rb') as f:
+        prefix = f.read(_DMK_PREFIX.size)
+        header_len = _DMK_PREFIX.unpack(prefix)[2]
+        header, _ = read_header(prefix + f.read(header_len))
+    return header
+
+
+def decode_month(buffer):
+    """.dmk 바이트열을 EncodedMonth로 복원 (코드 행렬은 np.frombuffer 사용)"""
+    header, offset = read_header(buffer)
+    rows, cols = header['shape']
+    cells = rows * cols
+    codes = np.frombuffer(buffer, dtype=np.uint8, count=cells, offset=offset).reshape(rows, cols)
+    if header.get('duty_codes', DUTY_CODES) != DUTY_CODES:
+        # 다른 코드 표로 저장된 파일은 현재 코드 표로 재매핑
+        remap = np.array([DUTY_INDEX[normalize_duty(d)] for d in header['duty_codes']], dtype=np.uint8)
+        codes = remap[codes]
+    packed = np.frombuffer(buffer, dtype=np.uint8, count=(cells + 7) // 8, offset=offset + cells)
+    manual = np.unpackbits(packed, count=cells).reshape(rows, cols).astype(bool)
+    return EncodedMonth(header['year'], header['month'], header['workers'], codes, manual)
+
+
+def save_encoded_month(path, em, extra_header=None):
+    """임시 파일에 쓴 뒤 교체하여 .dmk 파일을 원자적으로 저장"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(encode_month(em, extra_header))
+    os.replace(tmp_path, path)
+
+
+def load_encoded_month(path, with_header=False):
+    """.dmk 파일을 읽어 EncodedMonth로 반환 (bytearray로 읽어 코드 행렬을 바로 수정 가능)
+
+    with_header=True이면 (EncodedMonth, 헤더 dict)를 반환한다.
+    """
+    with open(path, 'rb') as f:
+        buffer = bytearray(os.fstat(f.fileno()).st_size)
+        f.readinto(buffer)
+    em = decode_month(buffer)
+    if with_header:
+        return em, read_header(buffer)[0]
+    return em
+
+
+# ========================================================================
+# 5. 레거시 포맷 변환
+# ========================================================================
+def _manual_from_keys(workers, columns, manual_edits):
+    manual = np.zeros((len(workers), len(columns)), dtype=bool)
+    row_of = {w: i for i, w in enumerate(workers)}
+    col_of = {str(c): j for j, c in enumerate(columns)}
+    for item in manual_edits or []:
+        worker, col_name = item
+        if worker in row_of and col_name in col_of:
+            manual[row_of[worker], col_of[col_name]] = True
+    return manual
+
+
+def _from_columns(key, columns, index, data, manual_edits=None):
+    year, month = parse_month_key(key)
+    workers = [str(w) for w in index]
+    num_days = calendar.monthrange(year, month)[1]
+    days = np.array([day_from_label(col) for col in columns], dtype=np.int64)
+    src_codes = encode_duties(data) if workers else np.zeros((0, len(columns)), dtype=np.uint8)
+    src_manual = _manual_from_keys(workers, columns, manual_edits)
+
+    # 저장 키(월)를 기준으로 날짜 번호를 맞춰 배치 (schedule_app.py는 다른 달의 열 이름으로 저장된 경우가 있음)
+    codes = np.zeros((len(workers), num_days), dtype=np.uint8)
+    manual = np.zeros(codes.shape, dtype=bool)
+    in_range = (days >= 1) & (days <= num_days)
+    codes[:, days[in_range] - 1] = src_codes[:, in_range]
+    manual[:, days[in_range] - 1] = src_manual[:, in_range]
+    if not in_range.all() or len(columns) != num_days:
+        dropped = int(np.count_nonzero(src_codes[:, ~in_range]))
+        logging.warning(f"{key}: 열 {len(columns)}개를 {num_days}일에 맞춰 정렬했습니다. (범위 밖 근무 {dropped}건 제외)")
+    return EncodedMonth(year, month, workers, codes, manual)
+
+
+def from_dutymaker_entry(key, entry):
+    """dutymaker.py 형식 {columns, index, data, manual_edits} 항목 변환"""
+    return _from_columns(key, entry['columns'], entry['index'], entry['data'], entry.get('manual_edits'))
+
+
+def from_split_json(key, json_text):
+    """schedule_app.py 형식(to_json(orient='split') 문자열) 항목 변환"""
+    split = json.loads(json_text) if isinstance(json_text, str) else json_text
+    return _from_columns(key, split['columns'], split['index'], split['data'])
+
+
+def detect_schedule_layout(data):
+    """monthly_schedules.json 내용이 어느 앱의 레이아웃인지 판별"""
+    if not isinstance(data, dict):
+        return None
+    if isinstance(data.get('schedules'), dict):
+        return 'schedule_app'
+    if all(isinstance(v, dict) and 'data' in v for v in data.values()):
+        return 'dutymaker'
+    return None
+
+
+def iter_legacy_months(data):
+    """레거시 monthly_schedules.json 내용에서 EncodedMonth를 순서대로 생성"""
+    layout = detect_schedule_layout(data)
+    if layout == 'schedule_app':
+        for key, json_text in data['schedules'].items():
+            yield from_split_json(key, json_text)
+    elif layout == 'dutymaker':
+        for key, entry in data.items():
+            yield from_dutymaker_entry(key, entry)
+    else:
+        raise ValueError("알 수 없는 근무표 파일 레이아웃입니다.")
+
+
+def convert_legacy_file(src_path, out_dir):
+    """레거시 monthly_schedules.json을 월별 .dmk 파일로 변환하고 변환된 월 키 목록을 반환"""
+    with open(src_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    os.makedirs(out_dir, exist_ok=True)
+    converted = []
+    for em in iter_legacy_months(data):
+        save_encoded_month(os.path.join(out_dir, em.key + DMK_EXTENSION), em)
+        converted.append(em.key)
+    return converted
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="레거시 근무표 JSON을 .dmk 포맷으로 변환")
+    parser.add_argument('src', help="monthly_schedules.json 경로")
+    parser.add_argument('out_dir', help=".dmk 파일을 저장할 폴더")
+    args = parser.parse_args()
+    try:
+        keys = convert_legacy_file(args.src, args.out_dir)
+        print(f"{len(keys)}개월 변환 완료: {', '.join(sorted(keys))}")
+    except Exception as e:
+        logging.error(f"convert_legacy_file: {e}")
+        raise SystemExit(1)
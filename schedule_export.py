@@ -0,0 +1,236 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from leave_ledger import LeaveLedger
+from schedule_codec import DUTY_CODES, DUTY_INDEX, load_encoded_month, parse_month_key, weekend_mask
+from schedule_stats import TOTAL_WORK_MASK, duty_counts, weekend_work
+from schedule_store import DEFAULT_WARD, SCHEDULE_STORE_DIR, ScheduleStore
+
+# ========================================================================
+# 1. 설정 및 상수
+# ========================================================================
+SCHEDULE_SHEET_NAME = '근무표'
+SUMMARY_SHEET_NAME = '근무_통계'
+ANNUAL_STATS_SHEET_NAME = '연간_통계'
+ANNUAL_LEAVE_SHEET_NAME = '연차'
+
+EXCEL_FONT = 'Malgun Gothic'
+EXCEL_WEEKEND_BG = '#FFFBE0'
+EXCEL_N_COLOR = '#FF0000'
+EXCEL_LEAVE_BG = '#E2F0D9'
+EXCEL_HEADER_BG = '#E8F0FE'
+LEAVE_DUTIES = ['V', 'v.25', 'v.0.5']
+
+# 연간 통계 열 (Off는 'O' 코드, 주말 근무는 토/일의 D/E/N/MD/DH)
+ANNUAL_STAT_DUTIES = ['D', 'E', 'DH', 'MD', 'N', 'O', 'V', 'v.25', 'v.0.5']
+ANNUAL_STAT_COLUMNS = ['근무자', '근무 개월', '총 근무', 'D', 'E', 'DH', 'MD', 'N', 'Off', 'V', 'v.25', 'v.0.5', '주말_근무']
+
+
+# ========================================================================
+# 2. 서식
+# ========================================================================
+class ScheduleFormats:
+    """근무 코드 × 주말 여부별 셀 서식을 한 번만 만들어 두는 서식 테이블"""
+
+    def __init__(self, workbook):
+        base = {'font_name': EXCEL_FONT, 'font_size': 10, 'align': 'center', 'valign': 'vcenter', 'border': 1, 'border_color': '#D9D9D9'}
+        self.header = workbook.add_format(dict(base, bold=True, bg_color=EXCEL_HEADER_BG))
+        self.header_weekend = workbook.add_format(dict(base, bold=True, bg_color=EXCEL_WEEKEND_BG))
+        self.name = workbook.add_format(dict(base, bold=True))
+        self.text = workbook.add_format(base)
+        # by_code[주말 여부][근무 코드] → Format
+        self.by_code = []
+        for is_weekend in (False, True):
+            row = []
+            for duty in DUTY_CODES:
+                props = dict(base)
+                if is_weekend:
+                    props['bg_color'] = EXCEL_WEEKEND_BG
+                if duty in LEAVE_DUTIES:
+                    props['bg_color'] = EXCEL_LEAVE_BG
+                if duty == 'N':
+                    props.update(font_color=EXCEL_N_COLOR, bold=True)
+                row.append(workbook.add_format(props))
+            self.by_code.append(row)
+
+
+# ========================================================================
+# 3. 시트 쓰기 (constant_memory 모드: 행 순서대로 한 번만 기록)
+# ========================================================================
+def write_schedule_sheet(workbook, formats, em, sheet_name=SCHEDULE_SHEET_NAME):
+    """EncodedMonth의 코드 행렬을 근무표 시트에 한 행씩 기록"""
+    worksheet = workbook.add_worksheet(sheet_name)
+    weekend = weekend_mask(em.year, em.month)
+    labels = em.day_labels()
+
+    worksheet.freeze_panes(1, 1)
+    worksheet.set_column(0, 0, 12)
+    worksheet.set_column(1, len(labels), 7)
+    worksheet.write_string(0, 0, '근무자', formats.header)
+    for c, label in enumerate(labels):
+        worksheet.write_string(0, c + 1, label.split('/', 1)[-1], formats.header_weekend if weekend[c] else formats.header)
+
+    duty_strings = DUTY_CODES
+    fmt_rows = formats.by_code
+    weekend_list = weekend.tolist()
+    for r, (name, row_codes) in enumerate(zip(em.workers, em.codes.tolist())):
+        worksheet.write_string(r + 1, 0, name, formats.name)
+        for c, code in enumerate(row_codes):
+            fmt = fmt_rows[weekend_list[c]][code]
+            if code:
+                worksheet.write_string(r + 1, c + 1, duty_strings[code], fmt)
+            else:
+                worksheet.write_blank(r + 1, c + 1, None, fmt)
+    return worksheet
+
+
+def write_table_sheet(workbook, formats, sheet_name, columns, rows, column_widths=None):
+    """헤더와 행 목록을 표 형태의 시트로 기록 (숫자는 숫자로 기록)"""
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.freeze_panes(1, 0)
+    for c, col in enumerate(columns):
+        worksheet.set_column(c, c, (column_widths or {}).get(col, 9))
+        worksheet.write_string(0, c, str(col), formats.header)
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+                worksheet.write_number(r + 1, c, float(value), formats.text)
+            elif value is None or value != value:
+                worksheet.write_blank(r + 1, c, None, formats.text)
+            else:
+                worksheet.write_string(r + 1, c, str(value), formats.text)
+    return worksheet
+
+
+def export_month_workbook(path, em, summary_df=None):
+    """한 달 근무표(+통계)를 서식이 적용된 xlsx로 저장 (xlsxwriter constant_memory 모드)"""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        formats = ScheduleFormats(workbook)
+        write_schedule_sheet(workbook, formats, em)
+        if summary_df is not None and not summary_df.empty:
+            write_table_sheet(workbook, formats, SUMMARY_SHEET_NAME, list(summary_df.columns),
+                              summary_df.itertuples(index=False, name=None), {'근무자': 12, '직책/구분': 10})
+    finally:
+        workbook.close()
+    logging.info(f"export_month_workbook: {path}")
+    return path
+
+
+# ========================================================================
+# 4. 연간 일괄 내보내기 (병동 × 연도별 통합 문서, 프로세스 병렬)
+# ========================================================================
+class _AnnualStats:
+    """월을 하나씩 더해 근무자별 연간 통계를 누적 (월 근무표는 더한 뒤 보관하지 않음)"""
+
+    def __init__(self):
+        self.workers, self.index = [], {}
+        self.counts = np.zeros((0, len(DUTY_CODES)), dtype=np.int64)
+        self.weekend = np.zeros(0, dtype=np.int64)
+        self.months_worked = np.zeros(0, dtype=np.int64)
+
+    def add(self, em):
+        for name in em.workers:
+            if name not in self.index:
+                self.index[name] = len(self.workers)
+                self.workers.append(name)
+        grow = len(self.workers) - len(self.weekend)
+        if grow:
+            self.counts = np.vstack([self.counts, np.zeros((grow, len(DUTY_CODES)), dtype=np.int64)])
+            self.weekend = np.concatenate([self.weekend, np.zeros(grow, dtype=np.int64)])
+            self.months_worked = np.concatenate([self.months_worked, np.zeros(grow, dtype=np.int64)])
+        rows = np.array([self.index[name] for name in em.workers], dtype=np.int64)
+        self.counts[rows] += duty_counts(em.codes)
+        self.weekend[rows] += weekend_work(em.codes, weekend_mask(em.year, em.month))
+        self.months_worked[rows] += 1
+
+    def rows(self):
+        """근무자별 연간 통계 행 (ANNUAL_STAT_COLUMNS 순서)"""
+        stat_cols = [DUTY_INDEX[d] for d in ANNUAL_STAT_DUTIES]
+        total_work = self.counts[:, TOTAL_WORK_MASK].sum(axis=1)
+        return [[name, int(self.months_worked[i]), int(total_work[i])]
+                + [int(v) for v in self.counts[i, stat_cols]] + [int(self.weekend[i])]
+                for i, name in enumerate(self.workers)]
+
+
+def export_annual_workbook(path, store_root, year, ward=DEFAULT_WARD):
+    """저장소의 year년 월별 근무표로 12개월 시트 + 연간 통계 + 연차 시트 통합 문서를 저장
+
+    프로세스 풀에서 호출되므로 저장소는 경로로 받는다. 월은 하나씩 읽어 시트를 기록하고 통계와
+    연차 사용량에 더한 뒤 버리므로 한 번에 한 달 분량만 메모리에 있다. 없는 저장소 폴더는 만들지 않고
+    FileNotFoundError를 발생시킨다.
+    """
+    import xlsxwriter
+
+    if not os.path.isdir(store_root):
+        raise FileNotFoundError(f"저장소 폴더가 없습니다: {store_root}")
+    store = ScheduleStore(store_root)
+    keys = [k for k in store.list_months() if parse_month_key(k)[0] == int(year)]
+    ledger = LeaveLedger(store)
+    stats = _AnnualStats()
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        formats = ScheduleFormats(workbook)
+        for key in keys:
+            em = load_encoded_month(store.month_path(*parse_month_key(key)))
+            write_schedule_sheet(workbook, formats, em, sheet_name=f"{em.month}월")
+            stats.add(em)
+            ledger.update_month(em)  # 연차 집계가 같은 달을 다시 읽지 않도록 사용량만 남김
+        workers = stats.workers
+        granted = ledger.entitlements(year, workers)
+        used = ledger.schedule_usage(year, workers)
+        remaining = ledger.balances(year, workers)
+        leave_rows = [[name, granted[name], round(float(u), 2), remaining[name]] for name, u in zip(workers, used)]
+        write_table_sheet(workbook, formats, ANNUAL_STATS_SHEET_NAME, ANNUAL_STAT_COLUMNS, stats.rows(), {'근무자': 12})
+        write_table_sheet(workbook, formats, ANNUAL_LEAVE_SHEET_NAME, ['근무자', '부여 연차', '근무표 사용', '잔여 연차'],
+                          leave_rows, {'근무자': 12, '부여 연차': 10, '근무표 사용': 11, '잔여 연차': 10})
+    finally:
+        workbook.close()
+    return {'path': path, 'ward': ward, 'year': int(year), 'months': len(keys), 'workers': len(workers)}
+
+
+def export_annual_workbooks(out_dir, ward_roots, years, max_workers=None, report=None):
+    """{병동: 저장소 경로} × 연도마다 연간 통합 문서를 병렬 프로세스로 만들고 결과 목록을 반환"""
+    report = report or (lambda msg: None)
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(os.path.join(out_dir, f"{ward}_{int(year)}.xlsx"), root, int(year), ward)
+            for ward, root in ward_roots.items() for year in years]
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(export_annual_workbook, *job): job for job in jobs}
+        for done, future in enumerate(as_completed(futures), start=1):
+            path, _, year, ward = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"export_annual_workbook {ward} {year}: {e}")
+                report(f"[{done}/{len(jobs)}] {ward} {year}년: 실패 ({e})")
+                continue
+            results.append(result)
+            report(f"[{done}/{len(jobs)}] {ward} {year}년: {result['months']}개월, 근무자 {result['workers']}명 → {path}")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="병동별 연간 근무표 통합 문서 일괄 내보내기")
+    parser.add_argument('out_dir', help="통합 문서를 저장할 폴더")
+    parser.add_argument('--year', type=int, action='append', required=True, help="내보낼 연도 (여러 번 지정 가능)")
+    parser.add_argument('--ward', action='append', help="병동=저장소폴더 (여러 번 지정 가능, 생략 시 기본 저장소)")
+    parser.add_argument('--jobs', type=int, help="동시에 실행할 프로세스 수 (기본: CPU 수)")
+    args = parser.parse_args()
+
+    ward_roots = {}
+    for arg in args.ward or [f"{DEFAULT_WARD}={SCHEDULE_STORE_DIR}"]:
+        name, _, root = arg.partition('=')
+        ward_roots[name] = root or SCHEDULE_STORE_DIR
+    results = export_annual_workbooks(args.out_dir, ward_roots, args.year, args.jobs, report=print)
+    if len(results) < len(ward_roots) * len(args.year):
+        raise SystemExit(1)
@@ -0,0 +1,350 @@
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+from schedule_codec import DUTY_CODES, DUTY_INDEX
+
+# ========================================================================
+# 1. 설정 및 상수
+# ========================================================================
+GRID_FONT = ('Malgun Gothic', 10)
+GRID_BOLD_FONT = ('Malgun Gothic', 10, 'bold')
+GRID_NAME_WIDTH = 100
+GRID_CELL_WIDTH = 60
+GRID_ROW_HEIGHT = 25
+GRID_HEADER_HEIGHT = 28
+
+GRID_BG = 'white'
+GRID_LINE = '#E0E0E0'
+GRID_HEADER_BG = 'white'
+GRID_HEADER_FG = '#A9A9A9'
+GRID_WEEKEND_BG = '#FFFBE0'
+GRID_LEAVE_BG = '#E2F0D9'
+GRID_N_FG = '#FF0000'
+GRID_TEXT_FG = '#333333'
+GRID_MANUAL_MARK = '#0066FF'  # 수동 편집 칸 오른쪽 위 삼각형 표시
+GRID_FOOTER_BG = '#F2F4F7'
+GRID_FOOTER_SHORT_BG = '#FDECEA'
+GRID_FOOTER_SHORT_FG = '#D32F2F'
+GRID_SELECTION = '#0066FF'
+LEAVE_DUTIES = ['V', 'v.25', 'v.0.5']
+MANUAL_MARK_SIZE = 7
+
+
+def _cell_style_tables():
+    """(주말 여부, 근무 코드) → 배경색 / 글자색 / 글꼴 조회 테이블"""
+    fill = np.empty((2, len(DUTY_CODES)), dtype=object)
+    text = np.full(len(DUTY_CODES), GRID_TEXT_FG, dtype=object)
+    font = np.empty(len(DUTY_CODES), dtype=object)
+    for code, duty in enumerate(DUTY_CODES):
+        for is_weekend in (0, 1):
+            fill[is_weekend, code] = GRID_LEAVE_BG if duty in LEAVE_DUTIES else (GRID_WEEKEND_BG if is_weekend else GRID_BG)
+        font[code] = GRID_FONT
+    text[DUTY_INDEX['N']] = GRID_N_FG
+    font[DUTY_INDEX['N']] = GRID_BOLD_FONT
+    return fill, text, font
+
+
+CELL_FILL, CELL_TEXT, CELL_FONT = _cell_style_tables()
+
+
+# ========================================================================
+# 2. 가상 스크롤 근무표 그리드
+# ========================================================================
+class ScheduleGrid(ttk.Frame):
+    """Canvas에 보이는 칸만 그리는 (근무자 × 일) 근무표 그리드
+
+    근무 코드 행렬(uint8)과 수동 편집 마스크를 그대로 참조하며, 스크롤할 때마다 화면에 보이는
+    행/열 범위만 다시 그린다. 캔버스 항목은 칸 슬롯 단위로 재사용하므로 근무자가 수백 명이어도
+    항목 수는 화면 크기에만 비례한다. 근무자 이름 열과 날짜 헤더는 고정된다.
+    마지막 행(footer)은 일별 인원 현황처럼 근무 코드가 아닌 문자열을 표시한다.
+    """
+
+    def __init__(self, master, on_scroll=None):
+        super().__init__(master)
+        self.on_scroll = on_scroll or (lambda: None)
+        self.canvas = tk.Canvas(self, bg=GRID_BG, highlightthickness=0, takefocus=1)
+        self.scroll_y = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scroll_x = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.xview)
+        self.scroll_y.pack(side='right', fill='y')
+        self.scroll_x.pack(side='bottom', fill='x')
+        self.canvas.pack(side='left', fill='both', expand=True)
+
+        self.row_labels, self.col_labels = [], []
+        self.codes = np.zeros((0, 0), dtype=np.uint8)
+        self.manual = np.zeros((0, 0), dtype=bool)
+        self.weekend = np.zeros(0, dtype=bool)
+        self.footer_label, self.footer_values, self.footer_short = None, [], np.zeros(0, dtype=bool)
+        self.x0 = self.y0 = 0  # 본문 영역 스크롤 위치 (px)
+
+        self._cell_items = []    # [(rect, text, mark)] 본문 칸 슬롯
+        self._header_items = []  # [(rect, text)] 날짜 헤더 슬롯
+        self._name_items = []    # [(rect, text)] 근무자 이름 슬롯
+        self._visible = {}       # (행, 열) → 본문 칸 슬롯 번호
+        self._visible_names = {}  # 행 → 이름 슬롯 번호
+        self._corner = None
+        self._selection_item = None  # 선택 범위 테두리
+        self.anchor = self.cursor = None  # 선택 시작 칸 / 현재 칸 (행, 열)
+
+        self.canvas.bind('<Configure>', lambda e: self.redraw())
+        self.canvas.bind('<MouseWheel>', lambda e: self.yview('scroll', int(-1 * (e.delta / 120)), 'units'))
+        self.canvas.bind('<Shift-MouseWheel>', lambda e: self.xview('scroll', int(-1 * (e.delta / 120)), 'units'))
+        self.canvas.bind('<Button-4>', lambda e: self.yview('scroll', -1, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.yview('scroll', 1, 'units'))
+
+    # ------------------------------------------------------------------
+    # [데이터]
+    # ------------------------------------------------------------------
+    def set_data(self, row_labels, col_labels, codes, manual, weekend, footer_label=None, footer_values=None, footer_short=None):
+        """표시할 월 데이터를 지정 (codes/manual은 복사하지 않고 참조하므로 바꾼 뒤 refresh_cell 호출)"""
+        self.row_labels, self.col_labels = list(row_labels), list(col_labels)
+        self.codes, self.manual = codes, manual
+        self.weekend = np.asarray(weekend, dtype=bool)
+        self.footer_label = footer_label
+        self.footer_values = list(footer_values or [])
+        self.footer_short = np.zeros(len(self.col_labels), dtype=bool) if footer_short is None else np.asarray(footer_short, dtype=bool)
+        self.x0 = self.y0 = 0
+        self.anchor = self.cursor = None
+        self.redraw()
+
+    @property
+    def num_rows(self):
+        """본문 행 수 (footer 포함)"""
+        return len(self.row_labels) + (1 if self.footer_label is not None else 0)
+
+    @property
+    def footer_row(self):
+        return len(self.row_labels) if self.footer_label is not None else None
+
+    def set_footer(self, values, short):
+        self.footer_values, self.footer_short = list(values), np.asarray(short, dtype=bool)
+        self.redraw()
+
+    def set_footer_cell(self, col, value, short):
+        self.footer_values[col] = value
+        self.footer_short[col] = short
+        self.refresh_cell(len(self.row_labels), col)
+
+    def set_row_label(self, row, label):
+        self.row_labels[row] = label
+        slot = self._visible_names.get(row)
+        if slot is not None:
+            self.canvas.itemconfigure(self._name_items[slot][1], text=label)
+
+    # ------------------------------------------------------------------
+    # [좌표]
+    # ------------------------------------------------------------------
+    def _viewport(self):
+        width = max(self.canvas.winfo_width() - GRID_NAME_WIDTH, 1)
+        height = max(self.canvas.winfo_height() - GRID_HEADER_HEIGHT, 1)
+        return width, height
+
+    def cell_at(self, x, y):
+        """캔버스 좌표 → (행, 열). 헤더는 행 -1, 이름 열은 열 -1, 범위 밖은 None"""
+        row = -1 if y < GRID_HEADER_HEIGHT else int((y - GRID_HEADER_HEIGHT + self.y0) // GRID_ROW_HEIGHT)
+        col = -1 if x < GRID_NAME_WIDTH else int((x - GRID_NAME_WIDTH + self.x0) // GRID_CELL_WIDTH)
+        if row >= self.num_rows or col >= len(self.col_labels):
+            return None
+        return row, col
+
+    def cell_bbox(self, row, col):
+        """본문 칸의 캔버스 좌표 (x, y, 너비, 높이) — 화면에 보이지 않으면 None"""
+        x = GRID_NAME_WIDTH + col * GRID_CELL_WIDTH - self.x0
+        y = GRID_HEADER_HEIGHT + row * GRID_ROW_HEIGHT - self.y0
+        width, height = self._viewport()
+        if x < GRID_NAME_WIDTH or y < GRID_HEADER_HEIGHT or x + GRID_CELL_WIDTH > GRID_NAME_WIDTH + width or y + GRID_ROW_HEIGHT > GRID_HEADER_HEIGHT + height:
+            return None
+        return x, y, GRID_CELL_WIDTH, GRID_ROW_HEIGHT
+
+    def body_cell_at(self, x, y):
+        """캔버스 좌표에 가장 가까운 근무 칸 (행, 열) — 드래그가 표 밖으로 나가도 끝 칸으로 맞춤"""
+        row = int((y - GRID_HEADER_HEIGHT + self.y0) // GRID_ROW_HEIGHT)
+        col = int((x - GRID_NAME_WIDTH + self.x0) // GRID_CELL_WIDTH)
+        return (min(max(row, 0), len(self.row_labels) - 1), min(max(col, 0), len(self.col_labels) - 1))
+
+    def see(self, row, col):
+        """(행, 열) 칸이 화면에 모두 보이도록 스크롤"""
+        width, height = self._viewport()
+        x, y = col * GRID_CELL_WIDTH, row * GRID_ROW_HEIGHT
+        x0 = min(max(self.x0, x + GRID_CELL_WIDTH - width), x)
+        y0 = min(max(self.y0, y + GRID_ROW_HEIGHT - height), y)
+        if (x0, y0) != (self.x0, self.y0):
+            self._scroll_to(x0, y0)
+
+    # ------------------------------------------------------------------
+    # [범위 선택]
+    # ------------------------------------------------------------------
+    def select(self, row, col, extend=False):
+        """근무 칸 선택 (extend=True면 시작 칸에서 (행, 열)까지 사각형 범위로 확장)"""
+        if not self.row_labels or not self.col_labels:
+            return
+        cell = (min(max(row, 0), len(self.row_labels) - 1), min(max(col, 0), len(self.col_labels) - 1))
+        if not extend or self.anchor is None:
+            self.anchor = cell
+        self.cursor = cell
+        self._draw_selection()
+
+    def clear_selection(self):
+        self.anchor = self.cursor = None
+        self._draw_selection()
+
+    def selection(self):
+        """선택 범위 (첫 행, 첫 열, 끝 행, 끝 열 — 끝 포함), 선택이 없으면 None"""
+        if self.anchor is None:
+            return None
+        (r0, c0), (r1, c1) = self.anchor, self.cursor
+        return min(r0, r1), min(c0, c1), max(r0, r1), max(c0, c1)
+
+    def _draw_selection(self):
+        canvas = self.canvas
+        if self._selection_item is None:
+            self._selection_item = canvas.create_rectangle(0, 0, 0, 0, outline=GRID_SELECTION, width=2, state='hidden', tags=('selection',))
+        selected = self.selection()
+        if selected is None:
+            canvas.itemconfigure(self._selection_item, state='hidden')
+        else:
+            r0, c0, r1, c1 = selected
+            canvas.coords(self._selection_item,
+                          GRID_NAME_WIDTH + c0 * GRID_CELL_WIDTH - self.x0, GRID_HEADER_HEIGHT + r0 * GRID_ROW_HEIGHT - self.y0,
+                          GRID_NAME_WIDTH + (c1 + 1) * GRID_CELL_WIDTH - self.x0, GRID_HEADER_HEIGHT + (r1 + 1) * GRID_ROW_HEIGHT - self.y0)
+            canvas.itemconfigure(self._selection_item, state='normal')
+            canvas.tag_raise('selection')
+        # 선택 테두리는 본문 위, 고정 영역(헤더/이름 열) 아래
+        if self._header_items or self._name_items:
+            canvas.tag_raise('fixed')
+        if self._corner is not None:
+            canvas.tag_raise('corner')
+
+    # ------------------------------------------------------------------
+    # [스크롤] (Scrollbar command 프로토콜: moveto 비율 / scroll n units|pages)
+    # ------------------------------------------------------------------
+    def _scroll_to(self, x0, y0):
+        width, height = self._viewport()
+        total_w, total_h = len(self.col_labels) * GRID_CELL_WIDTH, self.num_rows * GRID_ROW_HEIGHT
+        x0 = int(min(max(x0, 0), max(total_w - width, 0)))
+        y0 = int(min(max(y0, 0), max(total_h - height, 0)))
+        if (x0, y0) != (self.x0, self.y0):
+            self.x0, self.y0 = x0, y0
+            self.on_scroll()
+            self.redraw()
+
+    def _view_args(self, args, position, total, page, unit):
+        if args[0] == 'moveto':
+            return float(args[1]) * total
+        step = page if args[2].startswith('page') else unit
+        return position + int(args[1]) * step
+
+    def xview(self, *args):
+        width, _ = self._viewport()
+        self._scroll_to(self._view_args(args, self.x0, len(self.col_labels) * GRID_CELL_WIDTH, width, GRID_CELL_WIDTH), self.y0)
+
+    def yview(self, *args):
+        _, height = self._viewport()
+        self._scroll_to(self.x0, self._view_args(args, self.y0, self.num_rows * GRID_ROW_HEIGHT, height, GRID_ROW_HEIGHT * 3))
+
+    def _update_scrollbars(self, width, height):
+        total_w = max(len(self.col_labels) * GRID_CELL_WIDTH, 1)
+        total_h = max(self.num_rows * GRID_ROW_HEIGHT, 1)
+        self.scroll_x.set(self.x0 / total_w, min((self.x0 + width) / total_w, 1.0))
+        self.scroll_y.set(self.y0 / total_h, min((self.y0 + height) / total_h, 1.0))
+
+    # ------------------------------------------------------------------
+    # [그리기]
+    # ------------------------------------------------------------------
+    def _slot(self, items, index, kind):
+        """index번 캔버스 항목 슬롯을 반환 (모자라면 새로 만듦)"""
+        while len(items) <= index:
+            rect = self.canvas.create_rectangle(0, 0, 0, 0, outline=GRID_LINE, tags=(kind,))
+            text = self.canvas.create_text(0, 0, font=GRID_FONT, tags=(kind,))
+            if kind == 'cell':
+                mark = self.canvas.create_polygon(0, 0, 0, 0, 0, 0, fill=GRID_MANUAL_MARK, outline='', state='hidden', tags=(kind,))
+                items.append((rect, text, mark))
+            else:
+                items.append((rect, text))
+        return items[index]
+
+    def _hide_from(self, items, start):
+        for slot in items[start:]:
+            for item in slot:
+                self.canvas.itemconfigure(item, state='hidden')
+
+    def _draw_cell(self, slot, row, col, x, y):
+        rect, text, mark = slot
+        canvas = self.canvas
+        canvas.coords(rect, x, y, x + GRID_CELL_WIDTH, y + GRID_ROW_HEIGHT)
+        canvas.coords(text, x + GRID_CELL_WIDTH / 2, y + GRID_ROW_HEIGHT / 2)
+        if row == self.footer_row:
+            short = bool(self.footer_short[col]) if col < len(self.footer_short) else False
+            canvas.itemconfigure(rect, fill=GRID_FOOTER_SHORT_BG if short else GRID_FOOTER_BG, state='normal')
+            canvas.itemconfigure(text, text=self.footer_values[col] if col < len(self.footer_values) else '',
+                                 fill=GRID_FOOTER_SHORT_FG if short else GRID_TEXT_FG, font=GRID_FONT, state='normal')
+            canvas.itemconfigure(mark, state='hidden')
+            return
+        code = int(self.codes[row, col])
+        canvas.itemconfigure(rect, fill=CELL_FILL[int(self.weekend[col]), code], state='normal')
+        canvas.itemconfigure(text, text=DUTY_CODES[code], fill=CELL_TEXT[code], font=CELL_FONT[code], state='normal')
+        if self.manual[row, col]:
+            right = x + GRID_CELL_WIDTH
+            canvas.coords(mark, right - MANUAL_MARK_SIZE, y + 1, right - 1, y + 1, right - 1, y + MANUAL_MARK_SIZE)
+            canvas.itemconfigure(mark, state='normal')
+        else:
+            canvas.itemconfigure(mark, state='hidden')
+
+    def redraw(self):
+        """현재 스크롤 위치에서 보이는 칸만 그림"""
+        canvas = self.canvas
+        width, height = self._viewport()
+        self._update_scrollbars(width, height)
+        first_row, first_col = self.y0 // GRID_ROW_HEIGHT, self.x0 // GRID_CELL_WIDTH
+        last_row = min(self.num_rows, (self.y0 + height) // GRID_ROW_HEIGHT + 1)
+        last_col = min(len(self.col_labels), (self.x0 + width) // GRID_CELL_WIDTH + 1)
+
+        self._visible = {}
+        n = 0
+        for row in range(first_row, last_row):
+            y = GRID_HEADER_HEIGHT + row * GRID_ROW_HEIGHT - self.y0
+            for col in range(first_col, last_col):
+                self._visible[row, col] = n
+                self._draw_cell(self._slot(self._cell_items, n, 'cell'), row, col, GRID_NAME_WIDTH + col * GRID_CELL_WIDTH - self.x0, y)
+                n += 1
+        self._hide_from(self._cell_items, n)
+
+        # 고정 영역: 날짜 헤더와 근무자 이름 열은 본문 위에 그림
+        n = 0
+        for col in range(first_col, last_col):
+            rect, text = self._slot(self._header_items, n, 'fixed')
+            x = GRID_NAME_WIDTH + col * GRID_CELL_WIDTH - self.x0
+            canvas.coords(rect, x, 0, x + GRID_CELL_WIDTH, GRID_HEADER_HEIGHT)
+            canvas.coords(text, x + GRID_CELL_WIDTH / 2, GRID_HEADER_HEIGHT / 2)
+            canvas.itemconfigure(rect, fill=GRID_WEEKEND_BG if self.weekend[col] else GRID_HEADER_BG, state='normal')
+            canvas.itemconfigure(text, text=self.col_labels[col].split('/', 1)[-1].strip(), fill=GRID_HEADER_FG, font=GRID_BOLD_FONT, state='normal')
+            n += 1
+        self._hide_from(self._header_items, n)
+
+        self._visible_names = {}
+        n = 0
+        for row in range(first_row, last_row):
+            rect, text = self._slot(self._name_items, n, 'fixed')
+            y = GRID_HEADER_HEIGHT + row * GRID_ROW_HEIGHT - self.y0
+            footer = row == self.footer_row
+            canvas.coords(rect, 0, y, GRID_NAME_WIDTH, y + GRID_ROW_HEIGHT)
+            canvas.coords(text, GRID_NAME_WIDTH / 2, y + GRID_ROW_HEIGHT / 2)
+            canvas.itemconfigure(rect, fill=GRID_FOOTER_BG if footer else GRID_BG, state='normal')
+            canvas.itemconfigure(text, text=self.footer_label if footer else self.row_labels[row], fill=GRID_TEXT_FG, font=GRID_FONT, state='normal')
+            self._visible_names[row] = n
+            n += 1
+        self._hide_from(self._name_items, n)
+
+        if self._corner is None:
+            self._corner = (canvas.create_rectangle(0, 0, GRID_NAME_WIDTH, GRID_HEADER_HEIGHT, fill=GRID_HEADER_BG, outline=GRID_LINE, tags=('corner',)),
+                            canvas.create_text(GRID_NAME_WIDTH / 2, GRID_HEADER_HEIGHT / 2, text='근무자', fill=GRID_HEADER_FG, font=GRID_BOLD_FONT, tags=('corner',)))
+        self._draw_selection()
+
+    def refresh_cell(self, row, col):
+        """칸 하나만 다시 그림 (화면 밖이면 다음 redraw에서 반영)"""
+        slot = self._visible.get((row, col))
+        if slot is None:
+            return
+        self._draw_cell(self._cell_items[slot], row, col,
+                        GRID_NAME_WIDTH + col * GRID_CELL_WIDTH - self.x0, GRID_HEADER_HEIGHT + row * GRID_ROW_HEIGHT - self.y0)
@@ -0,0 +1,105 @@
+import numpy as np
+
+from schedule_codec import DUTY_CODES
+
+# ========================================================================
+# 1. 설정 및 상수
+# ========================================================================
+# 월마다 보관하는 실행 취소 단계 수 (넘으면 오래된 것부터 버림)
+HISTORY_LIMIT = 200
+
+
+# ========================================================================
+# 2. 셀 변경 기록
+# ========================================================================
+class CellDelta:
+    """한 번의 편집(칸 하나, 범위 채우기, 재생성, 초기화)으로 바뀐 칸들의 (행, 열, 이전/새 코드, 이전/새 수동 편집)
+
+    DataFrame 복사본 대신 바뀐 칸만 작은 정수 배열로 보관한다. workers는 기록 당시 근무자 순서로,
+    되돌릴 때 현재 근무표와 행 순서가 같은지 확인하는 데 쓴다.
+    """
+
+    __slots__ = ('key', 'workers', 'label', 'rows', 'cols', 'old_codes', 'new_codes', 'old_manual', 'new_manual')
+
+    def __init__(self, key, workers, label, rows, cols, old_codes, new_codes, old_manual, new_manual):
+        self.key, self.workers, self.label = key, tuple(workers), label
+        self.rows = np.asarray(rows, dtype=np.int32)
+        self.cols = np.asarray(cols, dtype=np.uint8)
+        self.old_codes = np.asarray(old_codes, dtype=np.uint8)
+        self.new_codes = np.asarray(new_codes, dtype=np.uint8)
+        self.old_manual = np.asarray(old_manual, dtype=bool)
+        self.new_manual = np.asarray(new_manual, dtype=bool)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ('rows', 'cols', 'old_codes', 'new_codes', 'old_manual', 'new_manual'))
+
+    def changes(self, undo=True):
+        """apply_cell_changes 형식의 (행, 열, 근무, 수동 편집) 목록 (undo=False면 다시 실행용)"""
+        codes, manual = (self.old_codes, self.old_manual) if undo else (self.new_codes, self.new_manual)
+        return [(r, c, DUTY_CODES[code], m) for r, c, code, m in
+                zip(self.rows.tolist(), self.cols.tolist(), codes.tolist(), manual.tolist())]
+
+
+def diff_months(key, workers, before_codes, before_manual, after_codes, after_manual, label=''):
+    """같은 근무자 순서의 두 (코드, 수동 편집) 행렬 사이에서 바뀐 칸만 CellDelta로 (바뀐 칸이 없으면 None)"""
+    changed = (before_codes != after_codes) | (before_manual != after_manual)
+    rows, cols = np.nonzero(changed)
+    if not len(rows):
+        return None
+    return CellDelta(key, workers, label, rows, cols, before_codes[rows, cols], after_codes[rows, cols],
+                     before_manual[rows, cols], after_manual[rows, cols])
+
+
+# ========================================================================
+# 3. 월별 실행 취소 / 다시 실행 스택
+# ========================================================================
+class EditHistory:
+    """월 키별 실행 취소 / 다시 실행 스택 (새 편집을 기록하면 해당 월의 다시 실행 스택은 비움)"""
+
+    def __init__(self, limit=HISTORY_LIMIT):
+        self.limit = limit
+        self._undo = {}
+        self._redo = {}
+
+    def record(self, delta):
+        if delta is None or not len(delta):
+            return
+        stack = self._undo.setdefault(delta.key, [])
+        stack.append(delta)
+        if len(stack) > self.limit:
+            del stack[:len(stack) - self.limit]
+        self._redo.pop(delta.key, None)
+
+    def can_undo(self, key):
+        return bool(self._undo.get(key))
+
+    def can_redo(self, key):
+        return bool(self._redo.get(key))
+
+    def undo(self, key):
+        """되돌릴 편집을 꺼내 다시 실행 스택으로 옮기고 반환 (없으면 None)"""
+        if not self._undo.get(key):
+            return None
+        delta = self._undo[key].pop()
+        self._redo.setdefault(key, []).append(delta)
+        return delta
+
+    def redo(self, key):
+        """다시 실행할 편집을 꺼내 실행 취소 스택으로 옮기고 반환 (없으면 None)"""
+        if not self._redo.get(key):
+            return None
+        delta = self._redo[key].pop()
+        self._undo.setdefault(key, []).append(delta)
+        return delta
+
+    def forget(self, key):
+        self._undo.pop(key, None)
+        self._redo.pop(key, None)
+
+    @property
+    def nbytes(self):
+        return sum(delta.nbytes for stacks in (self._undo, self._redo) for stack in stacks.values() for delta in stack)
@@ -0,0 +1,237 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+import logging
+
+import numpy as np
+
+from schedule_codec import DUTY_CODES, DUTY_INDEX
+from schedule_store import SCHEDULE_STORE_DIR, ScheduleStore
+
+# ========================================================================
+# 1. 설정 및 상수
+# ========================================================================
+ICAL_PRODID = '-//dutymaker//schedule feed//KO'
+ICAL_UID_DOMAIN = 'dutymaker'
+ICAL_EXTENSION = '.ics'
+# 근무 시각은 병원 현지 시각이므로 TZID를 붙이고 캘린더에 VTIMEZONE을 함께 기록 (한국은 서머타임 없음)
+ICAL_TZID = 'Asia/Seoul'
+ICAL_VTIMEZONE = ['BEGIN:VTIMEZONE', f'TZID:{ICAL_TZID}', 'BEGIN:STANDARD', 'DTSTART:19700101T000000',
+                  'TZOFFSETFROM:+0900', 'TZOFFSETTO:+0900', 'TZNAME:KST', 'END:STANDARD', 'END:VTIMEZONE']
+# 근무별 일정 (시작, 종료, 일정 제목) — 종료가 시작보다 이르면 다음 날 종료, 시간이 None이면 종일 일정
+# O(오프)와 빈 칸은 일정을 만들지 않는다.
+DEFAULT_SHIFT_TIMES = {
+    'D': ('07:00', '15:00', 'D 데이 근무'),
+    'E': ('15:00', '23:00', 'E 이브닝 근무'),
+    'N': ('23:00', '07:00', 'N 나이트 근무'),
+    'MD': ('08:30', '17:30', 'MD 근무'),
+    'DH': ('08:30', '12:30', 'DH 근무'),
+    'V': (None, None, '연차'),
+    'v.0.5': (None, None, '반차'),
+    'v.25': (None, None, '반반차'),
+}
+_UNSAFE_FILENAME_RE = re.compile(r'[\\/:*?"<>|\s]+')
+_SHIFT_TIME_RE = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*$')
+
+
+def _escape(text):
+    return str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _parse_shift_time(duty, value):
+    """'7:00' / '07:00' 형식 시각을 datetime.time으로 (None은 종일 일정)"""
+    if value is None:
+        return None
+    match = _SHIFT_TIME_RE.match(str(value))
+    if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        raise ValueError(f"{duty}: 시각 형식이 올바르지 않습니다 (HH:MM): {value!r}")
+    return datetime.time(int(match.group(1)), int(match.group(2)))
+
+
+def _parse_shift(duty, value):
+    """[시작, 종료, 제목] 설정을 (time, time, 제목)으로 검사·변환 — 시작/종료는 둘 다 있거나 둘 다 None"""
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        raise ValueError(f"{duty}: [시작, 종료, 제목] 형식이어야 합니다: {value!r}")
+    start, end = _parse_shift_time(duty, value[0]), _parse_shift_time(duty, value[1])
+    if (start is None) != (end is None):
+        raise ValueError(f"{duty}: 시작과 종료 시각은 함께 지정하거나 함께 비워야 합니다: {value!r}")
+    if start is not None and start == end:
+        raise ValueError(f"{duty}: 시작과 종료 시각이 같습니다: {value!r}")
+    return start, end, str(value[2])
+
+
+def load_shift_times(path=None):
+    """기본 근무 시간에 JSON 파일({근무: [시작, 종료, 제목]})의 설정을 덮어써서 {근무: (time, time, 제목)}로 반환
+
+    잘못된 근무 코드나 시각은 ValueError로 거부한다. 값이 null인 근무는 일정을 만들지 않는다.
+    """
+    shift_times = dict(DEFAULT_SHIFT_TIMES)
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            for duty, value in json.load(f).items():
+                if duty not in DUTY_INDEX:
+                    raise ValueError(f"알 수 없는 근무 코드: {duty!r}")
+                shift_times[duty] = value or None
+    return {duty: _parse_shift(duty, value) for duty, value in shift_times.items() if value}
+
+
+# ========================================================================
+# 2. 기간 근무표 구성
+# ========================================================================
+def _month_range(start, end):
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year, month + 1) if month < 12 else (year + 1, 1)
+
+
+def load_range(store, start, end):
+    """start~end(포함) 기간의 저장된 월을 (근무자 목록, (근무자 × 일) 코드 행렬, 날짜 목록)으로 합침"""
+    num_days = (end - start).days + 1
+    if num_days <= 0:
+        raise ValueError("종료일이 시작일보다 빠릅니다.")
+    workers, index, blocks = [], {}, []
+    for year, month in _month_range(start, end):
+        em = store.load_month(year, month)
+        if em is None:
+            continue
+        month_start = datetime.date(year, month, 1)
+        first = max((start - month_start).days, 0)
+        last = min((end - month_start).days + 1, em.num_days)
+        for name in em.workers:
+            if name not in index:
+                index[name] = len(workers)
+                workers.append(name)
+        rows = np.array([index[name] for name in em.workers], dtype=np.int64)
+        blocks.append((rows, (month_start - start).days + first, em.codes[:, first:last]))
+
+    codes = np.zeros((len(workers), num_days), dtype=np.uint8)
+    for rows, offset, block in blocks:
+        codes[rows, offset:offset + block.shape[1]] = block
+    dates = [start + datetime.timedelta(days=i) for i in range(num_days)]
+    return workers, codes, dates
+
+
+# ========================================================================
+# 3. iCalendar 쓰기
+# ========================================================================
+def _event_templates(shift_times):
+    """근무 코드 → (DTSTART/DTEND 생성 함수, SUMMARY 줄) 테이블 (일정이 없는 코드는 None)
+
+    shift_times는 load_shift_times 결과({근무: (time, time, 제목)})이다.
+    """
+    templates = [None] * len(DUTY_CODES)
+    for duty, (start, end, title) in shift_times.items():
+        if start is None:
+            def times(date, next_date):
+                return (f"DTSTART;VALUE=DATE:{date:%Y%m%d}", f"DTEND;VALUE=DATE:{next_date:%Y%m%d}")
+        else:
+            start_hm, end_hm = f"{start:%H%M}", f"{end:%H%M}"
+            overnight = end < start
+
+            def times(date, next_date, start_hm=start_hm, end_hm=end_hm, overnight=overnight):
+                end_date = next_date if overnight else date
+                return (f"DTSTART;TZID={ICAL_TZID}:{date:%Y%m%d}T{start_hm}00",
+                        f"DTEND;TZID={ICAL_TZID}:{end_date:%Y%m%d}T{end_hm}00")
+        templates[DUTY_INDEX[duty]] = (times, f"SUMMARY:{_escape(title)}")
+    return templates
+
+
+def _calendar_header(worker):
+    return ['BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{ICAL_PRODID}', 'CALSCALE:GREGORIAN',
+            f'X-WR-CALNAME:{_escape(worker)} 근무', f'X-WR-TIMEZONE:{ICAL_TZID}'] + ICAL_VTIMEZONE
+
+
+def _feed_file_names(workers):
+    """근무자별 .ics 파일 이름 — 안전한 문자로 바꾼 이름이 겹치면 '_2', '_3'…을 붙여 구분
+
+    대소문자를 구분하지 않는 파일 시스템(Windows, macOS)도 고려해 소문자로 비교한다.
+    """
+    names, used = [], set()
+    for worker in workers:
+        base = _UNSAFE_FILENAME_RE.sub('_', worker)
+        name, n = base, 1
+        while name.lower() in used:
+            n += 1
+            name = f"{base}_{n}"
+        used.add(name.lower())
+        names.append(name + ICAL_EXTENSION)
+    return names
+
+
+def write_worker_feeds(out_dir, workers, codes, dates, shift_times=None, report=None):
+    """(근무자 × 일) 코드 행렬에서 근무자별 .ics 파일을 만들고 {근무자: 경로}를 반환
+
+    일정이 있는 셀을 np.nonzero로 한 번에 찾아 근무자 순서대로 한 번만 훑으며 파일을 기록한다.
+    UID는 근무자와 날짜로 정해지므로 다시 생성해도 같은 날 일정은 갱신된다.
+    파일 이름이 겹치는 근무자는 뒤에 번호를 붙여 서로 덮어쓰지 않게 한다.
+    """
+    report = report or (lambda msg: None)
+    shift_times = load_shift_times() if shift_times is None else shift_times
+    templates = _event_templates(shift_times)
+    has_event = np.array([t is not None for t in templates])
+    os.makedirs(out_dir, exist_ok=True)
+
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime('DTSTAMP:%Y%m%dT%H%M%SZ')
+    day_keys = [f"{d:%Y%m%d}" for d in dates]
+    next_dates = [d + datetime.timedelta(days=1) for d in dates]
+    worker_ids = [hashlib.blake2b(name.encode('utf-8'), digest_size=6).hexdigest() for name in workers]
+
+    # 근무자별 (일정 칸 시작, 끝) 구간 — nonzero 결과는 근무자 순으로 정렬되어 있음
+    rows, cols = np.nonzero(has_event[codes])
+    bounds = np.searchsorted(rows, np.arange(len(workers) + 1))
+    row_codes = codes[rows, cols].tolist()
+    cols = cols.tolist()
+
+    paths = {}
+    file_names = _feed_file_names(workers)
+    for r, name in enumerate(workers):
+        lines = _calendar_header(name)
+        for i in range(bounds[r], bounds[r + 1]):
+            c = cols[i]
+            times, summary = templates[row_codes[i]]
+            dtstart, dtend = times(dates[c], next_dates[c])
+            lines += ['BEGIN:VEVENT', f'UID:{worker_ids[r]}-{day_keys[c]}@{ICAL_UID_DOMAIN}', stamp,
+                      dtstart, dtend, summary, 'END:VEVENT']
+        lines.append('END:VCALENDAR')
+        path = os.path.join(out_dir, file_names[r])
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write('\r\n'.join(lines) + '\r\n')
+        paths[name] = path
+    report(f"[iCalendar] 근무자 {len(workers)}명, 일정 {len(row_codes)}건 → {out_dir}")
+    return paths
+
+
+def export_ical(store, out_dir, start, end, shift_times=None, report=None):
+    """저장소의 start~end 기간 근무표로 근무자별 .ics 파일을 생성"""
+    workers, codes, dates = load_range(store, start, end)
+    return write_worker_feeds(out_dir, workers, codes, dates, shift_times, report)
+
+
+if __name__ == "__main__":
+    import argparse
+    import calendar
+
+    parser = argparse.ArgumentParser(description="저장된 근무표로 근무자별 iCalendar(.ics) 파일 생성")
+    parser.add_argument('out_dir', help=".ics 파일을 저장할 폴더")
+    parser.add_argument('--store', default=SCHEDULE_STORE_DIR, help="표준 저장소 폴더")
+    parser.add_argument('--month', help="내보낼 월 YYYY-MM")
+    parser.add_argument('--start', help="기간 시작일 YYYY-MM-DD (--month 대신 사용)")
+    parser.add_argument('--end', help="기간 종료일 YYYY-MM-DD")
+    parser.add_argument('--shift-times', help="근무별 시간 설정 JSON {근무: [시작, 종료, 제목]}")
+    args = parser.parse_args()
+
+    try:
+        if args.month:
+            year, month = map(int, args.month.split('-'))
+            start = datetime.date(year, month, 1)
+            end = datetime.date(year, month, calendar.monthrange(year, month)[1])
+        else:
+            start = datetime.date.fromisoformat(args.start)
+            end = datetime.date.fromisoformat(args.end)
+        export_ical(ScheduleStore(args.store), args.out_dir, start, end, load_shift_times(args.shift_times), report=print)
+    except Exception as e:
+        logging.error(f"schedule_ical: {e}")
+        raise SystemExit(1)
@@ -0,0 +1,214 @@
+import calendar
+import datetime
+import itertools
+import os
+import re
+import logging
+
+import numpy as np
+
+from schedule_codec import DUTY_ALIASES, DUTY_CODES, DUTY_INDEX, EncodedMonth, day_from_label
+from schedule_store import SCHEDULE_STORE_DIR, ScheduleStore
+
+# ========================================================================
+# 1. 설정 및 상수
+# ========================================================================
+# 엑셀 근무표에서 자주 쓰이는 표기 → 표준 근무 문자열
+IMPORT_LABEL_ALIASES = dict(DUTY_ALIASES, **{
+    '오프': 'O', '휴무': 'O', '연차': 'V', '휴가': 'V', '반차': 'v.0.5', '반반차': 'v.25',
+    'd': 'D', 'e': 'E', 'n': 'N', 'md': 'MD', 'dh': 'DH',
+})
+# 시트 이름 / 파일 이름에서 연월을 찾는 패턴 ('2025-03', '2025.3', '2025년 3월', '2025년_3월', '3월')
+YEAR_MONTH_RE = re.compile(r'(\d{4})\s*(?:[-./_]|년[\s_]*)\s*(\d{1,2})')
+MONTH_ONLY_RE = re.compile(r'(?<!\d)(\d{1,2})\s*월')
+# 파일 이름의 연도 ('기본_2025.xlsx'처럼 월 없이 연도만 있는 경우)
+YEAR_ONLY_RE = re.compile(r'(?<!\d)(\d{4})(?!\d)')
+
+
+def build_label_table(allowed_duties=DUTY_CODES):
+    """엑셀 셀 문자열 → 근무 코드 조회 테이블 (allowed_duties에 없는 근무는 포함하지 않음)"""
+    allowed = {duty for duty in allowed_duties if duty in DUTY_INDEX}
+    table = {duty: DUTY_INDEX[duty] for duty in allowed}
+    for label, duty in IMPORT_LABEL_ALIASES.items():
+        if duty in allowed:
+            table[label] = DUTY_INDEX[duty]
+    return table
+
+
+# ========================================================================
+# 2. 시트 해석
+# ========================================================================
+def _year_month_from_text(text, default_year=None):
+    match = YEAR_MONTH_RE.search(text)
+    if match and 1 <= int(match.group(2)) <= 12:
+        return int(match.group(1)), int(match.group(2))
+    match = MONTH_ONLY_RE.search(text)
+    if match and default_year and 1 <= int(match.group(1)) <= 12:
+        return int(default_year), int(match.group(1))
+    return None
+
+
+def _year_from_text(text):
+    match = YEAR_ONLY_RE.search(text)
+    return int(match.group(1)) if match else None
+
+
+def _header_day(value):
+    """헤더 셀('10/3 (금)', '3 (금)', 3, 날짜)에서 일(day)을 추출 (날짜 열이 아니면 None)"""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.day
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value) if 1 <= value <= 31 else None
+    try:
+        return day_from_label(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _header_month(header):
+    """'10/3 (금)' 형식 헤더가 있으면 월을 반환"""
+    for value in header:
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.month
+        if isinstance(value, str) and '/' in value:
+            try:
+                return int(value.split('/')[0].strip())
+            except ValueError:
+                continue
+    return None
+
+
+def _cell_ref(row, col):
+    name = ''
+    col += 1
+    while col:
+        col, rem = divmod(col - 1, 26)
+        name = chr(65 + rem) + name
+    return f"{name}{row + 1}"
+
+
+def parse_sheet(rows, year, month, label_table, sheet_name=''):
+    """시트 행(values_only) 반복자를 EncodedMonth로 변환하고 (em, 오류 목록)을 반환
+
+    첫 행은 헤더(첫 열: 근무자, 나머지: 날짜), 이후 행은 근무자별 근무이다.
+    날짜 열은 일(day) 기준으로 해당 월에 맞춰 정렬하고, 허용되지 않은 근무는 오류로 모은다.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if not header:
+        return None, [f"{sheet_name}: 빈 시트"]
+    num_days = calendar.monthrange(year, month)[1]
+    day_cols = []
+    for c, value in enumerate(header[1:], start=1):
+        day = _header_day(value)
+        if day is not None and day <= num_days:
+            day_cols.append((c, day - 1))
+    if not day_cols:
+        # 통계 시트 등 날짜 열이 없는 시트를 빈 달로 저장하면 실제 근무표를 덮어쓰게 됨
+        return None, [f"{sheet_name}: 날짜 열이 없음"]
+
+    workers, code_rows, errors = [], [], []
+    for r, row in enumerate(rows, start=1):
+        if not row or row[0] is None or not str(row[0]).strip():
+            continue
+        codes = np.zeros(num_days, dtype=np.uint8)
+        for c, day in day_cols:
+            value = row[c] if c < len(row) else None
+            if value is None:
+                continue
+            label = str(value).strip()
+            code = label_table.get(label)
+            if code is None:
+                errors.append(f"{sheet_name}!{_cell_ref(r, c)}: 허용되지 않은 근무 {value!r}")
+                continue
+            codes[day] = code
+        workers.append(str(row[0]).strip())
+        code_rows.append(codes)
+
+    codes = np.array(code_rows, dtype=np.uint8).reshape(len(workers), num_days)
+    # 가져온 기록은 사용자가 확정한 근무이므로 재생성 시 보존되도록 수동 편집으로 표시
+    return EncodedMonth(year, month, workers, codes, codes != 0), errors
+
+
+# ========================================================================
+# 3. 통합 문서 가져오기
+# ========================================================================
+def iter_workbook_months(path, year=None, allowed_duties=DUTY_CODES, report=None):
+    """xlsx 파일의 시트를 read-only 모드로 읽어 (EncodedMonth, 오류 목록)을 시트 순서대로 반환
+
+    연월은 시트 이름 → 파일 이름 → 헤더('월/일') 순으로 찾는다. 시트 이름에 월만 있으면 파일 이름의
+    연도를 쓰고(파일 이름에 월이 있어도 시트의 월이 우선), 파일 이름에도 연도가 없을 때만 year를 사용한다.
+    연월을 알 수 없거나 날짜 열이 없는 시트(통계 시트 등)는 건너뛴다.
+    """
+    import openpyxl
+
+    report = report or (lambda msg: None)
+    label_table = build_label_table(allowed_duties)
+    file_stem = os.path.splitext(os.path.basename(path))[0]
+    default_year = _year_from_text(file_stem) or year
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            found = (_year_month_from_text(worksheet.title, default_year)
+                     or _year_month_from_text(file_stem, default_year))
+            if found is None and header and default_year:
+                month = _header_month(header)
+                found = (int(default_year), month) if month else None
+            if found is None:
+                report(f"  [건너뜀] {worksheet.title}: 연월을 알 수 없음")
+                continue
+            em, errors = parse_sheet(itertools.chain([header], rows), *found, label_table, worksheet.title)
+            if em is None:
+                report(f"  [건너뜀] {'; '.join(errors)}")
+                continue
+            yield em, errors
+    finally:
+        workbook.close()
+
+
+def import_workbooks(store, paths, year=None, allowed_duties=DUTY_CODES, report=None):
+    """여러 xlsx 파일의 월 근무표를 저장소에 일괄 저장하고 저장한 EncodedMonth 목록을 반환
+
+    허용되지 않은 근무가 하나라도 있는 달은 저장하지 않고 오류를 보고한다.
+    같은 달이 여러 시트에 있으면 처음 것만 저장한다. 모든 파일을 먼저 읽은 뒤 저장하므로
+    저장소 잠금은 저장하는 동안만 잡는다.
+    """
+    report = report or (lambda msg: None)
+    imported = []
+    seen = set()
+    for path in paths:
+        for em, errors in iter_workbook_months(path, year, allowed_duties, report):
+            if em.key in seen:
+                report(f"  [오류] {em.key}: 같은 달이 이미 가져와져 있음 — 저장하지 않음")
+                continue
+            if errors:
+                report(f"  [오류] {em.key}: 허용되지 않은 근무 {len(errors)}건 — 저장하지 않음")
+                for message in errors[:10]:
+                    report(f"    {message}")
+                continue
+            seen.add(em.key)
+            imported.append(em)
+            report(f"  {em.key}: 근무자 {len(em.workers)}명")
+        report(f"[가져오기] {path}")
+
+    store.save_months(imported, overwrite=True)
+    return imported
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="엑셀 근무표(.xlsx)를 표준 저장소로 가져오기")
+    parser.add_argument('files', nargs='+', help="가져올 xlsx 파일 (시트 하나 = 한 달)")
+    parser.add_argument('--store', default=SCHEDULE_STORE_DIR, help="표준 저장소 폴더")
+    parser.add_argument('--year', type=int, help="시트/파일 이름에 연도가 없을 때 사용할 연도")
+    args = parser.parse_args()
+
+    try:
+        months = import_workbooks(ScheduleStore(args.store), args.files, args.year, report=print)
+        print(f"{len(months)}개월 저장")
+    except Exception as e:
+        logging.error(f"import_workbooks: {e}")
+        raise SystemExit(1)
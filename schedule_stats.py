@@ -0,0 +1,378 @@
+import os
+import logging
+
+import numpy as np
+
+from leave_ledger import LEAVE_WEIGHTS
+from schedule_codec import DUTY_CODES, DUTY_INDEX, load_encoded_month, parse_month_key, weekend_mask
+from schedule_store import SCHEDULE_STORE_DIR, ScheduleStore, file_stamp
+
+# ========================================================================
+# 1. 설정 및 상수
+# ========================================================================
+# 통계 열 이름 → 근무 코드 ('Off'는 'O' 코드)
+SUMMARY_DUTY_COLUMNS = {'D': 'D', 'E': 'E', 'DH': 'DH', 'MD': 'MD', 'N': 'N', 'Off': 'O',
+                        'V': 'V', 'v.25': 'v.25', 'v.0.5': 'v.0.5'}
+SUMMARY_COLUMNS = ['근무자', '직책/구분', '전월 연차', '총 연차', '총 근무',
+                   'D', 'E', 'DH', 'MD', 'N', 'Off', 'V', 'v.25', 'v.0.5', '주말_근무']
+# '총 근무'에 포함되는 근무
+TOTAL_WORK_DUTIES = ['D', 'E', 'MD', 'N', 'DH']
+# 토/일 '주말_근무'로 세는 근무 — 기존 정규식('D|E|N|DH')이 'MD'도 'D'로 세던 동작을 그대로 유지
+WEEKEND_WORK_DUTIES = ['D', 'E', 'N', 'MD', 'DH']
+DEFAULT_CATEGORY = '일반'
+
+# 통계 큐브 (월 × 근무자 × 항목): 근무 코드별 개수 + 주말 근무 + 연차 사용량(1/4일 단위)
+STATS_CUBE_FILE = 'stats_cube.npz'
+CUBE_FEATURES = list(DUTY_CODES) + ['주말_근무', '연차_사용_1/4일']
+CUBE_WEEKEND = len(DUTY_CODES)
+CUBE_LEAVE_QUARTERS = len(DUTY_CODES) + 1
+
+_NUM_CODES = len(DUTY_CODES)
+TOTAL_WORK_MASK = np.isin(np.arange(_NUM_CODES), [DUTY_INDEX[d] for d in TOTAL_WORK_DUTIES])
+WEEKEND_WORK_MASK = np.isin(np.arange(_NUM_CODES), [DUTY_INDEX[d] for d in WEEKEND_WORK_DUTIES])
+SUMMARY_CODE_INDEX = np.array([DUTY_INDEX[duty] for duty in SUMMARY_DUTY_COLUMNS.values()])
+
+
+# ========================================================================
+# 2. 코드 행렬 집계
+# ========================================================================
+def duty_counts(codes):
+    """(근무자 × 일) 코드 행렬의 근무자별 코드 개수 (근무자 × 코드) 행렬 — bincount 한 번"""
+    codes = np.asarray(codes)
+    rows = np.repeat(np.arange(codes.shape[0]), codes.shape[1])
+    flat = rows * _NUM_CODES + codes.ravel()
+    return np.bincount(flat, minlength=codes.shape[0] * _NUM_CODES).reshape(codes.shape[0], _NUM_CODES)
+
+
+def weekend_work(codes, weekend):
+    """근무자별 주말(weekend가 True인 열) 근무 수"""
+    return (WEEKEND_WORK_MASK[np.asarray(codes)] & weekend).sum(axis=1)
+
+
+def summarize_month(em):
+    """EncodedMonth의 (근무자 × 코드 개수, 근무자별 주말 근무) 배열"""
+    return duty_counts(em.codes), weekend_work(em.codes, weekend_mask(em.year, em.month))
+
+
+def summary_frame(workers, counts, weekend, categories=None, total_leave=None, prev_leave=None):
+    """근무자별 집계 배열을 근무 통계 표(DataFrame, SUMMARY_COLUMNS 순서)로 변환
+
+    total_leave/prev_leave는 근무자 순서의 배열 또는 {근무자: 값}.
+    """
+    import pandas as pd
+
+    categories = categories or {}
+    counts = np.asarray(counts)
+
+    def per_worker(values, default):
+        if values is None or np.isscalar(values):
+            return np.full(len(workers), default if values is None else values, dtype=np.float64)
+        if isinstance(values, dict):
+            return np.array([values.get(w, default) for w in workers], dtype=np.float64)
+        return np.asarray(values, dtype=np.float64)
+
+    columns = {
+        '근무자': list(workers),
+        '직책/구분': [categories.get(w, DEFAULT_CATEGORY) for w in workers],
+        '전월 연차': per_worker(prev_leave, np.nan),
+        '총 연차': per_worker(total_leave, np.nan),
+        '총 근무': counts[:, TOTAL_WORK_MASK].sum(axis=1),
+    }
+    for col, code in zip(SUMMARY_DUTY_COLUMNS, SUMMARY_CODE_INDEX):
+        columns[col] = counts[:, code]
+    columns['주말_근무'] = np.asarray(weekend)
+    return pd.DataFrame(columns, columns=SUMMARY_COLUMNS)
+
+
+def leave_used(counts):
+    """코드 개수 행렬에서 근무자별 연차 사용량 (V 1, v.0.5 0.5, v.25 0.25)"""
+    return np.asarray(counts) @ LEAVE_WEIGHTS
+
+
+# ========================================================================
+# 3. 증분 통계
+# ========================================================================
+class SummaryCounter:
+    """근무자별 통계를 상태로 유지하여 셀 하나가 바뀌면 해당 근무자 행에 차이만 반영"""
+
+    def __init__(self, em, categories=None, total_leave=None, prev_leave=None):
+        self.workers = list(em.workers)
+        self.row_of = {name: r for r, name in enumerate(self.workers)}
+        self.weekend = weekend_mask(em.year, em.month)
+        self.counts, self.weekend_work = summarize_month(em)
+        frame = summary_frame(self.workers, self.counts, self.weekend_work, categories, total_leave, prev_leave)
+        self.categories = frame['직책/구분'].tolist()
+        self.prev_leave = frame['전월 연차'].to_numpy(dtype=np.float64).copy()
+        self.total_leave = frame['총 연차'].to_numpy(dtype=np.float64).copy()
+        self._frame = frame
+        self._dirty_rows = set()
+
+    def __contains__(self, worker):
+        return worker in self.row_of
+
+    def frame(self):
+        """통계 표 DataFrame (apply 이후 바뀐 행만 반영)"""
+        for r in self._dirty_rows:
+            self._frame.iloc[r] = self.row(r)
+        self._dirty_rows.clear()
+        return self._frame
+
+    def apply(self, worker, day, old_code, new_code):
+        """worker의 day(0부터) 근무가 old_code → new_code로 바뀐 차이를 반영하고 행 번호를 반환"""
+        r = self.row_of[worker]
+        if old_code == new_code:
+            return r
+        self.counts[r, old_code] -= 1
+        self.counts[r, new_code] += 1
+        if self.weekend[day]:
+            self.weekend_work[r] += int(WEEKEND_WORK_MASK[new_code]) - int(WEEKEND_WORK_MASK[old_code])
+        # 저장 시 원장의 근무표 사용량도 같은 만큼 바뀌므로 잔여 연차에 바로 반영
+        self.total_leave[r] -= LEAVE_WEIGHTS[new_code] - LEAVE_WEIGHTS[old_code]
+        self._dirty_rows.add(r)
+        return r
+
+    def row(self, r):
+        """r번째 근무자의 통계 행 (SUMMARY_COLUMNS 순서)"""
+        counts = self.counts[r]
+        return ([self.workers[r], self.categories[r], float(self.prev_leave[r]), round(float(self.total_leave[r]), 2),
+                 int(counts[TOTAL_WORK_MASK].sum())]
+                + [int(v) for v in counts[SUMMARY_CODE_INDEX]] + [int(self.weekend_work[r])])
+
+
+# ========================================================================
+# 4. 일별 인원 충족 현황
+# ========================================================================
+# 하루 필요 인원을 확인하는 근무 (DH는 상한만 있으므로 제외)
+COVERAGE_DUTIES = ['D', 'E', 'N']
+
+
+def coverage_targets(year, month, daily_limits, weekend_limits=None):
+    """(근무 × 일) 필요 인원 배열 — 주말은 weekend_limits 값으로 대체"""
+    weekend = weekend_mask(year, month)
+    targets = np.array([[daily_limits.get(duty, 0)] * len(weekend) for duty in COVERAGE_DUTIES], dtype=np.int64)
+    for duty, limit in (weekend_limits or {}).items():
+        if duty in COVERAGE_DUTIES:
+            targets[COVERAGE_DUTIES.index(duty), weekend] = limit
+    return targets
+
+
+class CoverageCounter:
+    """일별 D/E/N 인원을 열 단위 bincount로 계산해 두고 셀 편집 시 해당 날짜만 갱신"""
+
+    def __init__(self, em, daily_limits, weekend_limits=None):
+        self.codes = np.array([DUTY_INDEX[duty] for duty in COVERAGE_DUTIES])
+        self.targets = coverage_targets(em.year, em.month, daily_limits, weekend_limits)
+        # 날짜를 행으로 보면 duty_counts가 곧 일별 근무 코드 개수
+        self.counts = duty_counts(em.codes.T)[:, self.codes].T.copy()
+        self._slot = {code: i for i, code in enumerate(self.codes.tolist())}
+
+    def apply(self, day, old_code, new_code):
+        """day(0부터)의 근무 한 칸이 old_code → new_code로 바뀐 차이를 반영"""
+        if old_code in self._slot:
+            self.counts[self._slot[old_code], day] -= 1
+        if new_code in self._slot:
+            self.counts[self._slot[new_code], day] += 1
+
+    def shortfall(self):
+        """(근무 × 일) 필요 인원보다 적은 칸"""
+        return self.counts < self.targets
+
+    def short_days(self):
+        return np.flatnonzero(self.shortfall().any(axis=0))
+
+    def label(self, day):
+        """day의 충족 현황 문자열 (예: 'D2 E1 N1', 부족하면 앞에 ⚠)"""
+        counts = self.counts[:, day]
+        short = (counts < self.targets[:, day]).any()
+        text = ' '.join(f"{duty}{int(n)}" for duty, n in zip(COVERAGE_DUTIES, counts))
+        return f"⚠{text}" if short else text
+
+    def labels(self):
+        return [self.label(day) for day in range(self.counts.shape[1])]
+
+
+# ========================================================================
+# 5. 월별 통계 큐브
+# ========================================================================
+def month_features(em):
+    """EncodedMonth의 근무자별 (근무 코드 개수..., 주말 근무, 연차 사용 1/4일) uint8 행렬"""
+    counts, weekend = summarize_month(em)
+    features = np.zeros((len(em.workers), len(CUBE_FEATURES)), dtype=np.uint8)
+    features[:, :len(DUTY_CODES)] = counts
+    features[:, CUBE_WEEKEND] = weekend
+    features[:, CUBE_LEAVE_QUARTERS] = np.rint(leave_used(counts) * 4)
+    return features
+
+
+class StatsCube:
+    """저장된 모든 월의 근무자별 통계를 (월, 근무자, 항목) 배열 하나로 유지하는 집계 캐시
+
+    월을 저장할 때 update_month로 해당 월 조각만 다시 계산하고, 조회할 때는 월 파일의 stamp만 확인해
+    다른 곳(다른 인스턴스, 가져오기 등)에서 바뀐 월만 다시 집계한다. 큐브는 저장소의 stats_cube.npz에 보관된다.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.path = os.path.join(store.root, STATS_CUBE_FILE)
+        self.months, self.workers = [], []
+        self.month_index, self.worker_index = {}, {}
+        self.stamps = np.zeros((0, 2), dtype=np.int64)
+        self.cube = np.zeros((0, 0, len(CUBE_FEATURES)), dtype=np.uint8)
+        self._file_stamp = None
+        self._load()
+
+    # ------------------------------------------------------------------
+    # [파일]
+    # ------------------------------------------------------------------
+    def _load(self):
+        stamp = file_stamp(self.path)
+        if stamp is None or stamp == self._file_stamp:
+            return
+        try:
+            with np.load(self.path) as data:
+                if data['features'].tolist() != CUBE_FEATURES:
+                    raise ValueError("통계 항목이 바뀌었습니다.")
+                self.months = data['months'].tolist()
+                self.workers = data['workers'].tolist()
+                self.stamps = data['stamps']
+                self.cube = data['cube']
+        except Exception as e:
+            logging.warning(f"StatsCube: {self.path} 다시 집계 ({e})")
+            self.months, self.workers = [], []
+            self.stamps = np.zeros((0, 2), dtype=np.int64)
+            self.cube = np.zeros((0, 0, len(CUBE_FEATURES)), dtype=np.uint8)
+        self.month_index = {key: i for i, key in enumerate(self.months)}
+        self.worker_index = {name: i for i, name in enumerate(self.workers)}
+        self._file_stamp = stamp
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp.npz"
+        with self.store.lock():
+            np.savez(tmp_path, features=np.array(CUBE_FEATURES), months=np.array(self.months, dtype=str),
+                     workers=np.array(self.workers, dtype=str), stamps=self.stamps, cube=self.cube)
+            os.replace(tmp_path, self.path)
+        self._file_stamp = file_stamp(self.path)
+
+    # ------------------------------------------------------------------
+    # [갱신]
+    # ------------------------------------------------------------------
+    def _month_slot(self, key):
+        if key not in self.month_index:
+            self.month_index[key] = len(self.months)
+            self.months.append(key)
+            self.stamps = np.concatenate([self.stamps, np.full((1, 2), -1, dtype=np.int64)])
+            self.cube = np.concatenate([self.cube, np.zeros((1,) + self.cube.shape[1:], dtype=np.uint8)])
+        return self.month_index[key]
+
+    def _worker_rows(self, workers):
+        new = [name for name in workers if name not in self.worker_index]
+        if new:
+            for name in new:
+                self.worker_index[name] = len(self.workers)
+                self.workers.append(name)
+            pad = np.zeros((self.cube.shape[0], len(new), len(CUBE_FEATURES)), dtype=np.uint8)
+            self.cube = np.concatenate([self.cube, pad], axis=1)
+        return np.array([self.worker_index[name] for name in workers], dtype=np.int64)
+
+    def _set_month(self, key, em, stamp):
+        i = self._month_slot(key)
+        rows = self._worker_rows(em.workers) if em is not None else None
+        self.cube[i] = 0
+        if em is not None:
+            self.cube[i, rows] = month_features(em)
+        self.stamps[i] = stamp if stamp is not None else (-1, -1)
+
+    def update_month(self, em):
+        """저장된 월 하나의 통계 조각을 다시 계산하고 큐브 파일을 갱신"""
+        self._load()
+        stamp = file_stamp(self.store.month_path(em.year, em.month))
+        self._set_month(em.key, em, stamp)
+        self._save()
+
+    def refresh(self, keys=None):
+        """keys(기본: 저장된 모든 월) 중 큐브 이후 바뀐 월만 다시 집계"""
+        self._load()
+        keys = self.store.list_months() if keys is None else keys
+        changed = False
+        for key in keys:
+            path = self.store.month_path(*parse_month_key(key))
+            stamp = file_stamp(path)
+            i = self.month_index.get(key)
+            if i is None and stamp is None:
+                continue
+            if i is not None and stamp is not None and tuple(self.stamps[i]) == stamp:
+                continue
+            if i is not None and stamp is None and tuple(self.stamps[i]) == (-1, -1):
+                continue
+            self._set_month(key, load_encoded_month(path) if stamp is not None else None, stamp)
+            changed = True
+        if changed:
+            self._save()
+
+    # ------------------------------------------------------------------
+    # [조회]
+    # ------------------------------------------------------------------
+    def totals(self, keys, workers=None):
+        """keys 월들의 근무자별 합계 (근무자 목록, (근무자 × 항목) int64 배열)"""
+        keys = list(keys)
+        self.refresh(keys)
+        idx = [self.month_index[k] for k in keys if k in self.month_index]
+        total = self.cube[idx].sum(axis=0, dtype=np.int64) if idx else np.zeros((len(self.workers), len(CUBE_FEATURES)), dtype=np.int64)
+        if workers is None:
+            present = total.any(axis=1)
+            return [w for w, p in zip(self.workers, present) if p], total[present]
+        workers = list(workers)
+        result = np.zeros((len(workers), len(CUBE_FEATURES)), dtype=np.int64)
+        rows = [(r, self.worker_index[w]) for r, w in enumerate(workers) if w in self.worker_index]
+        if rows:
+            dst, src = map(list, zip(*rows))
+            result[dst] = total[src]
+        return workers, result
+
+    def year_to_date(self, year, upto_month=12, workers=None):
+        """year년 1월~upto_month월 누계"""
+        return self.totals([f"{int(year)}-{m:02d}" for m in range(1, int(upto_month) + 1)], workers)
+
+    def rolling(self, year, month, span=12, workers=None):
+        """year년 month월까지 최근 span개월 합계"""
+        keys = []
+        y, m = int(year), int(month)
+        for _ in range(span):
+            keys.append(f"{y}-{m:02d}")
+            y, m = (y, m - 1) if m > 1 else (y - 1, 12)
+        return self.totals(keys, workers)
+
+
+STATS_VIEW_COLUMNS = ['근무자', '총 근무', 'D', 'E', 'DH', 'MD', 'N', 'Off', 'V', 'v.25', 'v.0.5', '주말_근무', '연차 사용']
+
+
+def stats_rows(workers, totals):
+    """StatsCube 합계를 STATS_VIEW_COLUMNS 순서의 행 목록으로 변환"""
+    counts = totals[:, :len(DUTY_CODES)]
+    total_work = counts[:, TOTAL_WORK_MASK].sum(axis=1)
+    rows = []
+    for r, name in enumerate(workers):
+        rows.append([name, int(total_work[r])] + [int(v) for v in counts[r, SUMMARY_CODE_INDEX]]
+                    + [int(totals[r, CUBE_WEEKEND]), float(totals[r, CUBE_LEAVE_QUARTERS]) / 4])
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="저장된 근무표의 누적 통계 (올해 누계 / 최근 12개월)")
+    parser.add_argument('--store', default=SCHEDULE_STORE_DIR, help="표준 저장소 폴더")
+    parser.add_argument('--year', type=int, required=True)
+    parser.add_argument('--month', type=int, default=12, help="누계 기준 월 (기본: 12)")
+    parser.add_argument('--rolling', action='store_true', help="기준 월까지 최근 12개월 합계")
+    parser.add_argument('--sort', default='총 근무', choices=STATS_VIEW_COLUMNS[1:], help="정렬 기준 열")
+    parser.add_argument('--top', type=int, help="상위 N명만 출력")
+    args = parser.parse_args()
+
+    cube = StatsCube(ScheduleStore(args.store))
+    workers, totals = (cube.rolling(args.year, args.month) if args.rolling
+                       else cube.year_to_date(args.year, args.month))
+    rows = sorted(stats_rows(workers, totals), key=lambda row: row[STATS_VIEW_COLUMNS.index(args.sort)], reverse=True)
+    print('\t'.join(STATS_VIEW_COLUMNS))
+    for row in rows[:args.top]:
+        print('\t'.join(str(v) for v in row))
@@ -0,0 +1,515 @@
+import calendar
+import datetime
+import errno
+import hashlib
+import json
+import os
+import time
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+
+from schedule_codec import (DMK_EXTENSION, DUTY_CODES, EncodedMonth, decode_duties, load_encoded_month,
+                            load_month_header, parse_month_key, save_encoded_month)
+
+# ========================================================================
+# 1. 설정 및 상수
+# ========================================================================
+SCHEDULE_STORE_DIR = 'schedule_store'
+# 병동을 지정하지 않은 CLI 실행에서 쓰는 병동 이름
+DEFAULT_WARD = '기본'
+MONTHS_SUBDIR = 'months'
+CARRY_OVER_FILE = 'carry_over.json'
+SNAPSHOTS_SUBDIR = 'snapshots'
+SNAPSHOT_OBJECTS_SUBDIR = 'objects'
+SNAPSHOT_LOG_EXTENSION = '.log'
+# 전체 행 목록을 다시 기록하는 간격 (복원 시 읽어야 하는 로그 줄 수의 상한)
+SNAPSHOT_CHECKPOINT_INTERVAL = 32
+# 여러 인스턴스가 같은 저장소(네트워크 공유 폴더 등)를 쓸 때 저장을 직렬화하는 잠금 파일
+STORE_LOCK_FILE = '.lock'
+# 잠금을 기다리는 최대 시간과 재시도 간격 (초) — 다른 인스턴스가 잠금을 놓지 않으면 StoreLockTimeout
+STORE_LOCK_TIMEOUT_SECONDS = 30
+STORE_LOCK_RETRY_SECONDS = 0.1
+
+
+def write_json_atomic(path, data):
+    """임시 파일에 쓴 뒤 교체하여 JSON 파일을 원자적으로 저장"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, path)
+
+
+def read_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def file_stamp(path):
+    """변경 감지용 (mtime_ns, 크기) — 파일이 없으면 None"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class StoreLockTimeout(Exception):
+    """제한 시간 안에 저장소 잠금을 얻지 못함 (다른 인스턴스가 저장 중이거나 잠금이 남아 있음)"""
+
+    def __init__(self, path, timeout):
+        self.path = path
+        self.timeout = timeout
+        super().__init__(f"저장소 잠금을 {timeout:g}초 동안 얻지 못했습니다. "
+                         f"다른 곳에서 저장 중인지 확인한 뒤 다시 시도하세요. ({path})")
+
+
+class StoreLock:
+    """잠금 파일에 대한 권고 잠금 (POSIX: fcntl.flock, Windows: msvcrt.locking)
+
+    같은 프로세스 안에서는 중첩해서 사용할 수 있다. 비차단 잠금을 timeout초 동안 재시도하고
+    그래도 얻지 못하면 StoreLockTimeout을 발생시킨다.
+    """
+
+    def __init__(self, path, timeout=STORE_LOCK_TIMEOUT_SECONDS):
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+        self._depth = 0
+
+    def _try_lock(self, f):
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except (BlockingIOError, PermissionError):
+            return False
+        except OSError as e:
+            # msvcrt는 잠금 충돌을 EACCES/EDEADLOCK OSError로 알림
+            if fcntl is None and e.errno in (errno.EACCES, errno.EDEADLOCK):
+                return False
+            raise
+        return True
+
+    def __enter__(self):
+        if self._depth == 0:
+            f = open(self.path, 'a+b')
+            try:
+                deadline = time.monotonic() + self.timeout
+                while not self._try_lock(f):
+                    if time.monotonic() >= deadline:
+                        raise StoreLockTimeout(self.path, self.timeout)
+                    time.sleep(STORE_LOCK_RETRY_SECONDS)
+            except Exception:
+                f.close()
+                raise
+            self._file = f
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            f, self._file = self._file, None
+            try:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                f.close()
+
+
+# ========================================================================
+# 2. 셀 단위 3-way 병합
+# ========================================================================
+class ScheduleConflictError(Exception):
+    """다른 인스턴스가 같은 셀을 다르게 수정하여 저장을 거부함"""
+
+    def __init__(self, key, conflicts):
+        self.key = key
+        self.conflicts = conflicts  # [(근무자, 일, 내 근무, 다른 인스턴스 근무)]
+        preview = ', '.join(f"{w} {d}일" for w, d, _, _ in conflicts[:5])
+        super().__init__(f"{key}: 다른 곳에서 수정된 칸과 충돌합니다 ({len(conflicts)}칸: {preview})")
+
+
+def _aligned(em, workers, num_days):
+    """em의 행을 workers 순서로 맞춘 (코드, 수동 편집) 행렬 (없는 근무자는 빈 칸)"""
+    codes = np.zeros((len(workers), num_days), dtype=np.uint8)
+    manual = np.zeros((len(workers), num_days), dtype=bool)
+    if em is not None:
+        index = {name: i for i, name in enumerate(workers)}
+        rows = [(index[name], r) for r, name in enumerate(em.workers) if name in index]
+        if rows:
+            dst, src = map(list, zip(*rows))
+            codes[dst], manual[dst] = em.codes[src], em.manual[src]
+    return codes, manual
+
+
+def merge_months(base, mine, theirs):
+    """base(내가 읽은 버전)에서 갈라진 mine과 theirs를 셀 단위로 병합하여 (EncodedMonth, 충돌 목록)을 반환
+
+    한쪽만 바꾼 셀은 바뀐 쪽을, 양쪽이 같은 값으로 바꾼 셀은 그 값을 택하고
+    양쪽이 서로 다르게 바꾼 셀만 충돌로 보고한다. 근무자 행은 mine 순서를 따르며,
+    theirs에서 새로 추가된 근무자는 뒤에 붙이고 mine에서 삭제된 근무자는 제외한다.
+    base가 None(이 월을 읽지 않고 새로 만든 경우)이면 theirs를 기준으로 삼아 mine의 내용이
+    우선하고, 삭제한 근무자가 없으므로 theirs에만 있는 근무자는 유지한다.
+    """
+    base_workers = set(base.workers) if base is not None else set()
+    mine_workers = set(mine.workers)
+    workers = list(mine.workers) + [w for w in theirs.workers if w not in mine_workers and w not in base_workers]
+    num_days = mine.num_days
+
+    base_codes, _ = _aligned(base if base is not None else theirs, workers, num_days)
+    mine_codes, mine_manual = _aligned(mine, workers, num_days)
+    theirs_codes, theirs_manual = _aligned(theirs, workers, num_days)
+
+    # mine에 없는 행은 theirs에서 추가된 근무자이므로 기준을 빈 칸으로 두어 theirs의 내용을 택함
+    in_mine = np.arange(len(workers)) < len(mine.workers)
+    base_codes[~in_mine] = 0
+    mine_changed = (mine_codes != base_codes) & in_mine[:, None]
+    theirs_changed = theirs_codes != base_codes
+    take_theirs = theirs_changed & ~mine_changed
+    codes = np.where(take_theirs, theirs_codes, mine_codes)
+    manual = np.where(take_theirs, theirs_manual,
+                      np.where(mine_changed, mine_manual, mine_manual | theirs_manual))
+
+    conflict_cells = np.argwhere(mine_changed & theirs_changed & (mine_codes != theirs_codes))
+    conflicts = [(workers[r], int(c) + 1, DUTY_CODES[mine_codes[r, c]], DUTY_CODES[theirs_codes[r, c]])
+                 for r, c in conflict_cells]
+    return EncodedMonth(mine.year, mine.month, workers, codes, manual), conflicts
+
+
+def _copy_month(em):
+    return EncodedMonth(em.year, em.month, em.workers, em.codes.copy(), em.manual.copy())
+
+
+# ========================================================================
+# 3. 표준 저장소
+# ========================================================================
+class ScheduleStore:
+    """월별 .dmk 파일과 이월 근무 JSON으로 구성된 단일 표준 저장소 (연차 원장은 leave_ledger.py)
+
+    근무표는 월마다 별도 파일로 저장되므로 한 달을 저장해도 다른 달 파일은 건드리지 않는다.
+    각 월 파일 헤더에는 저장할 때마다 1씩 증가하는 revision이 있고, 저장은 잠금 파일로 직렬화된다.
+    마지막으로 읽은 revision 이후 다른 인스턴스가 저장했다면 셀 단위로 병합하거나 거부한다.
+    """
+
+    def __init__(self, root=SCHEDULE_STORE_DIR):
+        self.root = root
+        self.months_dir = os.path.join(root, MONTHS_SUBDIR)
+        self.snapshots_dir = os.path.join(root, SNAPSHOTS_SUBDIR)
+        self.objects_dir = os.path.join(self.snapshots_dir, SNAPSHOT_OBJECTS_SUBDIR)
+        os.makedirs(self.months_dir, exist_ok=True)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._snapshot_heads = {}  # 월 키 → 마지막 버전 상태
+        self._tail_cache = {}  # (year, month, lookback) → (직전 달 파일 stamp, 직전 달 마지막 근무)
+        self._bases = {}  # 월 키 → (revision, 파일 stamp, 마지막으로 읽거나 저장한 EncodedMonth)
+        self._lock = StoreLock(os.path.join(root, STORE_LOCK_FILE))
+
+    def lock(self):
+        """저장소 전체 쓰기 잠금 (with 문으로 사용, 중첩 가능)"""
+        return self._lock
+
+    # ------------------------------------------------------------------
+    # [월별 근무표]
+    # ------------------------------------------------------------------
+    def month_path(self, year, month):
+        return os.path.join(self.months_dir, f"{int(year)}-{int(month):02d}{DMK_EXTENSION}")
+
+    def list_months(self):
+        """저장된 월 키('YYYY-MM') 목록을 시간순으로 반환"""
+        keys = []
+        for name in os.listdir(self.months_dir):
+            if name.endswith(DMK_EXTENSION):
+                key = name[:-len(DMK_EXTENSION)]
+                try:
+                    parse_month_key(key)
+                except ValueError:
+                    continue
+                keys.append(key)
+        return sorted(keys)
+
+    def is_empty(self):
+        return not self.list_months()
+
+    def has_month(self, year, month):
+        return os.path.exists(self.month_path(year, month))
+
+    def load_month(self, year, month):
+        """저장된 월을 EncodedMonth로 반환 (없으면 None) — 읽은 revision은 다음 저장의 기준이 됨"""
+        loaded = self.read_month(year, month)
+        if loaded is None:
+            return None
+        self.adopt_month(*loaded)
+        return loaded[0]
+
+    def read_month(self, year, month):
+        """저장된 월을 (EncodedMonth, revision, 파일 stamp)로 반환 (없으면 None)
+
+        저장 기준(_bases)은 바꾸지 않으므로 작업 스레드에서 호출해도 된다. 읽은 월을 실제로
+        사용할 때 adopt_month로 기준을 등록한다. stamp는 읽기 전에 구하므로 그 사이에 파일이
+        바뀌면 changed_since가 revision을 다시 확인한다.
+        """
+        path = self.month_path(year, month)
+        stamp = file_stamp(path)
+        try:
+            em, header = load_encoded_month(path, with_header=True)
+        except FileNotFoundError:
+            return None
+        return em, header.get('revision', 0), stamp
+
+    def adopt_month(self, em, revision, stamp):
+        """read_month로 읽은 월을 다음 저장의 기준으로 등록"""
+        self._bases[em.key] = (revision, stamp, _copy_month(em))
+
+    def month_revision(self, year, month):
+        """파일 헤더의 revision (파일이 없으면 0)"""
+        try:
+            return load_month_header(self.month_path(year, month)).get('revision', 0)
+        except FileNotFoundError:
+            return 0
+
+    def changed_since_load(self, year, month):
+        """마지막으로 읽거나 저장한 뒤 다른 인스턴스가 이 월을 바꿨는지 (stat 한 번, 바뀐 경우에만 헤더 확인)"""
+        base = self._bases.get(f"{int(year)}-{int(month):02d}")
+        if base is None:
+            return self.has_month(year, month)
+        return self.changed_since(year, month, base[0], base[1])
+
+    def changed_since(self, year, month, revision, stamp):
+        """read_month로 읽은 (revision, stamp) 이후 이 월 파일이 바뀌었는지"""
+        if file_stamp(self.month_path(year, month)) == stamp:
+            return False
+        return self.month_revision(year, month) != revision
+
+    def save_month(self, em, overwrite=False):
+        """월을 저장하고 실제로 저장된 EncodedMonth를 반환
+
+        기준 revision 이후 다른 인스턴스가 저장했다면 셀 단위로 병합한 결과를 저장해 반환하고,
+        같은 셀을 서로 다르게 바꾼 경우에는 ScheduleConflictError를 발생시키고 저장하지 않는다.
+        overwrite=True(마이그레이션, 가져오기, 버전 복원)이면 병합하지 않고 그대로 덮어쓴다.
+        """
+        path = self.month_path(em.year, em.month)
+        with self.lock():
+            disk_revision = self.month_revision(em.year, em.month)
+            base_revision, _, base = self._bases.get(em.key, (0, None, None))
+            if not overwrite and disk_revision != base_revision and os.path.exists(path):
+                theirs = load_encoded_month(path)
+                em, conflicts = merge_months(base, em, theirs)
+                if conflicts:
+                    raise ScheduleConflictError(em.key, conflicts)
+                logging.info(f"save_month {em.key}: revision {base_revision} → {disk_revision} 변경 사항과 병합")
+            revision = disk_revision + 1
+            save_encoded_month(path, em, {'revision': revision})
+            self._bases[em.key] = (revision, file_stamp(path), _copy_month(em))
+            self._invalidate_tail(em.year, em.month)
+            try:
+                self.snapshot_month(em)
+            except Exception as e:
+                logging.error(f"snapshot_month: {e}")
+        return em
+
+    def save_months(self, months, overwrite=False):
+        """여러 달을 한 번에 저장하고 저장한 월 수를 반환"""
+        count = 0
+        with self.lock():
+            for em in months:
+                self.save_month(em, overwrite)
+                count += 1
+        return count
+
+    def delete_month(self, year, month):
+        with self.lock():
+            try:
+                os.remove(self.month_path(year, month))
+            except FileNotFoundError:
+                pass
+        self._bases.pop(f"{int(year)}-{int(month):02d}", None)
+        self._invalidate_tail(year, month)
+
+    # ------------------------------------------------------------------
+    # [버전 스냅샷]
+    # 근무자 행(근무 코드 + 수동 편집 비트)을 내용 해시로 objects/에 한 번만 저장하고,
+    # 월별 로그에는 버전마다 바뀐 행의 해시만 한 줄로 추가한다.
+    # ------------------------------------------------------------------
+    def _snapshot_log_path(self, key):
+        return os.path.join(self.snapshots_dir, key + SNAPSHOT_LOG_EXTENSION)
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _put_row(self, em, r):
+        blob = em.codes[r].tobytes() + np.packbits(em.manual[r]).tobytes()
+        digest = hashlib.blake2b(blob, digest_size=16).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        return digest
+
+    def _read_row(self, digest, num_days):
+        with open(self._object_path(digest), 'rb') as f:
+            blob = f.read()
+        codes = np.frombuffer(blob, dtype=np.uint8, count=num_days)
+        manual = np.unpackbits(np.frombuffer(blob, dtype=np.uint8, offset=num_days), count=num_days).astype(bool)
+        return codes, manual
+
+    def _read_snapshot_log(self, key):
+        try:
+            with open(self._snapshot_log_path(key), 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def _replay(entries):
+        """로그 항목들을 순서대로 적용해 (근무자 목록, 행 해시 목록)을 복원"""
+        workers, rows = [], []
+        for entry in entries:
+            if 'workers' in entry:
+                workers = entry['workers']
+            if entry.get('full'):
+                rows = list(entry['rows'])
+            else:
+                rows = rows + [None] * (len(workers) - len(rows))
+                del rows[len(workers):]
+                for idx, digest in entry['rows'].items():
+                    rows[int(idx)] = digest
+        return workers, rows
+
+    def _snapshot_head(self, key):
+        """마지막 버전 상태 (다른 인스턴스가 로그를 늘렸으면 다시 읽음)"""
+        log_stamp = file_stamp(self._snapshot_log_path(key))
+        cached = self._snapshot_heads.get(key)
+        if cached is None or cached[1] != log_stamp:
+            entries = self._read_snapshot_log(key)
+            start = max((i for i, e in enumerate(entries) if e.get('full')), default=0)
+            workers, rows = self._replay(entries[start:])
+            version = entries[-1]['version'] if entries else 0
+            content_id = entries[-1]['id'] if entries else None
+            since_full = len(entries) - start
+            self._snapshot_heads[key] = ((version, content_id, workers, rows, since_full), log_stamp)
+        return self._snapshot_heads[key][0]
+
+    def snapshot_month(self, em):
+        """현재 월 내용을 새 버전으로 기록 (직전 버전과 내용이 같으면 기록하지 않음)"""
+        version, last_id, last_workers, last_rows, since_full = self._snapshot_head(em.key)
+        rows = [self._put_row(em, r) for r in range(len(em.workers))]
+        content_id = hashlib.blake2b(
+            json.dumps([em.workers, rows], ensure_ascii=False).encode('utf-8'), digest_size=16).hexdigest()
+        if content_id == last_id:
+            return version
+
+        version += 1
+        entry = {'version': version, 'id': content_id,
+                 'saved_at': datetime.datetime.now().isoformat(timespec='seconds')}
+        is_checkpoint = since_full == 0 or since_full >= SNAPSHOT_CHECKPOINT_INTERVAL
+        if is_checkpoint or em.workers != last_workers:
+            entry['workers'] = em.workers
+        if is_checkpoint:
+            entry['full'] = True
+            entry['rows'] = rows
+            since_full = 1
+        else:
+            entry['rows'] = {str(i): digest for i, digest in enumerate(rows)
+                             if i >= len(last_rows) or last_rows[i] != digest}
+            since_full += 1
+        log_path = self._snapshot_log_path(em.key)
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._snapshot_heads[em.key] = ((version, content_id, em.workers, rows, since_full), file_stamp(log_path))
+        return version
+
+    def list_versions(self, year, month):
+        """저장된 버전 목록 [{version, id, saved_at, changed_rows}] (오래된 순)"""
+        key = f"{int(year)}-{int(month):02d}"
+        return [{'version': e['version'], 'id': e['id'], 'saved_at': e['saved_at'],
+                 'changed_rows': len(e['rows'])} for e in self._read_snapshot_log(key)]
+
+    def load_version(self, year, month, version):
+        """특정 버전의 근무표를 EncodedMonth로 복원 (직전 체크포인트부터만 재생)"""
+        key = f"{int(year)}-{int(month):02d}"
+        entries = [e for e in self._read_snapshot_log(key) if e['version'] <= version]
+        if not entries or entries[-1]['version'] != version:
+            raise KeyError(f"{key}: 버전 {version}이(가) 없습니다.")
+        start = max((i for i, e in enumerate(entries) if e.get('full')), default=0)
+        workers, rows = self._replay(entries[start:])
+        num_days = calendar.monthrange(int(year), int(month))[1]
+        codes = np.zeros((len(workers), num_days), dtype=np.uint8)
+        manual = np.zeros(codes.shape, dtype=bool)
+        for r, digest in enumerate(rows):
+            codes[r], manual[r] = self._read_row(digest, num_days)
+        return EncodedMonth(year, month, workers, codes, manual)
+
+    def restore_version(self, year, month, version):
+        """특정 버전을 현재 근무표로 되돌림 (복원 자체도 새 버전으로 기록됨)"""
+        em = self.load_version(year, month, version)
+        return self.save_month(em, overwrite=True)
+
+    # ------------------------------------------------------------------
+    # [이월 근무]
+    # ------------------------------------------------------------------
+    def load_carry_over(self):
+        """{'YYYY-MM'(적용 월): {근무자: [직전 근무, ...]}} 형식의 이월 근무"""
+        return read_json(os.path.join(self.root, CARRY_OVER_FILE), {})
+
+    def save_carry_over(self, carry_over):
+        write_json_atomic(os.path.join(self.root, CARRY_OVER_FILE), carry_over)
+        self._tail_cache.clear()
+
+    def _invalidate_tail(self, year, month):
+        """year년 month월이 바뀌었으므로 다음 달의 이월 근무 캐시를 버림"""
+        next_month = (int(year), int(month) + 1) if int(month) < 12 else (int(year) + 1, 1)
+        for cache_key in [k for k in self._tail_cache if k[:2] == next_month]:
+            del self._tail_cache[cache_key]
+
+    def carry_over_tail(self, year, month, lookback):
+        """year년 month월로 이어지는 직전 달 마지막 lookback일 근무 {근무자: [근무, ...]}
+
+        저장된 직전 달 근무표에서 바로 계산하고, 직전 달이 없을 때만 마이그레이션된 이월 근무를 사용한다.
+        """
+        year, month, lookback = int(year), int(month), int(lookback)
+        cache_key = (year, month, lookback)
+        prev_year, prev_month = (year, month - 1) if month > 1 else (year - 1, 12)
+        prev_path = self.month_path(prev_year, prev_month)
+        stamp = file_stamp(prev_path)
+        cached = self._tail_cache.get(cache_key)
+        if cached is None or cached[0] != stamp:
+            em = load_encoded_month(prev_path) if stamp is not None else None
+            if em is not None:
+                tail = dict(zip(em.workers, decode_duties(em.codes[:, max(0, em.num_days - lookback):])))
+            else:
+                seeded = self.load_carry_over().get(f"{year}-{month:02d}", {})
+                tail = {name: duties[-lookback:] for name, duties in seeded.items()}
+            cached = self._tail_cache[cache_key] = (stamp, tail)
+        return {name: list(duties) for name, duties in cached[1].items()}
+
+
+# ========================================================================
+# 4. 병동 인자
+# ========================================================================
+def parse_ward_args(ward_args):
+    """'병동=저장소폴더' 인자 목록을 {병동: ScheduleStore}로 변환 (없으면 기본 병동의 기본 저장소)"""
+    if not ward_args:
+        return {DEFAULT_WARD: ScheduleStore(SCHEDULE_STORE_DIR)}
+    ward_stores = {}
+    for arg in ward_args:
+        name, _, root = arg.partition('=')
+        ward_stores[name] = ScheduleStore(root or SCHEDULE_STORE_DIR)
+    return ward_stores
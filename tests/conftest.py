@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 저장소 루트의 모듈(schedule_store, leave_ledger 등)을 패키지 없이 import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
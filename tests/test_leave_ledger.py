@@ -0,0 +1,91 @@
+import calendar
+import json
+
+import numpy as np
+import pytest
+
+from leave_ledger import DEFAULT_ANNUAL_LEAVE, LeaveLedger
+from migrate_store import migrate_files
+from schedule_codec import DUTY_INDEX, EncodedMonth
+from schedule_store import ScheduleStore
+
+
+def _month(year, month, workers, duties=None):
+    em = EncodedMonth(year, month, workers, np.zeros((len(workers), calendar.monthrange(year, month)[1]), dtype=np.uint8))
+    for (r, day), duty in (duties or {}).items():
+        em.codes[r, day - 1] = DUTY_INDEX[duty]
+    return em
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ScheduleStore(str(tmp_path / 'store'))
+
+
+def _write_legacy_files(tmp_path):
+    columns = [f"3/{d} (요일)" for d in range(1, 32)]
+    row = ['V', 'V', 'V'] + [''] * 28
+    schedules = {'2026-03': {'columns': columns, 'index': ['A'], 'data': [row], 'manual_edits': []}}
+    schedules_path = tmp_path / 'monthly_schedules.json'
+    schedules_path.write_text(json.dumps(schedules, ensure_ascii=False), encoding='utf-8')
+    vacations_path = tmp_path / 'annual_vacations.json'
+    vacations_path.write_text(json.dumps({'A': 18.5}), encoding='utf-8')
+    return str(schedules_path), str(vacations_path)
+
+
+def test_legacy_balance_is_kept_after_migrating_schedules_and_leave(tmp_path, store):
+    schedules_path, vacations_path = _write_legacy_files(tmp_path)
+    migrate_files(store, [schedules_path, vacations_path], leave_year=2026)
+    ledger = LeaveLedger(store)
+    assert ledger.entitlements(2026) == {'A': 21.5}
+    assert ledger.balances(2026, ['A']) == {'A': 18.5}
+
+
+def test_legacy_balance_does_not_depend_on_file_order(tmp_path, store):
+    schedules_path, vacations_path = _write_legacy_files(tmp_path)
+    migrate_files(store, [vacations_path, schedules_path], leave_year=2026)
+    assert LeaveLedger(store).balances(2026, ['A']) == {'A': 18.5}
+
+
+def test_balances_use_default_entitlement_and_schedule_usage(store):
+    store.save_month(_month(2026, 3, ['A', 'B'], {(0, 1): 'V', (0, 2): 'v.0.5', (1, 3): 'v.25'}))
+    ledger = LeaveLedger(store)
+    assert ledger.balances(2026, ['A', 'B']) == {'A': DEFAULT_ANNUAL_LEAVE - 1.5, 'B': DEFAULT_ANNUAL_LEAVE - 0.25}
+    assert ledger.balances(2026, ['A'], upto_month=2) == {'A': DEFAULT_ANNUAL_LEAVE}
+
+
+def test_entitlement_and_events(store):
+    ledger = LeaveLedger(store)
+    ledger.set_entitlement('A', 2026, 15)
+    ledger.set_entitlement('A', 2026, 15)  # 같은 값이면 이벤트를 추가하지 않음
+    ledger.append('use', 'A', 2026, 2)
+    ledger.append('refund', 'A', 2026, 0.5)
+    assert len(ledger.events()) == 3
+    assert ledger.balances(2026, ['A']) == {'A': 13.5}
+    with pytest.raises(ValueError):
+        ledger.append('bonus', 'A', 2026, 1)
+
+
+def test_rename_worker_merges_events_and_schedule_usage(store):
+    ledger = LeaveLedger(store)
+    ledger.set_entitlement('A', 2026, 20)
+    store.save_month(_month(2026, 3, ['A'], {(0, 1): 'V'}))
+    ledger.rename_worker('A', 'A2')
+    assert ledger.balances(2026, ['A2']) == {'A2': 19.0}
+    assert LeaveLedger(store).balances(2026, ['A2']) == {'A2': 19.0}
+
+
+def test_month_usage_follows_saves_and_deletes(store):
+    ledger = LeaveLedger(store)
+    em = store.save_month(_month(2026, 3, ['A'], {(0, 1): 'V'}))
+    ledger.update_month(em)
+    assert ledger.balances(2026, ['A']) == {'A': DEFAULT_ANNUAL_LEAVE - 1}
+    # 다른 인스턴스가 파일을 바꾸면 캐시 대신 다시 집계
+    other = ScheduleStore(store.root)
+    changed = other.load_month(2026, 3)
+    changed.codes[0, 2] = DUTY_INDEX['V']
+    other.save_month(changed)
+    assert ledger.balances(2026, ['A']) == {'A': DEFAULT_ANNUAL_LEAVE - 2}
+    store.delete_month(2026, 3)
+    ledger.forget_month(2026, 3)
+    assert ledger.balances(2026, ['A']) == {'A': DEFAULT_ANNUAL_LEAVE}
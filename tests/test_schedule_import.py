@@ -0,0 +1,68 @@
+import pytest
+
+from schedule_codec import DUTY_INDEX
+from schedule_import import import_workbooks, iter_workbook_months
+from schedule_store import ScheduleStore
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+def _write_workbook(path, sheets):
+    """sheets: [(시트 이름, 헤더, 행 목록)]"""
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for title, header, rows in sheets:
+        worksheet = workbook.create_sheet(title)
+        worksheet.append(header)
+        for row in rows:
+            worksheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+def _schedule_sheet(title, month, duties):
+    return title, ['근무자'] + [f"{month}/{d} (요일)" for d in range(1, 29)], [['A'] + duties]
+
+
+def _keys(path, year=None):
+    return [em.key for em, _ in iter_workbook_months(path, year)]
+
+
+def test_month_from_file_name_and_stats_sheet_skipped(tmp_path):
+    path = _write_workbook(tmp_path / '2026년_3월_근무표.xlsx', [
+        _schedule_sheet('근무표', 3, ['D', 'E']),
+        ('근무_통계', ['근무자', '총 근무', 'D'], [['A', 2, 1]]),
+    ])
+    months = list(iter_workbook_months(path))
+    assert [em.key for em, _ in months] == ['2026-03']
+    em, errors = months[0]
+    assert errors == []
+    assert em.codes[0, :2].tolist() == [DUTY_INDEX['D'], DUTY_INDEX['E']]
+
+
+def test_sheet_months_win_over_file_name_month(tmp_path):
+    path = _write_workbook(tmp_path / '2025-03 근무표.xlsx',
+                           [_schedule_sheet(f"{m}월", m, ['D']) for m in (1, 2, 3)])
+    assert _keys(path) == ['2025-01', '2025-02', '2025-03']
+
+
+def test_default_year_only_when_file_name_has_none(tmp_path):
+    annual = _write_workbook(tmp_path / '기본_2026.xlsx', [_schedule_sheet('4월', 4, ['N'])])
+    assert _keys(annual, year=2024) == ['2026-04']
+    plain = _write_workbook(tmp_path / '근무표.xlsx', [_schedule_sheet('4월', 4, ['N'])])
+    assert _keys(plain, year=2024) == ['2024-04']
+    assert _keys(plain) == []
+
+
+def test_import_rejects_disallowed_duties_and_duplicate_months(tmp_path):
+    store = ScheduleStore(str(tmp_path / 'store'))
+    first = _write_workbook(tmp_path / '2026-05.xlsx', [_schedule_sheet('5월', 5, ['D']),
+                                                         _schedule_sheet('6월', 6, ['MD'])])
+    second = _write_workbook(tmp_path / '2026-05 수정.xlsx', [_schedule_sheet('5월', 5, ['N'])])
+    messages = []
+    imported = import_workbooks(store, [first, second], allowed_duties=['', 'D', 'E', 'N'], report=messages.append)
+    assert [em.key for em in imported] == ['2026-05']
+    assert store.list_months() == ['2026-05']
+    assert store.load_month(2026, 5).codes[0, 0] == DUTY_INDEX['D']
+    assert any('허용되지 않은 근무' in msg for msg in messages)
+    assert any('같은 달이 이미 가져와져 있음' in msg for msg in messages)
@@ -0,0 +1,49 @@
+import calendar
+
+import numpy as np
+
+from schedule_codec import DUTY_INDEX, EncodedMonth
+from schedule_stats import CUBE_LEAVE_QUARTERS, STATS_VIEW_COLUMNS, StatsCube, stats_rows
+from schedule_store import ScheduleStore
+
+
+def _month(year, month, workers, duties=None):
+    em = EncodedMonth(year, month, workers, np.zeros((len(workers), calendar.monthrange(year, month)[1]), dtype=np.uint8))
+    for (r, day), duty in (duties or {}).items():
+        em.codes[r, day - 1] = DUTY_INDEX[duty]
+    return em
+
+
+def _row(workers, totals, name, column):
+    rows = {row[0]: row for row in stats_rows(workers, totals)}
+    return rows[name][STATS_VIEW_COLUMNS.index(column)]
+
+
+def test_update_month_and_year_to_date(tmp_path):
+    store = ScheduleStore(str(tmp_path / 'store'))
+    cube = StatsCube(store)
+    cube.update_month(store.save_month(_month(2026, 1, ['A'], {(0, 1): 'D', (0, 2): 'V'})))
+    cube.update_month(store.save_month(_month(2026, 2, ['A', 'B'], {(0, 1): 'D', (1, 1): 'N'})))
+    workers, totals = cube.year_to_date(2026, 2)
+    assert workers == ['A', 'B']
+    assert _row(workers, totals, 'A', 'D') == 2
+    assert _row(workers, totals, 'A', '연차 사용') == 1.0
+    assert _row(workers, totals, 'B', 'N') == 1
+    _, totals = cube.year_to_date(2026, 1, workers=['B'])
+    assert totals.sum() == 0
+
+
+def test_refresh_picks_up_changes_from_another_instance(tmp_path):
+    store = ScheduleStore(str(tmp_path / 'store'))
+    cube = StatsCube(store)
+    cube.update_month(store.save_month(_month(2026, 3, ['A'], {(0, 1): 'v.0.5'})))
+    # 다른 인스턴스가 월을 바꾸거나 지우면 stamp가 달라져 다시 집계
+    other = ScheduleStore(store.root)
+    em = other.load_month(2026, 3)
+    em.codes[0, 2] = DUTY_INDEX['V']
+    other.save_month(em)
+    workers, totals = cube.totals(['2026-03'], workers=['A'])
+    assert totals[0, CUBE_LEAVE_QUARTERS] == 6
+    assert StatsCube(store).totals(['2026-03'], workers=['A'])[1][0, CUBE_LEAVE_QUARTERS] == 6
+    other.delete_month(2026, 3)
+    assert cube.totals(['2026-03'], workers=['A'])[1].sum() == 0
@@ -0,0 +1,121 @@
+import calendar
+import os
+
+import numpy as np
+import pytest
+
+from schedule_codec import DUTY_INDEX, EncodedMonth
+from schedule_store import (STORE_LOCK_FILE, ScheduleConflictError, ScheduleStore, StoreLock, StoreLockTimeout,
+                            merge_months)
+
+
+def _month(year, month, workers, duties=None):
+    em = EncodedMonth(year, month, workers, np.zeros((len(workers), calendar.monthrange(year, month)[1]), dtype=np.uint8))
+    for (r, day), duty in (duties or {}).items():
+        em.codes[r, day - 1] = DUTY_INDEX[duty]
+    return em
+
+
+def _duty(em, worker, day):
+    return int(em.codes[em.workers.index(worker), day - 1])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ScheduleStore(str(tmp_path / 'store'))
+
+
+# ------------------------------------------------------------------
+# merge_months
+# ------------------------------------------------------------------
+def test_merge_takes_one_sided_and_identical_changes():
+    base = _month(2026, 3, ['A', 'B'])
+    mine = _month(2026, 3, ['A', 'B'], {(0, 1): 'D', (1, 5): 'N'})
+    theirs = _month(2026, 3, ['A', 'B'], {(0, 2): 'E', (1, 5): 'N'})
+    merged, conflicts = merge_months(base, mine, theirs)
+    assert conflicts == []
+    assert merged.workers == ['A', 'B']
+    assert (_duty(merged, 'A', 1), _duty(merged, 'A', 2), _duty(merged, 'B', 5)) == (
+        DUTY_INDEX['D'], DUTY_INDEX['E'], DUTY_INDEX['N'])
+
+
+def test_merge_reports_cells_changed_differently():
+    base = _month(2026, 3, ['A'], {(0, 1): 'D'})
+    mine = _month(2026, 3, ['A'], {(0, 1): 'E'})
+    theirs = _month(2026, 3, ['A'], {(0, 1): 'N'})
+    _, conflicts = merge_months(base, mine, theirs)
+    assert conflicts == [('A', 1, 'E', 'N')]
+
+
+def test_merge_keeps_added_workers_and_drops_deleted_ones():
+    base = _month(2026, 3, ['A', 'B'])
+    mine = _month(2026, 3, ['A'], {(0, 1): 'D'})
+    theirs = _month(2026, 3, ['A', 'B', 'C'], {(1, 1): 'E', (2, 3): 'N'})
+    merged, conflicts = merge_months(base, mine, theirs)
+    assert conflicts == []
+    assert merged.workers == ['A', 'C']
+    assert _duty(merged, 'C', 3) == DUTY_INDEX['N']
+
+
+def test_merge_without_base_prefers_mine_without_conflicts():
+    mine = _month(2026, 3, ['A'], {(0, 1): 'D', (0, 2): 'E'})
+    theirs = _month(2026, 3, ['A', 'B'], {(0, 1): 'N', (1, 4): 'D'})
+    merged, conflicts = merge_months(None, mine, theirs)
+    assert conflicts == []
+    assert merged.workers == ['A', 'B']
+    assert (_duty(merged, 'A', 1), _duty(merged, 'A', 2)) == (DUTY_INDEX['D'], DUTY_INDEX['E'])
+    assert _duty(merged, 'B', 4) == DUTY_INDEX['D']
+
+
+# ------------------------------------------------------------------
+# ScheduleStore.save_month
+# ------------------------------------------------------------------
+def test_save_month_merges_changes_from_another_instance(store):
+    store.save_month(_month(2026, 3, ['A', 'B']))
+    other = ScheduleStore(store.root)
+    theirs = other.load_month(2026, 3)
+    mine = store.load_month(2026, 3)
+    theirs.codes[1, 4] = DUTY_INDEX['N']
+    other.save_month(theirs)
+    mine.codes[0, 0] = DUTY_INDEX['D']
+    merged = store.save_month(mine)
+    assert (_duty(merged, 'A', 1), _duty(merged, 'B', 5)) == (DUTY_INDEX['D'], DUTY_INDEX['N'])
+    assert store.month_revision(2026, 3) == 3
+
+
+def test_save_month_rejects_conflicts_and_keeps_disk(store):
+    store.save_month(_month(2026, 3, ['A']))
+    other = ScheduleStore(store.root)
+    theirs = other.load_month(2026, 3)
+    mine = store.load_month(2026, 3)
+    theirs.codes[0, 0] = DUTY_INDEX['N']
+    other.save_month(theirs)
+    mine.codes[0, 0] = DUTY_INDEX['D']
+    with pytest.raises(ScheduleConflictError) as excinfo:
+        store.save_month(mine)
+    assert excinfo.value.conflicts == [('A', 1, 'D', 'N')]
+    assert _duty(ScheduleStore(store.root).load_month(2026, 3), 'A', 1) == DUTY_INDEX['N']
+
+
+def test_carry_over_tail_follows_previous_month(store):
+    store.save_month(_month(2026, 2, ['A'], {(0, 28): 'N'}))
+    assert store.carry_over_tail(2026, 3, 2) == {'A': ['', 'N']}
+    assert store.carry_over_tail(2026, 3, 40) == {'A': [''] * 27 + ['N']}
+    em = store.load_month(2026, 2)
+    em.codes[0, 26] = DUTY_INDEX['E']
+    store.save_month(em)
+    assert store.carry_over_tail(2026, 3, 2) == {'A': ['E', 'N']}
+
+
+# ------------------------------------------------------------------
+# StoreLock
+# ------------------------------------------------------------------
+def test_store_lock_times_out_while_held_elsewhere(store):
+    path = os.path.join(store.root, STORE_LOCK_FILE)
+    with store.lock():
+        with store.lock():  # 같은 잠금 객체는 중첩 가능
+            with pytest.raises(StoreLockTimeout):
+                with StoreLock(path, timeout=0.3):
+                    pass
+    with StoreLock(path, timeout=0.3):
+        pass